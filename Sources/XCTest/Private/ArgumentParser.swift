@@ -67,16 +67,56 @@ internal struct ArgumentParser {
             case _ where argument.starts(with: "--testing-library="):
                 // Same as above, but in the form "--testing-library=xctest".
                 break
+            case "--event-stream":
+                if let path = iterator.next() {
+                    eventStreamPath = path
+                } else {
+                    executionMode = .help(invalidOption: argument)
+                }
+            case _ where argument.starts(with: "--event-stream="):
+                eventStreamPath = String(argument.dropFirst("--event-stream=".count))
+            case "--buffered-output":
+                isOutputBuffered = true
             default:
                 if argument.first == "-" {
                     executionMode = .help(invalidOption: argument)
-                } else {
-                    let testNames = argument.split(separator: ",").map(String.init)
+                } else if let testNames = ArgumentParser.selectedTestNames(in: argument) {
                     executionMode = .run(selectedTestNames: testNames)
+                } else {
+                    executionMode = .help(invalidOption: argument)
                 }
             }
         }
     }
 
+    /// Splits a comma-separated list of test names, replacing each `@path`
+    /// with the names in the file at `path`, one per line. Blank lines, and
+    /// lines starting with `#`, are ignored. Returns nil if a file can't be
+    /// read.
+    private static func selectedTestNames(in argument: String) -> [String]? {
+        var testNames = [String]()
+        for testName in argument.split(separator: ",") {
+            guard testName.first == "@" else {
+                testNames.append(String(testName))
+                continue
+            }
+            guard let contents = try? String(contentsOfFile: String(testName.dropFirst()), encoding: .utf8) else {
+                return nil
+            }
+            testNames += contents.split(whereSeparator: { $0.isNewline })
+                .map { $0.trimmingCharacters(in: .whitespaces) }
+                .filter { !$0.isEmpty && !$0.hasPrefix("#") }
+        }
+        return testNames
+    }
+
     var executionMode: ExecutionMode = .run(selectedTestNames: nil)
+
+    /// The path of a file to write test events to as JSON lines, in addition
+    /// to the output of the other observers, if any.
+    var eventStreamPath: String?
+
+    /// Whether test progress is printed to stdout in blocks, rather than a
+    /// line at a time.
+    var isOutputBuffered = false
 }
@@ -0,0 +1,182 @@
+// This source file is part of the Swift.org open source project
+//
+// Copyright (c) 2016 Apple Inc. and the Swift project authors
+// Licensed under Apache License v2.0 with Runtime Library Exception
+//
+// See http://swift.org/LICENSE.txt for license information
+// See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+//
+//
+//  EventStreamObserver.swift
+//  Writes test progress to a file as JSON lines.
+//
+
+/// Writes each XCTestObservation event to a file as a compact JSON object on
+/// its own line, for consumption by tools rather than people.
+///
+/// Every event has an `"event"` name and a `"time"`, in seconds since the
+/// observer was created, taken from a monotonic clock. Events that finish a
+/// test or suite also have its `"duration"`, in seconds, measured with the
+/// same clock, so that it isn't skewed when the system's date changes.
+internal class EventStreamObserver: XCTestObservation {
+    private let fileHandle: FileHandle
+    private let startTime = DispatchTime.now().uptimeNanoseconds
+
+    /// The times at which the tests and suites that are running started.
+    private var startTimes: [ObjectIdentifier: UInt64] = [:]
+
+    /// Creates an observer that writes to the file at the given path,
+    /// replacing it if it exists, or returns nil if it can't be created.
+    init?(path: String) {
+        guard FileManager.default.createFile(atPath: path, contents: nil),
+              let fileHandle = FileHandle(forWritingAtPath: path) else {
+            return nil
+        }
+        self.fileHandle = fileHandle
+    }
+
+    deinit {
+        fileHandle.closeFile()
+    }
+
+    func testBundleWillStart(_ testBundle: Bundle) {
+        write("bundleStart", ["bundle": testBundle.bundleURL.lastPathComponent])
+    }
+
+    func testSuiteWillStart(_ testSuite: XCTestSuite) {
+        startTimes[ObjectIdentifier(testSuite)] = DispatchTime.now().uptimeNanoseconds
+        write("suiteStart", ["name": testSuite.name])
+    }
+
+    func testCaseWillStart(_ testCase: XCTestCase) {
+        startTimes[ObjectIdentifier(testCase)] = DispatchTime.now().uptimeNanoseconds
+        write("caseStart", ["name": testCase.name])
+    }
+
+    func testCase(_ testCase: XCTestCase, didFailWithDescription description: String, inFile filePath: String?, atLine lineNumber: Int) {
+        write("caseFailure", [
+            "name": testCase.name,
+            "file": filePath ?? "<unknown>",
+            "line": lineNumber,
+            "message": description,
+        ])
+    }
+
+    func testCaseDidFinish(_ testCase: XCTestCase) {
+        let testRun = testCase.testRun!
+
+        let result: String
+        if testRun.hasSucceeded {
+            result = testRun.hasBeenSkipped ? "skipped" : "passed"
+        } else {
+            result = "failed"
+        }
+
+        write("caseFinish", [
+            "name": testCase.name,
+            "result": result,
+            "failures": testRun.totalFailureCount,
+            "unexpected": testRun.unexpectedExceptionCount,
+            "duration": duration(of: testCase, run: testRun),
+        ])
+    }
+
+    func testSuiteDidFinish(_ testSuite: XCTestSuite) {
+        let testRun = testSuite.testRun!
+        write("suiteFinish", [
+            "name": testSuite.name,
+            "result": testRun.hasSucceeded ? "passed" : "failed",
+            "executed": testRun.executionCount,
+            "skipped": testRun.skipCount,
+            "failures": testRun.totalFailureCount,
+            "unexpected": testRun.unexpectedExceptionCount,
+            "testDuration": testRun.testDuration,
+            "duration": duration(of: testSuite, run: testRun),
+        ])
+    }
+
+    func testBundleDidFinish(_ testBundle: Bundle) {
+        write("bundleFinish", ["bundle": testBundle.bundleURL.lastPathComponent])
+    }
+
+    /// Returns the seconds since the given test or suite started, or the
+    /// duration its run recorded if it wasn't seen to start.
+    private func duration(of test: XCTest, run: XCTestRun) -> TimeInterval {
+        guard let start = startTimes.removeValue(forKey: ObjectIdentifier(test)) else {
+            return run.totalDuration
+        }
+        return seconds(since: start)
+    }
+
+    private func seconds(since start: UInt64) -> TimeInterval {
+        return TimeInterval(DispatchTime.now().uptimeNanoseconds - start) / 1_000_000_000
+    }
+
+    /// Writes an event with the given name and fields, in the order given, as
+    /// a line of JSON. The line is written in one call, so that it is complete
+    /// in the file even if the process crashes during the next test.
+    private func write(_ event: String, _ fields: KeyValuePairs<String, Any>) {
+        var line = "{\"event\":\(quoted(event)),\"time\":\(format(seconds(since: startTime)))"
+        for (key, value) in fields {
+            line += ",\(quoted(key)):"
+            switch value {
+            case let number as Int:
+                line += String(number)
+            case let number as Double:
+                line += format(number)
+            default:
+                line += quoted(String(describing: value))
+            }
+        }
+        line += "}\n"
+        fileHandle.write(line.data(using: .utf8)!)
+    }
+
+    private func format(_ seconds: TimeInterval) -> String {
+        // Microseconds are as precise as the clocks that are read.
+        return String(round(seconds * 1_000_000) / 1_000_000)
+    }
+
+    private func quoted(_ string: String) -> String {
+        var result = "\""
+        for scalar in string.unicodeScalars {
+            switch scalar {
+            case "\"":
+                result += "\\\""
+            case "\\":
+                result += "\\\\"
+            case "\n":
+                result += "\\n"
+            case "\r":
+                result += "\\r"
+            case "\t":
+                result += "\\t"
+            case _ where scalar.value < 0x20:
+                result += String(format: "\\u%04x", scalar.value)
+            default:
+                result.unicodeScalars.append(scalar)
+            }
+        }
+        return result + "\""
+    }
+}
+
+extension EventStreamObserver: XCTestInternalObservation {
+    func testCase(_ testCase: XCTestCase, wasSkippedWithDescription description: String, at sourceLocation: SourceLocation?) {
+        write("caseSkip", [
+            "name": testCase.name,
+            "file": sourceLocation?.file ?? "<unknown>",
+            "line": sourceLocation.map { Int($0.line) } ?? 0,
+            "message": description,
+        ])
+    }
+
+    func testCase(_ testCase: XCTestCase, didMeasurePerformanceResults results: String, file: StaticString, line: Int) {
+        write("caseMeasure", [
+            "name": testCase.name,
+            "file": "\(file)",
+            "line": line,
+            "results": results,
+        ])
+    }
+}
@@ -14,19 +14,38 @@
 /// Prints textual representations of each XCTestObservation event to stdout.
 /// Mirrors the Apple XCTest output exactly.
 internal class PrintObserver: XCTestObservation {
+    /// Whether stdout is block-buffered, and flushed only when a suite
+    /// finishes, when a test fails, and when the process exits or crashes,
+    /// rather than after every line.
+    private let isBuffered: Bool
+
+    init(isBuffered: Bool = false) {
+        #if canImport(Darwin) || (os(Linux) && canImport(Glibc))
+        self.isBuffered = isBuffered
+        if isBuffered {
+            bufferStandardOutput()
+        }
+        #else
+        // Output that is still buffered when a test crashes can only be
+        // written where its stdio buffer can be read from a signal handler,
+        // so elsewhere every line is flushed.
+        self.isBuffered = false
+        #endif
+    }
+
     func testBundleWillStart(_ testBundle: Bundle) {}
 
     func testSuiteWillStart(_ testSuite: XCTestSuite) {
-        printAndFlush("Test Suite '\(testSuite.name)' started at \(dateFormatter.string(from: testSuite.testRun!.startDate!))")
+        printLine("Test Suite '\(testSuite.name)' started at \(dateFormatter.string(from: testSuite.testRun!.startDate!))")
     }
 
     func testCaseWillStart(_ testCase: XCTestCase) {
-        printAndFlush("Test Case '\(testCase.name)' started at \(dateFormatter.string(from: testCase.testRun!.startDate!))")
+        printLine("Test Case '\(testCase.name)' started at \(dateFormatter.string(from: testCase.testRun!.startDate!))")
     }
 
     func testCase(_ testCase: XCTestCase, didFailWithDescription description: String, inFile filePath: String?, atLine lineNumber: Int) {
         let file = filePath ?? "<unknown>"
-        printAndFlush("\(file):\(lineNumber): error: \(testCase.name) : \(description)")
+        printLine("\(file):\(lineNumber): error: \(testCase.name) : \(description)", flush: true)
     }
 
     func testCaseDidFinish(_ testCase: XCTestCase) {
@@ -43,25 +62,26 @@ internal class PrintObserver: XCTestObservation {
             verb = "failed"
         }
 
-        printAndFlush("Test Case '\(testCase.name)' \(verb) (\(formatTimeInterval(testRun.totalDuration)) seconds)")
+        printLine("Test Case '\(testCase.name)' \(verb) (\(formatTimeInterval(testRun.totalDuration)) seconds)")
     }
 
     func testSuiteDidFinish(_ testSuite: XCTestSuite) {
         let testRun = testSuite.testRun!
         let verb = testRun.hasSucceeded ? "passed" : "failed"
-        printAndFlush("Test Suite '\(testSuite.name)' \(verb) at \(dateFormatter.string(from: testRun.stopDate!))")
+        printLine("Test Suite '\(testSuite.name)' \(verb) at \(dateFormatter.string(from: testRun.stopDate!))")
 
         let tests = testRun.executionCount == 1 ? "test" : "tests"
         let skipped = testRun.skipCount > 0 ? "\(testRun.skipCount) test\(testRun.skipCount != 1 ? "s" : "") skipped and " : ""
         let failures = testRun.totalFailureCount == 1 ? "failure" : "failures"
 
-        printAndFlush("""
+        printLine("""
             \t Executed \(testRun.executionCount) \(tests), \
             with \(skipped)\
             \(testRun.totalFailureCount) \(failures) \
             (\(testRun.unexpectedExceptionCount) unexpected) \
             in \(formatTimeInterval(testRun.testDuration)) (\(formatTimeInterval(testRun.totalDuration))) seconds
-            """
+            """,
+            flush: true
         )
     }
 
@@ -73,10 +93,14 @@ internal class PrintObserver: XCTestObservation {
         return formatter
     }()
 
-    fileprivate func printAndFlush(_ message: String) {
+    /// Prints a line, and flushes stdout if `flush` is true or stdout isn't
+    /// buffered.
+    fileprivate func printLine(_ message: String, flush: Bool = false) {
         print(message)
         #if !os(Android)
-        fflush(stdout)
+        if flush || !isBuffered {
+            fflush(stdout)
+        }
         #endif
     }
 
@@ -89,10 +113,88 @@ extension PrintObserver: XCTestInternalObservation {
     func testCase(_ testCase: XCTestCase, wasSkippedWithDescription description: String, at sourceLocation: SourceLocation?) {
         let file = sourceLocation?.file ?? "<unknown>"
         let line = sourceLocation?.line ?? 0
-        printAndFlush("\(file):\(line): \(testCase.name) : \(description)")
+        printLine("\(file):\(line): \(testCase.name) : \(description)")
     }
 
     func testCase(_ testCase: XCTestCase, didMeasurePerformanceResults results: String, file: StaticString, line: Int) {
-        printAndFlush("\(file):\(line): Test Case '\(testCase.name)' measured \(results)")
+        printLine("\(file):\(line): Test Case '\(testCase.name)' measured \(results)")
+    }
+}
+
+#if canImport(Darwin) || (os(Linux) && canImport(Glibc))
+/// The signals that a crashing test, such as one that traps or dereferences a
+/// bad pointer, is killed by.
+private let crashSignals = [SIGABRT, SIGBUS, SIGFPE, SIGILL, SIGSEGV, SIGTRAP]
+
+/// The actions that were installed for each of `crashSignals` before
+/// `bufferStandardOutput()` replaced them, indexed by signal number. It is a
+/// C array, rather than a Swift collection, so that the signal handler can
+/// read it without allocating or taking locks.
+private let previousCrashSignalActions: UnsafeMutablePointer<sigaction> = {
+    let count = Int(crashSignals.max()!) + 1
+    let actions = UnsafeMutablePointer<sigaction>.allocate(capacity: count)
+    actions.initialize(repeating: sigaction(), count: count)
+    return actions
+}()
+
+/// The size of the buffer that stdout is given when it is buffered.
+private let standardOutputBufferSize = 64 * 1024
+
+private var isStandardOutputBuffered = false
+
+/// Makes stdout block-buffered, in a buffer allocated here, so that lines are
+/// written when the buffer is full or is flushed, rather than one at a time.
+/// `exit()` flushes the buffer, and so that the output of a test isn't lost
+/// if it crashes, the buffer is also written when the process is killed by
+/// one of `crashSignals`.
+private func bufferStandardOutput() {
+    guard !isStandardOutputBuffered else {
+        // Installing the handlers again would record them as their own
+        // previous actions.
+        return
+    }
+    isStandardOutputBuffered = true
+
+    fflush(stdout)
+    let buffer = UnsafeMutablePointer<CChar>.allocate(capacity: standardOutputBufferSize)
+    setvbuf(stdout, buffer, _IOFBF, standardOutputBufferSize)
+
+    let handler: @convention(c) (Int32) -> Void = { signalNumber in
+        writeBufferedStandardOutput()
+        // Restore the previous action, such as the Swift runtime's
+        // backtracer, which then handles the signal when the faulting
+        // instruction runs again, or when abort() raises it again.
+        sigaction(signalNumber, previousCrashSignalActions + Int(signalNumber), nil)
+    }
+    var action = sigaction()
+    #if canImport(Darwin)
+    action.__sigaction_u.__sa_handler = handler
+    #else
+    action.__sigaction_handler = unsafeBitCast(handler, to: sigaction.__Unnamed_union___sigaction_handler.self)
+    #endif
+    for crashSignal in crashSignals {
+        sigaction(crashSignal, &action, previousCrashSignalActions + Int(crashSignal))
+    }
+}
+
+/// Writes the bytes in the buffer of stdout that haven't been written yet
+/// with write(2). It reads the bounds of those bytes from the fields of the
+/// stream, rather than calling into stdio, which takes the stream's lock,
+/// so that it can be called from a signal handler while another thread
+/// holds that lock.
+private func writeBufferedStandardOutput() {
+    #if canImport(Darwin)
+    guard let base = stdout.pointee._bf._base, let next = stdout.pointee._p else { return }
+    #else
+    guard let base = stdout.pointee._IO_write_base, let next = stdout.pointee._IO_write_ptr else { return }
+    #endif
+    var start = UnsafeRawPointer(base)
+    var count = start.distance(to: UnsafeRawPointer(next))
+    while count > 0 {
+        let written = write(STDOUT_FILENO, start, count)
+        guard written > 0 else { return }
+        start += written
+        count -= written
     }
 }
+#endif
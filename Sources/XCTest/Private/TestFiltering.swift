@@ -11,7 +11,17 @@
 //  This provides utilities for executing only a subset of the tests provided to `XCTMain`
 //
 
-internal typealias TestFilter = (XCTestCase.Type, String) -> Bool
+/// The methods of a test case class that are selected to run.
+internal enum TestMethodSelection {
+    case allMethods
+    case noMethods
+    case someMethods((String) -> Bool)
+}
+
+/// Decides which methods of a test case class are selected. It is called once
+/// per class, rather than once per method, so that the cost of naming the
+/// class is paid once.
+internal typealias TestFilter = (XCTestCase.Type) -> TestMethodSelection
 
 internal struct TestFiltering {
     private let selectedTestNames: [String]?
@@ -22,22 +32,28 @@ internal struct TestFiltering {
 
     var selectedTestFilter: TestFilter {
         guard let selectedTestNames = selectedTestNames else { return includeAllFilter() }
-        let selectedTests = Set(selectedTestNames.compactMap { SelectedTest(selectedTestName: $0) })
+        let index = SelectionIndex(selectors: selectedTestNames.compactMap(TestSelector.init(selectedTestName:)))
 
-        return { testCaseClass, testCaseMethodName in
-            return selectedTests.contains(SelectedTest(testCaseClass: testCaseClass, testCaseMethodName: testCaseMethodName)) ||
-                   selectedTests.contains(SelectedTest(testCaseClass: testCaseClass, testCaseMethodName: nil))
+        return { testCaseClass in
+            return index.selection(forTestCaseClassNamed: String(reflecting: testCaseClass))
         }
     }
 
     private func includeAllFilter() -> TestFilter {
-        return { _,_ in true }
+        return { _ in .allMethods }
     }
 
     static func filterTests(_ entries: [XCTestCaseEntry], filter: TestFilter) -> [XCTestCaseEntry] {
         return entries
             .map { testCaseClass, testCaseMethods in
-                return (testCaseClass, testCaseMethods.filter { filter(testCaseClass, $0.0) } )
+                switch filter(testCaseClass) {
+                case .allMethods:
+                    return (testCaseClass, testCaseMethods)
+                case .noMethods:
+                    return (testCaseClass, [])
+                case .someMethods(let isSelected):
+                    return (testCaseClass, testCaseMethods.filter { isSelected($0.0) })
+                }
             }
             .filter { _, testCaseMethods in
                 return !testCaseMethods.isEmpty
@@ -45,28 +61,133 @@ internal struct TestFiltering {
     }
 }
 
-/// A selected test can be a single test case, or an entire class of test cases
-private struct SelectedTest : Hashable {
-    let testCaseClassName: String
-    let testCaseMethodName: String?
-}
+/// A selector names the tests to run in one of these forms:
+///
+/// - `Module.Class` or `Module.Class/method`, naming an entire class of test
+///   cases, or a single test case.
+/// - A glob, such as `Module.*Tests` or `Module.Class/test*`, in which `*`
+///   matches any run of characters and `?` any one character. A glob without
+///   a `/` selects entire classes.
+/// - `re:` followed by a regular expression, which selects the test cases
+///   whose `Module.Class/method` name it matches any part of.
+private enum TestSelector {
+    case testCase(className: String, methodName: String?)
+    case glob(className: Glob, methodName: Glob?)
+    case regularExpression(NSRegularExpression)
 
-private extension SelectedTest {
     init?(selectedTestName: String) {
+        if selectedTestName.hasPrefix("re:") {
+            let pattern = String(selectedTestName.dropFirst("re:".count))
+            guard let regularExpression = try? NSRegularExpression(pattern: pattern) else {
+                return nil
+            }
+            self = .regularExpression(regularExpression)
+            return
+        }
+
         let components = selectedTestName.split(separator: "/").map(String.init)
-        switch components.count {
-        case 1:
-            testCaseClassName = components[0]
-            testCaseMethodName = nil
-        case 2:
-            testCaseClassName = components[0]
-            testCaseMethodName = components[1]
-        default:
+        guard components.count == 1 || components.count == 2 else {
             return nil
         }
+        let methodName = components.count == 2 ? components[1] : nil
+        if Glob.isGlob(selectedTestName) {
+            self = .glob(className: Glob(components[0]), methodName: methodName.map(Glob.init))
+        } else {
+            self = .testCase(className: components[0], methodName: methodName)
+        }
+    }
+}
+
+/// An index of selectors, built once, that finds the selected methods of a
+/// class by hashing its name, so that the cost of filtering doesn't grow
+/// with the number of selectors naming single test cases or classes.
+private struct SelectionIndex {
+    private var selectedClassNames = Set<String>()
+    private var selectedMethodNames = [String: Set<String>]()
+    private var classGlobs = [Glob]()
+    private var methodGlobs = [(className: Glob, methodName: Glob)]()
+    private var regularExpressions = [NSRegularExpression]()
+
+    init(selectors: [TestSelector]) {
+        for selector in selectors {
+            switch selector {
+            case let .testCase(className, nil):
+                selectedClassNames.insert(className)
+            case let .testCase(className, methodName?):
+                selectedMethodNames[className, default: []].insert(methodName)
+            case let .glob(className, nil):
+                classGlobs.append(className)
+            case let .glob(className, methodName?):
+                methodGlobs.append((className, methodName))
+            case let .regularExpression(regularExpression):
+                regularExpressions.append(regularExpression)
+            }
+        }
+    }
+
+    func selection(forTestCaseClassNamed className: String) -> TestMethodSelection {
+        if selectedClassNames.contains(className) || classGlobs.contains(where: { $0.matches(className) }) {
+            return .allMethods
+        }
+
+        let methodNames = selectedMethodNames[className] ?? []
+        let globs = methodGlobs.filter { $0.className.matches(className) }.map { $0.methodName }
+        if methodNames.isEmpty && globs.isEmpty && regularExpressions.isEmpty {
+            return .noMethods
+        }
+        let regularExpressions = self.regularExpressions
+        return .someMethods { methodName in
+            if methodNames.contains(methodName) || globs.contains(where: { $0.matches(methodName) }) {
+                return true
+            }
+            let name = "\(className)/\(methodName)"
+            let range = NSRange(location: 0, length: name.utf16.count)
+            return regularExpressions.contains { $0.firstMatch(in: name, range: range) != nil }
+        }
     }
+}
 
-    init(testCaseClass: XCTestCase.Type, testCaseMethodName: String?) {
-        self.init(testCaseClassName: String(reflecting: testCaseClass), testCaseMethodName: testCaseMethodName)
+/// A shell-style wildcard pattern, in which `*` matches any run of characters
+/// and `?` any one character.
+private struct Glob {
+    private let pattern: [Character]
+
+    init(_ pattern: String) {
+        self.pattern = Array(pattern)
+    }
+
+    static func isGlob(_ string: String) -> Bool {
+        return string.contains("*") || string.contains("?")
+    }
+
+    func matches(_ string: String) -> Bool {
+        let characters = Array(string)
+        var patternIndex = 0
+        var characterIndex = 0
+        // The positions just after the last `*`, and in the string where the
+        // characters it matches end, to backtrack to on a mismatch.
+        var starIndex: Int? = nil
+        var starMatchEnd = 0
+
+        while characterIndex < characters.count {
+            if patternIndex < pattern.count && (pattern[patternIndex] == "?" || pattern[patternIndex] == characters[characterIndex]) {
+                patternIndex += 1
+                characterIndex += 1
+            } else if patternIndex < pattern.count && pattern[patternIndex] == "*" {
+                patternIndex += 1
+                starIndex = patternIndex
+                starMatchEnd = characterIndex
+            } else if let starIndex = starIndex {
+                patternIndex = starIndex
+                starMatchEnd += 1
+                characterIndex = starMatchEnd
+            } else {
+                return false
+            }
+        }
+        while patternIndex < pattern.count && pattern[patternIndex] == "*" {
+            patternIndex += 1
+        }
+        return patternIndex == pattern.count
     }
 }
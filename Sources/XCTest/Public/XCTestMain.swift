@@ -134,10 +134,13 @@ internal func XCTMainMisc(
     observers: [XCTestObservation]?
 ) -> TestSuiteOrExitCode {
     _ = Interop.Handler.installFallbackEventHandler()
-    let observers = observers ?? [PrintObserver()]
-    let testBundle = Bundle.main
+    let argumentParser = ArgumentParser(arguments: arguments)
+    let executionMode = argumentParser.executionMode
 
-    let executionMode = ArgumentParser(arguments: arguments).executionMode
+    let isOutputBuffered = argumentParser.isOutputBuffered ||
+        ProcessInfo.processInfo.environment["XCTEST_BUFFERED_OUTPUT"] == "1"
+    var observers = observers ?? [PrintObserver(isBuffered: isOutputBuffered)]
+    let testBundle = Bundle.main
 
     // Apple XCTest behaves differently if tests have been filtered:
     // - The root `XCTestSuite` is named "Selected tests" instead of
@@ -185,6 +188,11 @@ internal func XCTMainMisc(
 
               -l, --list-tests             List tests line by line to standard output
                   --dump-tests-json        List tests in JSON to standard output
+                  --event-stream FILE      Also write test events to FILE as JSON lines
+                  --buffered-output        Write test progress in blocks rather than a line at
+                                           a time, flushed when a suite finishes, when a test
+                                           fails, and at exit. The same as setting
+                                           XCTEST_BUFFERED_OUTPUT=1
 
               TESTCASES:
 
@@ -195,9 +203,31 @@ internal func XCTMainMisc(
                  Run all the tests in \(sampleTests)
 
                      > \(exeName) \(sampleTests)
+
+                 Run the tests matching a glob, in which * matches any run of
+                 characters and ? any one character
+
+                     > \(exeName) '\(sampleTests)/test*'
+
+                 Run the tests whose Class/method name matches a regular expression
+
+                     > \(exeName) 're:Tests/test_.*Async'
+
+                 Separate several tests with commas, or list them one per line
+                 in a file, and pass its path after an @
+
+                     > \(exeName) @selected-tests.txt
               """)
         return .exitCode(invalidOption == nil ? EXIT_SUCCESS : EXIT_FAILURE)
     case .run(selectedTestNames: _):
+        if let path = argumentParser.eventStreamPath {
+            guard let eventStreamObserver = EventStreamObserver(path: path) else {
+                let errMsg = "Error: Unable to write events to \"\(path)\"\n"
+                FileHandle.standardError.write(errMsg.data(using: .utf8) ?? Data())
+                return .exitCode(EXIT_FAILURE)
+            }
+            observers.append(eventStreamObserver)
+        }
         return .testSuite(rootTestSuite: rootTestSuite, testBundle: testBundle, observers: observers)
     }
 }
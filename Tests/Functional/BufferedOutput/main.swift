@@ -0,0 +1,64 @@
+// RUN: %{swiftc} %s -o %T/BufferedOutput
+// RUN: %T/BufferedOutput --buffered-output BufferedOutput.BufferedTestCase > %T/buffered || true
+// RUN: env XCTEST_BUFFERED_OUTPUT=1 %T/BufferedOutput BufferedOutput.CrashingTestCase > %T/crashed || true
+// RUN: %{xctest_checker} -p "// CHECK:" -p "// CHECK-CRASH:" %T/buffered %T/crashed %s
+
+#if os(macOS)
+    import SwiftXCTest
+#else
+    import XCTest
+#endif
+
+// Buffered output is the same as output that is flushed a line at a time.
+// CHECK: Test Suite 'Selected tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: Test Suite 'BufferedTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+class BufferedTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_passes", test_passes),
+            ("test_fails", test_fails),
+        ]
+    }()
+
+    // CHECK: Test Case 'BufferedTestCase.test_passes' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: Printed by test_passes
+    // CHECK: Test Case 'BufferedTestCase.test_passes' passed \(\d+\.\d+ seconds\)
+    func test_passes() {
+        print("Printed by test_passes")
+    }
+
+    // CHECK: Test Case 'BufferedTestCase.test_fails' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: .*[/\\]BufferedOutput[/\\]main.swift:[[@LINE+3]]: error: BufferedTestCase.test_fails : XCTAssertTrue failed -
+    // CHECK: Test Case 'BufferedTestCase.test_fails' failed \(\d+\.\d+ seconds\)
+    func test_fails() {
+        XCTAssertTrue(false)
+    }
+}
+// CHECK: Test Suite 'BufferedTestCase' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 2 tests, with 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+// The output buffered before a test crashes is written when it does.
+// CHECK-CRASH: Test Suite 'Selected tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-CRASH: Test Suite 'CrashingTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+class CrashingTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_crashes", test_crashes),
+        ]
+    }()
+
+    // CHECK-CRASH: Test Case 'CrashingTestCase.test_crashes' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK-CRASH: Printed by test_crashes
+    func test_crashes() {
+        print("Printed by test_crashes")
+        fatalError("Crashed")
+    }
+}
+
+XCTMain([
+    testCase(BufferedTestCase.allTests),
+    testCase(CrashingTestCase.allTests),
+])
+
+// CHECK: Test Suite 'Selected tests' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 2 tests, with 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
@@ -0,0 +1,70 @@
+// RUN: %{swiftc} %s -o %T/EventStream
+// RUN: %T/EventStream --event-stream %t_events > %t || true
+// RUN: %{xctest_checker} %t %s
+// RUN: %{xctest_checker} --events -p "// EVENT: " %t_events %s
+
+#if os(macOS)
+    import SwiftXCTest
+#else
+    import XCTest
+#endif
+
+// The text output is unchanged by --event-stream.
+// CHECK: Test Suite 'All tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: Test Suite '.*\.xctest' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: Test Suite 'EventStreamTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: Test Case 'EventStreamTestCase.test_passes' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: Test Case 'EventStreamTestCase.test_passes' passed \(\d+\.\d+ seconds\)
+// CHECK: Test Case 'EventStreamTestCase.test_fails' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: .*[/\\]EventStream[/\\]main.swift:\d+: error: EventStreamTestCase.test_fails : XCTAssertEqual failed: \("1"\) is not equal to \("2"\) - "quoted" message
+// CHECK: Test Case 'EventStreamTestCase.test_fails' failed \(\d+\.\d+ seconds\)
+// CHECK: Test Case 'EventStreamTestCase.test_skips' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: .*[/\\]EventStream[/\\]main.swift:\d+: EventStreamTestCase.test_skips : Test skipped - some reason
+// CHECK: Test Case 'EventStreamTestCase.test_skips' skipped \(\d+\.\d+ seconds\)
+// CHECK: Test Suite 'EventStreamTestCase' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 3 tests, with 1 test skipped and 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK: Test Suite '.*\.xctest' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 3 tests, with 1 test skipped and 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK: Test Suite 'All tests' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 3 tests, with 1 test skipped and 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+// EVENT: {"event": "bundleStart"}
+// EVENT: {"event": "suiteStart", "name": "All tests"}
+// EVENT: {"event": "suiteStart", "name": "{{.*\\.xctest}}"}
+// EVENT: {"event": "suiteStart", "name": "EventStreamTestCase"}
+class EventStreamTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_passes", test_passes),
+            ("test_fails", test_fails),
+            ("test_skips", test_skips),
+        ]
+    }()
+
+    // EVENT: {"event": "caseStart", "name": "EventStreamTestCase.test_passes"}
+    // EVENT: {"event": "caseFinish", "name": "EventStreamTestCase.test_passes", "result": "passed"}
+    func test_passes() {
+        XCTAssertTrue(true)
+    }
+
+    // EVENT: {"event": "caseStart", "name": "EventStreamTestCase.test_fails"}
+    // EVENT: {"event": "caseFailure", "name": "EventStreamTestCase.test_fails", "file": "{{.*[/\\\\]EventStream[/\\\\]main.swift}}", "line": [[@LINE+3]], "message": "XCTAssertEqual failed: (\"1\") is not equal to (\"2\") - \"quoted\" message"}
+    // EVENT: {"event": "caseFinish", "name": "EventStreamTestCase.test_fails", "result": "failed"}
+    func test_fails() {
+        XCTAssertEqual(1, 2, "\"quoted\" message")
+    }
+
+    // EVENT: {"event": "caseStart", "name": "EventStreamTestCase.test_skips"}
+    // EVENT: {"event": "caseSkip", "name": "EventStreamTestCase.test_skips", "file": "{{.*[/\\\\]EventStream[/\\\\]main.swift}}", "line": [[@LINE+3]], "message": "Test skipped - some reason"}
+    // EVENT: {"event": "caseFinish", "name": "EventStreamTestCase.test_skips", "result": "skipped"}
+    func test_skips() throws {
+        throw XCTSkip("some reason")
+    }
+}
+// EVENT: {"event": "suiteFinish", "name": "EventStreamTestCase", "result": "failed", "executed": 3, "skipped": 1, "failures": 1, "unexpected": 0}
+
+XCTMain([testCase(EventStreamTestCase.allTests)])
+
+// EVENT: {"event": "suiteFinish", "name": "{{.*\\.xctest}}", "result": "failed", "executed": 3, "skipped": 1, "failures": 1, "unexpected": 0}
+// EVENT: {"event": "suiteFinish", "name": "All tests", "result": "failed", "executed": 3, "skipped": 1, "failures": 1, "unexpected": 0}
+// EVENT: {"event": "bundleFinish"}
@@ -0,0 +1,84 @@
+// RUN: %{swiftc} %s -o %T/ParallelRunner
+// RUN: %{xctest_parallel} -j 3 --times %T/times.json %T/ParallelRunner > %t || true
+// RUN: %{xctest_checker} %t %s
+// RUN: %{xctest_parallel} -j 3 --times %T/times.json %T/ParallelRunner > %t_scheduled || true
+// RUN: %{xctest_checker} %t_scheduled %s
+
+#if os(macOS)
+    import SwiftXCTest
+#else
+    import XCTest
+#endif
+
+// The merged output is that of a single run, in the order the tests are
+// listed, with totals across every worker.
+// CHECK: Test Suite 'All tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: Test Suite '.*\.xctest' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+
+// CHECK: Test Suite 'FirstTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+class FirstTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_passes", test_passes),
+            ("test_fails", test_fails),
+            ("test_skips", test_skips),
+        ]
+    }()
+
+    // CHECK: Test Case 'FirstTestCase.test_passes' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: Test Case 'FirstTestCase.test_passes' passed \(\d+\.\d+ seconds\)
+    func test_passes() {
+        XCTAssertTrue(true)
+    }
+
+    // CHECK: Test Case 'FirstTestCase.test_fails' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: .*[/\\]ParallelRunner[/\\]main.swift:[[@LINE+3]]: error: FirstTestCase.test_fails : XCTAssertTrue failed -
+    // CHECK: Test Case 'FirstTestCase.test_fails' failed \(\d+\.\d+ seconds\)
+    func test_fails() {
+        XCTAssertTrue(false)
+    }
+
+    // CHECK: Test Case 'FirstTestCase.test_skips' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: .*[/\\]ParallelRunner[/\\]main.swift:[[@LINE+3]]: FirstTestCase.test_skips : Test skipped
+    // CHECK: Test Case 'FirstTestCase.test_skips' skipped \(\d+\.\d+ seconds\)
+    func test_skips() throws {
+        throw XCTSkip()
+    }
+}
+// CHECK: Test Suite 'FirstTestCase' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 3 tests, with 1 test skipped and 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+// CHECK: Test Suite 'SecondTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+class SecondTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_one", test_one),
+            ("test_two", test_two),
+            ("test_three", test_three),
+        ]
+    }()
+
+    // CHECK: Test Case 'SecondTestCase.test_one' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: Test Case 'SecondTestCase.test_one' passed \(\d+\.\d+ seconds\)
+    func test_one() {}
+
+    // CHECK: Test Case 'SecondTestCase.test_two' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: Test Case 'SecondTestCase.test_two' passed \(\d+\.\d+ seconds\)
+    func test_two() {}
+
+    // CHECK: Test Case 'SecondTestCase.test_three' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+    // CHECK: Test Case 'SecondTestCase.test_three' passed \(\d+\.\d+ seconds\)
+    func test_three() {}
+}
+// CHECK: Test Suite 'SecondTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 3 tests, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+XCTMain([
+    testCase(FirstTestCase.allTests),
+    testCase(SecondTestCase.allTests),
+])
+
+// CHECK: Test Suite '.*\.xctest' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 6 tests, with 1 test skipped and 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK: Test Suite 'All tests' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK: \t Executed 6 tests, with 1 test skipped and 1 failure \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
@@ -1,6 +1,7 @@
 // RUN: %{swiftc} %s -o %T/Performance
 // RUN: %T/Performance > %t || true
 // RUN: %{xctest_checker} %t %s
+// RUN: %{perf_baseline} record --store %t_store %t && %{perf_baseline} compare --store %t_store %t | %{xctest_checker} -p "// CHECK-BASELINE: " - %s
 
 #if os(macOS)
     import SwiftXCTest
@@ -118,3 +119,11 @@ XCTMain([testCase(PerformanceTestCase.allTests)])
 // CHECK: \t Executed \d+ tests, with \d failures? \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
 // CHECK: Test Suite 'All tests' failed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
 // CHECK: \t Executed \d+ tests, with \d failures? \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+// Each measurement compared with a baseline of its own values is unchanged.
+// CHECK-BASELINE: UNCHANGED: PerformanceTestCase.test_measureBlockIteratesTenTimes org.swift.XCTPerformanceMetric_WallClockTime \(median .*\)
+// CHECK-BASELINE: UNCHANGED: PerformanceTestCase.test_measuresMetricsWithAutomaticStartAndStop org.swift.XCTPerformanceMetric_WallClockTime \(median .*\)
+// CHECK-BASELINE: UNCHANGED: PerformanceTestCase.test_measuresMetricsWithManualStartAndStop org.swift.XCTPerformanceMetric_WallClockTime \(median .*\)
+// CHECK-BASELINE: UNCHANGED: PerformanceTestCase.test_measuresMetricsWithoutExplicitStop org.swift.XCTPerformanceMetric_WallClockTime \(median .*\)
+// CHECK-BASELINE: UNCHANGED: PerformanceTestCase.test_printsValuesAfterMeasuring org.swift.XCTPerformanceMetric_WallClockTime \(median .*\)
+// CHECK-BASELINE: UNCHANGED: PerformanceTestCase.test_measuresWallClockTimeInBlock org.swift.XCTPerformanceMetric_WallClockTime \(median .*\)
@@ -0,0 +1,50 @@
+// REQUIRES: benchmarks
+// RUN: %{swiftc} %s -o %T/PrintObserverBenchmark
+// RUN: %T/PrintObserverBenchmark > %T/flushed.out 2> %T/flushed
+// RUN: %T/PrintObserverBenchmark --buffered-output > %T/buffered.out 2> %T/buffered
+// RUN: %{xctest_checker} %T/flushed %s
+// RUN: %{xctest_checker} %T/buffered %s
+// RUN: cat %T/flushed %T/buffered
+
+#if os(macOS)
+    import SwiftXCTest
+#else
+    import XCTest
+#endif
+
+// Runs 20,000 empty tests, whose progress is printed to a file, and reports
+// the time taken per test, which is mostly spent printing it. Compare the
+// time taken when each line is flushed with the time taken with
+// --buffered-output.
+
+/// Writes the time taken per test to stderr when the tests finish.
+class TimingObserver: XCTestObservation {
+    var start = Date()
+    var testCount = 0
+
+    func testBundleWillStart(_ testBundle: Bundle) {
+        start = Date()
+    }
+
+    func testCaseDidFinish(_ testCase: XCTestCase) {
+        testCount += 1
+    }
+
+    func testBundleDidFinish(_ testBundle: Bundle) {
+        let seconds = Date().timeIntervalSince(start)
+        let microseconds = seconds * 1_000_000 / Double(testCount)
+        let message = "Ran \(testCount) tests in \(String(format: "%.3f", seconds)) seconds, " +
+            "\(String(format: "%.1f", microseconds)) microseconds per test\n"
+        FileHandle.standardError.write(message.data(using: .utf8) ?? Data())
+    }
+}
+
+// CHECK: Ran 20000 tests in \d+\.\d+ seconds, \d+\.\d+ microseconds per test
+
+class EmptyTestCase: XCTestCase {}
+
+let allTests: [(String, XCTestCaseClosure)] = (0..<20_000).map { index in
+    return ("test_\(index)", { _ in })
+}
+XCTestObservationCenter.shared.addTestObserver(TimingObserver())
+XCTMain([(testCaseClass: EmptyTestCase.self, allTests: allTests)])
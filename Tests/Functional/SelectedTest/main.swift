@@ -3,10 +3,7 @@
 // RUN: %T/SelectedTest SelectedTest.ExecutedTestCase > %T/one_test_case_class || true
 // RUN: %T/SelectedTest SelectedTest.ExecutedTestCase/test_foo,SelectedTest.ExecutedTestCase/test_bar > %T/two_test_cases || true
 // RUN: %T/SelectedTest > %T/all || true
-// RUN: %{xctest_checker} -p "// CHECK-METHOD:" %T/one_test_case %s
-// RUN: %{xctest_checker} -p "// CHECK-CLASS:" %T/one_test_case_class %s
-// RUN: %{xctest_checker} -p "// CHECK-TWO-METHODS:" %T/two_test_cases %s
-// RUN: %{xctest_checker} -p "// CHECK-ALL:" %T/all %s
+// RUN: %{xctest_checker} -p "// CHECK-METHOD:" -p "// CHECK-CLASS:" -p "// CHECK-TWO-METHODS:" -p "// CHECK-ALL:" %T/one_test_case %T/one_test_case_class %T/two_test_cases %T/all %s
 
 #if os(macOS)
     import SwiftXCTest
@@ -0,0 +1,95 @@
+// RUN: %{swiftc} %s -o %T/SelectedTestPatterns
+// RUN: %T/SelectedTestPatterns 'SelectedTestPatterns.Matched*' > %T/class_glob || true
+// RUN: %T/SelectedTestPatterns 'SelectedTestPatterns.*/test_?oo' > %T/method_glob || true
+// RUN: %T/SelectedTestPatterns 're:Other.*/test_ba[rz]$' > %T/regular_expression || true
+// RUN: printf '# Selected by the file\n\nSelectedTestPatterns.MatchedTestCase/test_baz\nre:Other.*/test_bar\n' > %T/selectors
+// RUN: %T/SelectedTestPatterns @%T/selectors > %T/file || true
+// RUN: %{xctest_checker} -p "// CHECK-CLASS-GLOB:" -p "// CHECK-METHOD-GLOB:" -p "// CHECK-REGEX:" -p "// CHECK-FILE:" %T/class_glob %T/method_glob %T/regular_expression %T/file %s
+
+#if os(macOS)
+    import SwiftXCTest
+#else
+    import XCTest
+#endif
+
+// CHECK-CLASS-GLOB:  Test Suite 'Selected tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: Test Suite 'Selected tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-REGEX:       Test Suite 'Selected tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        Test Suite 'Selected tests' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+
+// CHECK-CLASS-GLOB:  Test Suite 'MatchedTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: Test Suite 'MatchedTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        Test Suite 'MatchedTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+class MatchedTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_foo", test_foo),
+            ("test_bar", test_bar),
+            ("test_baz", test_baz),
+        ]
+    }()
+
+// CHECK-CLASS-GLOB:  Test Case 'MatchedTestCase.test_foo' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-CLASS-GLOB:  Test Case 'MatchedTestCase.test_foo' passed \(\d+\.\d+ seconds\)
+// CHECK-METHOD-GLOB: Test Case 'MatchedTestCase.test_foo' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: Test Case 'MatchedTestCase.test_foo' passed \(\d+\.\d+ seconds\)
+    func test_foo() {}
+
+// CHECK-CLASS-GLOB:  Test Case 'MatchedTestCase.test_bar' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-CLASS-GLOB:  Test Case 'MatchedTestCase.test_bar' passed \(\d+\.\d+ seconds\)
+    func test_bar() {}
+
+// CHECK-CLASS-GLOB:  Test Case 'MatchedTestCase.test_baz' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-CLASS-GLOB:  Test Case 'MatchedTestCase.test_baz' passed \(\d+\.\d+ seconds\)
+// CHECK-FILE:        Test Case 'MatchedTestCase.test_baz' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        Test Case 'MatchedTestCase.test_baz' passed \(\d+\.\d+ seconds\)
+    func test_baz() {}
+}
+// CHECK-CLASS-GLOB:  Test Suite 'MatchedTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-CLASS-GLOB:  \t Executed 3 tests, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-METHOD-GLOB: Test Suite 'MatchedTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: \t Executed 1 test, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-FILE:        Test Suite 'MatchedTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        \t Executed 1 test, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+// CHECK-METHOD-GLOB: Test Suite 'OtherTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-REGEX:       Test Suite 'OtherTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        Test Suite 'OtherTestCase' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+class OtherTestCase: XCTestCase {
+    static var allTests = {
+        return [
+            ("test_foo", test_foo),
+            ("test_bar", test_bar),
+        ]
+    }()
+
+// CHECK-METHOD-GLOB: Test Case 'OtherTestCase.test_foo' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: Test Case 'OtherTestCase.test_foo' passed \(\d+\.\d+ seconds\)
+    func test_foo() {}
+
+// CHECK-REGEX:       Test Case 'OtherTestCase.test_bar' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-REGEX:       Test Case 'OtherTestCase.test_bar' passed \(\d+\.\d+ seconds\)
+// CHECK-FILE:        Test Case 'OtherTestCase.test_bar' started at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        Test Case 'OtherTestCase.test_bar' passed \(\d+\.\d+ seconds\)
+    func test_bar() {}
+}
+// CHECK-METHOD-GLOB: Test Suite 'OtherTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: \t Executed 1 test, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-REGEX:       Test Suite 'OtherTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-REGEX:       \t Executed 1 test, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-FILE:        Test Suite 'OtherTestCase' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        \t Executed 1 test, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+
+XCTMain([
+    testCase(MatchedTestCase.allTests),
+    testCase(OtherTestCase.allTests),
+])
+
+// CHECK-CLASS-GLOB:  Test Suite 'Selected tests' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-CLASS-GLOB:  \t Executed 3 tests, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-METHOD-GLOB: Test Suite 'Selected tests' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-METHOD-GLOB: \t Executed 2 tests, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-REGEX:       Test Suite 'Selected tests' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-REGEX:       \t Executed 1 test, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
+// CHECK-FILE:        Test Suite 'Selected tests' passed at \d+-\d+-\d+ \d+:\d+:\d+\.\d+
+// CHECK-FILE:        \t Executed 2 tests, with 0 failures \(0 unexpected\) in \d+\.\d+ \(\d+\.\d+\) seconds
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# generate_test_cases.py - Generates a large suite for main.swift -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+"""
+Writes GeneratedTestCases.swift, which declares the given number of empty
+XCTestCase classes in an array named 'generatedTestCaseClasses', and a
+'selectors' file, which selects the first few methods of every class, to the
+given directory.
+"""
+
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--module-name', required=True)
+    parser.add_argument('--classes', type=int, required=True)
+    parser.add_argument('--selected-methods', type=int, required=True,
+                        help='The number of methods to select in each class.')
+    parser.add_argument('directory')
+    args = parser.parse_args()
+
+    with open(os.path.join(args.directory, 'GeneratedTestCases.swift'),
+              'w') as f:
+        f.write('#if os(macOS)\n'
+                '    import SwiftXCTest\n'
+                '#else\n'
+                '    import XCTest\n'
+                '#endif\n\n')
+        for index in range(args.classes):
+            f.write('final class TestCase{}: XCTestCase {{}}\n'.format(index))
+        f.write('\nlet generatedTestCaseClasses: [XCTestCase.Type] = [\n')
+        for index in range(args.classes):
+            f.write('    TestCase{}.self,\n'.format(index))
+        f.write(']\n')
+
+    with open(os.path.join(args.directory, 'selectors'), 'w') as f:
+        for index in range(args.classes):
+            for method in range(args.selected_methods):
+                f.write('{}.TestCase{}/test_{}\n'.format(
+                    args.module_name, index, method))
+
+
+if __name__ == '__main__':
+    main()
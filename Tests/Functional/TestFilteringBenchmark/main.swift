@@ -0,0 +1,49 @@
+// REQUIRES: benchmarks
+// RUN: %{python} %S/generate_test_cases.py --module-name TestFilteringBenchmark --classes 500 --selected-methods 20 %T
+// RUN: %{swiftc} %s %T/GeneratedTestCases.swift -module-name TestFilteringBenchmark -o %T/TestFilteringBenchmark
+// RUN: %T/TestFilteringBenchmark @%T/selectors > %t
+// RUN: %{xctest_checker} %t %s
+
+#if os(macOS)
+    import SwiftXCTest
+#else
+    import XCTest
+#endif
+
+// Selects 10,000 of 50,000 tests, in 500 classes of 100 methods each, with a
+// file of one selector per test, and reports the time taken before the first
+// test starts, which is spent parsing the selectors and filtering the tests.
+
+/// Prints the time taken to select the tests when the first suite starts.
+class StartupObserver: XCTestObservation {
+    let start: Date
+    var reported = false
+
+    init(start: Date) {
+        self.start = start
+    }
+
+    func testSuiteWillStart(_ testSuite: XCTestSuite) {
+        guard !reported else { return }
+        reported = true
+        let seconds = Date().timeIntervalSince(start)
+        print("Selected \(testSuite.testCaseCount) tests in \(String(format: "%.3f", seconds)) seconds")
+    }
+
+    func testBundleDidFinish(_ testBundle: Bundle) {
+        print("Finished")
+    }
+}
+
+// CHECK: Selected 10000 tests in \d+\.\d+ seconds
+// CHECK: Finished
+
+let methods: [(String, XCTestCaseClosure)] = (0..<100).map { index in
+    return ("test_\(index)", { _ in })
+}
+let start = Date()
+XCTMain(
+    generatedTestCaseClasses.map { (testCaseClass: $0, allTests: methods) },
+    arguments: CommandLine.arguments,
+    observers: [StartupObserver(start: start)]
+)
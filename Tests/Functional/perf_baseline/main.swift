@@ -0,0 +1 @@
+// RUN: cd %S && %{python} -m unittest discover
@@ -0,0 +1,220 @@
+# perf_baseline/main.py - Record and compare XCTest measurements -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from __future__ import absolute_import
+
+import argparse
+import json
+import sys
+import textwrap
+
+from . import parse
+from . import statistics
+from . import store
+
+# The outcomes of comparing a measurement with its baseline.
+NEW = 'new'
+UNCHANGED = 'unchanged'
+REGRESSED = 'regressed'
+IMPROVED = 'improved'
+
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.05
+
+
+class Comparison(object):
+    """
+    The result of comparing the values of one metric measured by one test
+    with those recorded for it in a baseline.
+    """
+    __slots__ = ('test', 'metric_id', 'outcome', 'baseline_median',
+                 'current_median', 'p_value')
+
+    def __init__(self, test, metric_id, outcome, baseline_median=None,
+                 current_median=None, p_value=None):
+        self.test = test
+        self.metric_id = metric_id
+        self.outcome = outcome
+        self.baseline_median = baseline_median
+        self.current_median = current_median
+        self.p_value = p_value
+
+    @property
+    def change(self):
+        """
+        The relative change in the median, or None if it can't be computed.
+        """
+        if not self.baseline_median or self.current_median is None:
+            return None
+        return self.current_median / self.baseline_median - 1.0
+
+
+def compare(baselines, host, measurements, alpha=DEFAULT_ALPHA,
+            min_change=DEFAULT_MIN_CHANGE):
+    """
+    Compares each metric in the given measurements with its baseline on the
+    given host, and returns a list of comparisons, one for each metric of
+    each test, in the order they were first measured.
+
+    A metric has regressed if the one-sided Mann-Whitney U test finds its
+    values larger than the baseline's, with a p-value below 'alpha', and its
+    median is larger by more than 'min_change', so that a shift too small to
+    matter isn't reported however consistent it is. Improvements are found
+    in the same way.
+    """
+    pooled = {}
+    for measurement in measurements:
+        key = (measurement.test, measurement.metric_id)
+        pooled.setdefault(key, []).extend(measurement.values)
+
+    comparisons = []
+    for (test, metric_id), current in pooled.items():
+        baseline = baselines.baseline(host, test, metric_id)
+        if not baseline:
+            comparisons.append(Comparison(
+                test, metric_id, NEW,
+                current_median=statistics.median(current)))
+            continue
+        baseline_median = statistics.median(baseline)
+        current_median = statistics.median(current)
+        slower = statistics.mann_whitney(baseline, current)
+        faster = statistics.mann_whitney(current, baseline)
+        outcome, p_value = UNCHANGED, min(slower, faster)
+        if slower < alpha and \
+                current_median > baseline_median * (1 + min_change):
+            outcome, p_value = REGRESSED, slower
+        elif faster < alpha and \
+                current_median < baseline_median * (1 - min_change):
+            outcome, p_value = IMPROVED, faster
+        comparisons.append(Comparison(
+            test, metric_id, outcome, baseline_median=baseline_median,
+            current_median=current_median, p_value=p_value))
+    return comparisons
+
+
+def _format(comparison):
+    if comparison.outcome == NEW:
+        return '{}: {} {} (median {:.6f}, no baseline)'.format(
+            comparison.outcome.upper(), comparison.test,
+            comparison.metric_id, comparison.current_median)
+    return '{}: {} {} (median {:.6f} -> {:.6f}, {:+.1%}, p={:.4f})'.format(
+        comparison.outcome.upper(), comparison.test, comparison.metric_id,
+        comparison.baseline_median, comparison.current_median,
+        comparison.change or 0.0, comparison.p_value)
+
+
+def _parse_outputs(paths):
+    measurements = []
+    for path in paths:
+        measurements.extend(parse.parse_file(path))
+    return measurements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='perf_baseline.py',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=textwrap.dedent("""
+            Records the values that XCTest's measure() blocks print, as a
+            baseline for each host, and reports the tests whose values have
+            since become significantly larger."""))
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    parse_parser = subparsers.add_parser(
+        'parse',
+        help='Print the measurements in XCTest output as JSON, and fail if '
+             'there are none.')
+    parse_parser.add_argument('outputs', nargs='+', metavar='OUTPUT',
+                              help='A file of XCTest output, or "-" to read '
+                                   'standard input.')
+
+    for name, help in (('record', 'Record the measurements in XCTest output '
+                                  'as the baseline for this host.'),
+                       ('compare', 'Compare the measurements in XCTest output '
+                                   'with the baseline for this host, and '
+                                   'fail if any have regressed.')):
+        subparser = subparsers.add_parser(name, help=help)
+        subparser.add_argument('--store', required=True,
+                               help='The JSON file that baselines are kept '
+                                    'in. It is created if it does not exist.')
+        subparser.add_argument('--host',
+                               help='The host to record or compare the '
+                                    'baseline of. Defaults to a fingerprint '
+                                    'of this machine.')
+        subparser.add_argument('outputs', nargs='+', metavar='OUTPUT',
+                               help='A file of XCTest output, or "-" to read '
+                                    'standard input.')
+        if name == 'compare':
+            subparser.add_argument('--alpha', type=float,
+                                   default=DEFAULT_ALPHA,
+                                   help='The significance level of the test '
+                                        'for a regression. %(default)s by '
+                                        'default.')
+            subparser.add_argument('--min-change', type=float,
+                                   default=DEFAULT_MIN_CHANGE,
+                                   help='The smallest relative change in the '
+                                        'median that is reported. '
+                                        '%(default)s by default.')
+            subparser.add_argument('--update', action='store_true',
+                                   help='Record the measurements as the new '
+                                        'baseline if none have regressed.')
+    args = parser.parse_args(argv)
+
+    measurements = _parse_outputs(args.outputs)
+    if args.command == 'parse':
+        json.dump([{'test': m.test,
+                    'metric': m.metric,
+                    'metric_id': m.metric_id,
+                    'values': m.values,
+                    'file': m.file,
+                    'line': m.line} for m in measurements],
+                  sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        if not measurements:
+            sys.stderr.write('perf_baseline: no measurements found\n')
+            return 1
+        return 0
+
+    if args.host is None:
+        description = store.host_description()
+        host = store.host_fingerprint(description)
+    else:
+        description, host = None, args.host
+    try:
+        baselines = store.BaselineStore(args.store)
+    except store.StoreError as error:
+        sys.stderr.write('perf_baseline: {}\n'.format(error))
+        return 1
+
+    if args.command == 'record':
+        baselines.record(host, measurements, description=description)
+        baselines.save()
+        sys.stderr.write('perf_baseline: recorded {} measurements for host '
+                         '{}\n'.format(len(measurements), host))
+        return 0
+
+    comparisons = compare(baselines, host, measurements, alpha=args.alpha,
+                          min_change=args.min_change)
+    for comparison in comparisons:
+        sys.stdout.write(_format(comparison) + '\n')
+    regressions = [c for c in comparisons if c.outcome == REGRESSED]
+    if regressions:
+        sys.stderr.write('perf_baseline: {} of {} measurements regressed\n'
+                         .format(len(regressions), len(comparisons)))
+        return 1
+    if args.update:
+        baselines.record(host, measurements, description=description)
+        baselines.save()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
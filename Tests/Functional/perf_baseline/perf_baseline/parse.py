@@ -0,0 +1,90 @@
+# perf_baseline/parse.py - Reads measurements from XCTest output -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import re
+import sys
+
+# The line PrintObserver prints for each metric measured by a measure()
+# block, such as:
+#
+#   /path/main.swift:42: Test Case 'Foo.test_bar' measured [Time, seconds]
+#   average: 0.001, relative standard deviation: 3.000%, values: [...],
+#   performanceMetricID:org.swift.XCTPerformanceMetric_WallClockTime, ...
+#
+# all on one line.
+_MEASURED = re.compile(
+    r"^(?P<file>.*):(?P<line>\d+): Test Case '(?P<test>[^']+)' measured "
+    r"\[(?P<metric>[^\]]+)\] (?P<results>.*)$")
+_VALUES = re.compile(r"values: \[(?P<values>[^\]]*)\]")
+_METRIC_ID = re.compile(r"performanceMetricID:(?P<id>[^,\s]+)")
+
+
+class Measurement(object):
+    """
+    The values of one metric, measured by one measure() block of a test.
+    """
+    __slots__ = ('test', 'metric', 'metric_id', 'values', 'file', 'line')
+
+    def __init__(self, test, metric, metric_id, values, file=None, line=None):
+        self.test = test
+        self.metric = metric
+        self.metric_id = metric_id
+        self.values = values
+        self.file = file
+        self.line = line
+
+    def __eq__(self, other):
+        return isinstance(other, Measurement) and \
+            (self.test, self.metric, self.metric_id, self.values) == \
+            (other.test, other.metric, other.metric_id, other.values)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Measurement({!r}, {!r}, {!r}, {!r})'.format(
+            self.test, self.metric, self.metric_id, self.values)
+
+
+def parse_lines(lines):
+    """
+    Returns a list of the measurements reported in the given lines of XCTest
+    output, in the order they were reported. Lines that report no values,
+    such as those for a measurement that was aborted, are skipped.
+    """
+    measurements = []
+    for line in lines:
+        match = _MEASURED.match(line.rstrip('\r\n'))
+        if match is None:
+            continue
+        results = match.group('results')
+        values = _VALUES.search(results)
+        if values is None or not values.group('values').strip():
+            continue
+        metric_id = _METRIC_ID.search(results)
+        measurements.append(Measurement(
+            match.group('test'),
+            match.group('metric'),
+            metric_id.group('id') if metric_id else match.group('metric'),
+            [float(value) for value in values.group('values').split(',')],
+            file=match.group('file'),
+            line=int(match.group('line'))))
+    return measurements
+
+
+def parse_file(path):
+    """
+    Returns the measurements reported in the XCTest output at the given
+    path, or on standard input if the path is "-".
+    """
+    if path == '-':
+        return parse_lines(sys.stdin)
+    with open(path) as f:
+        return parse_lines(f)
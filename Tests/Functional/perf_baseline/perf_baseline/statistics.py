@@ -0,0 +1,106 @@
+# perf_baseline/statistics.py - Compares samples of measurements -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import math
+
+# The largest number of pairs of values for which the exact distribution of
+# the U statistic is computed. XCTest takes ten measurements per block, so
+# two runs make 100 pairs.
+_MAX_EXACT_PAIRS = 2500
+
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2.0
+
+
+def u_statistic(baseline, current):
+    """
+    Returns the Mann-Whitney U statistic of 'current' against 'baseline': the
+    number of pairs of a baseline and a current value in which the current
+    value is larger, with ties counted as half.
+    """
+    u = 0.0
+    for c in current:
+        for b in baseline:
+            if c > b:
+                u += 1.0
+            elif c == b:
+                u += 0.5
+    return u
+
+
+def _exact_upper_tail(m, n, u):
+    """
+    Returns the probability that U is at least 'u' for samples of sizes 'm'
+    and 'n' drawn from the same distribution, with no ties, by counting the
+    orderings of the samples that produce each value of U.
+    """
+    # Considering the largest of all the values: if it is a current value,
+    # it is larger than each of the i baseline values, so the number of
+    # orderings f(i, j, k) of i baseline and j current values for which U is
+    # k is f(i, j - 1, k - i) + f(i - 1, j, k). Each row holds f(i, j, k) for
+    # every j and k, for the next i.
+    pairs = m * n
+    row = [[1] + [0] * pairs for _ in range(n + 1)]
+    for i in range(1, m + 1):
+        previous, row = row, [[1] + [0] * pairs]
+        for j in range(1, n + 1):
+            distribution = list(previous[j])
+            shorter = row[j - 1]
+            for k in range(i, pairs + 1):
+                distribution[k] += shorter[k - i]
+            row.append(distribution)
+    counts = row
+    total = sum(counts[n])
+    return sum(counts[n][int(math.ceil(u)):]) / float(total)
+
+
+def _normal_upper_tail(baseline, current, u):
+    """
+    Returns the probability that U is at least 'u', by the normal
+    approximation to its distribution, corrected for ties and continuity.
+    """
+    m, n = len(baseline), len(current)
+    size = m + n
+    counts = {}
+    for value in baseline + current:
+        counts[value] = counts.get(value, 0) + 1
+    ties = sum(t ** 3 - t for t in counts.values())
+    variance = m * n / 12.0 * ((size + 1) - ties / float(size * (size - 1)))
+    if variance <= 0:
+        # Every value is the same.
+        return 1.0
+    z = (u - m * n / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney(baseline, current):
+    """
+    Tests whether the values in 'current' tend to be larger than those in
+    'baseline', with the one-sided Mann-Whitney U test, which assumes nothing
+    about the shape of the distribution the values are drawn from. Returns
+    the p-value: the probability of values at least this much larger if
+    both samples were drawn from the same distribution.
+
+    The exact distribution of U is used for small samples without ties, and
+    the normal approximation otherwise.
+    """
+    if not baseline or not current:
+        raise ValueError('Both samples must contain at least one value.')
+    u = u_statistic(baseline, current)
+    m, n = len(baseline), len(current)
+    distinct = len(set(baseline + current)) == m + n
+    if distinct and m * n <= _MAX_EXACT_PAIRS:
+        return _exact_upper_tail(m, n, u)
+    return _normal_upper_tail(baseline, current, u)
@@ -0,0 +1,124 @@
+# perf_baseline/store.py - Stores baseline measurements per host -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import hashlib
+import json
+import os
+import platform
+import tempfile
+import time
+
+# Bump this whenever the format of the store changes incompatibly.
+_FORMAT_VERSION = 1
+
+
+def _cpu_model():
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except (IOError, OSError):
+        pass
+    return platform.processor()
+
+
+class StoreError(Exception):
+    """
+    An error reading a baseline store, whose message names the file.
+    """
+
+
+def host_description():
+    """
+    Returns a dictionary describing the kind of machine that measurements are
+    taken on, since they can only be compared with measurements taken on the
+    same kind of machine. The host's name is left out, so that the ephemeral
+    machines of a CI service, each named differently, share a baseline.
+    """
+    return {
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'cpu': _cpu_model(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def host_fingerprint(description=None):
+    """
+    Returns a short identifier for the given host description, which
+    defaults to that of this machine.
+    """
+    if description is None:
+        description = host_description()
+    return hashlib.sha1(json.dumps(description, sort_keys=True)
+                        .encode('utf-8')).hexdigest()[:12]
+
+
+class BaselineStore(object):
+    """
+    A JSON file of the values most recently recorded for each metric
+    measured by each test, kept separately for each host.
+    """
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.data = json.load(f)
+        except (IOError, OSError):
+            self.data = {}
+        except ValueError as error:
+            raise StoreError('{} is not a valid baseline store: {}. Delete '
+                             'it to record new baselines.'.format(path,
+                                                                  error))
+        if not isinstance(self.data, dict):
+            raise StoreError('{} is not a valid baseline store: expected a '
+                             'JSON object. Delete it to record new '
+                             'baselines.'.format(path))
+        if self.data.get('version') != _FORMAT_VERSION:
+            self.data = {'version': _FORMAT_VERSION, 'hosts': {}}
+
+    def baseline(self, host, test, metric_id):
+        """
+        Returns the values recorded for the given metric of the given test on
+        the given host, or None if there are none.
+        """
+        entry = self.data['hosts'].get(host, {}).get('tests', {}) \
+            .get(test, {}).get(metric_id)
+        return None if entry is None else entry['values']
+
+    def record(self, host, measurements, description=None):
+        """
+        Replaces the baseline of each of the given measurements on the given
+        host with its values. If a test measures the same metric more than
+        once, the values of each are pooled.
+        """
+        entry = self.data['hosts'].setdefault(host, {'tests': {}})
+        if description is not None:
+            entry['description'] = description
+        recorded = {}
+        for measurement in measurements:
+            key = (measurement.test, measurement.metric_id)
+            recorded.setdefault(key, []).extend(measurement.values)
+        now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        for (test, metric_id), values in recorded.items():
+            entry['tests'].setdefault(test, {})[metric_id] = {
+                'values': values,
+                'recorded': now,
+            }
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,161 @@
+# test_main.py - Unit tests for perf_baseline.main -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from perf_baseline import main
+from perf_baseline import parse
+from perf_baseline import store
+from perf_baseline.parse import Measurement
+
+from .test_parse import PERFORMANCE_OUTPUT
+
+_SLEEP_TEST = 'PerformanceTestCase.test_printsValuesAfterMeasuring'
+
+
+def _scaled(measurements, test, factor):
+    """
+    Returns the given measurements, with the values of the given test
+    multiplied by the given factor.
+    """
+    return [Measurement(m.test, m.metric, m.metric_id,
+                        [v * factor for v in m.values]
+                        if m.test == test else m.values)
+            for m in measurements]
+
+
+class PerfBaselineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.directory, 'baselines.json')
+        self.measurements = parse.parse_file(PERFORMANCE_OUTPUT)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def baselines(self):
+        baselines = store.BaselineStore(self.store_path)
+        baselines.record('host', self.measurements)
+        baselines.save()
+        return store.BaselineStore(self.store_path)
+
+
+class StoreTestCase(PerfBaselineTestCase):
+    def test_round_trips_values_per_host(self):
+        baselines = self.baselines()
+        self.assertEqual(
+            baselines.baseline('host', _SLEEP_TEST,
+                               self.measurements[4].metric_id),
+            self.measurements[4].values)
+        self.assertIsNone(baselines.baseline(
+            'other host', _SLEEP_TEST, self.measurements[4].metric_id))
+
+    def test_fingerprint_depends_on_host(self):
+        description = store.host_description()
+        self.assertEqual(store.host_fingerprint(description),
+                         store.host_fingerprint(description))
+        description['cpus'] = (description['cpus'] or 0) + 1
+        self.assertNotEqual(store.host_fingerprint(description),
+                            store.host_fingerprint())
+
+    def test_fingerprint_does_not_depend_on_host_name(self):
+        self.assertNotIn('node', store.host_description())
+
+
+class CompareTestCase(PerfBaselineTestCase):
+    def outcomes(self, measurements, **kwargs):
+        return dict((c.test, c.outcome) for c in main.compare(
+            self.baselines(), 'host', measurements, **kwargs))
+
+    def test_same_values_are_unchanged(self):
+        outcomes = self.outcomes(self.measurements)
+        self.assertEqual(set(outcomes.values()), set([main.UNCHANGED]))
+
+    def test_slower_values_regress(self):
+        outcomes = self.outcomes(_scaled(self.measurements, _SLEEP_TEST, 1.1))
+        self.assertEqual(outcomes[_SLEEP_TEST], main.REGRESSED)
+        self.assertEqual(
+            [test for test, outcome in outcomes.items()
+             if outcome != main.UNCHANGED], [_SLEEP_TEST])
+
+    def test_faster_values_improve(self):
+        outcomes = self.outcomes(_scaled(self.measurements, _SLEEP_TEST, 0.9))
+        self.assertEqual(outcomes[_SLEEP_TEST], main.IMPROVED)
+
+    def test_small_consistent_change_is_not_reported(self):
+        # Every value is larger, which is significant, but only by 1%.
+        outcomes = self.outcomes(
+            _scaled(self.measurements, _SLEEP_TEST, 1.01))
+        self.assertEqual(outcomes[_SLEEP_TEST], main.UNCHANGED)
+        outcomes = self.outcomes(
+            _scaled(self.measurements, _SLEEP_TEST, 1.01), min_change=0.005)
+        self.assertEqual(outcomes[_SLEEP_TEST], main.REGRESSED)
+
+    def test_unknown_tests_are_new(self):
+        outcomes = self.outcomes([Measurement('Foo.test_new', 'Time, seconds',
+                                              'time', [1.0, 2.0])])
+        self.assertEqual(outcomes, {'Foo.test_new': main.NEW})
+
+
+class MainTestCase(PerfBaselineTestCase):
+    def run_main(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            status = main.main(list(argv))
+        return status, stdout.getvalue()
+
+    def test_record_then_compare(self):
+        status, _ = self.run_main('record', '--store', self.store_path,
+                                  '--host', 'ci', PERFORMANCE_OUTPUT)
+        self.assertEqual(status, 0)
+        status, output = self.run_main('compare', '--store', self.store_path,
+                                       '--host', 'ci', PERFORMANCE_OUTPUT)
+        self.assertEqual(status, 0)
+        self.assertIn('UNCHANGED: ' + _SLEEP_TEST, output)
+
+    def test_compare_fails_on_regression(self):
+        self.baselines()
+        slower = os.path.join(self.directory, 'slower.txt')
+        with open(PERFORMANCE_OUTPUT) as f, open(slower, 'w') as out:
+            for line in f:
+                # Each value of the sleeping test begins with "1.000".
+                out.write(line.replace(', 1.000', ', 1.200')
+                          .replace('[1.000', '[1.200'))
+        status, output = self.run_main('compare', '--store', self.store_path,
+                                       '--host', 'host', slower)
+        self.assertEqual(status, 1)
+        self.assertIn('REGRESSED: ' + _SLEEP_TEST, output)
+
+    def test_corrupt_store_fails_with_message(self):
+        with open(self.store_path, 'w') as f:
+            f.write('{"version": 1, "hosts": {')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = main.main(['compare', '--store', self.store_path,
+                                PERFORMANCE_OUTPUT])
+        self.assertEqual(status, 1)
+        self.assertIn(self.store_path + ' is not a valid baseline store',
+                      stderr.getvalue())
+
+    def test_parse_fails_without_measurements(self):
+        empty = os.path.join(self.directory, 'empty.txt')
+        open(empty, 'w').close()
+        self.assertEqual(self.run_main('parse', empty)[0], 1)
+        self.assertEqual(self.run_main('parse', PERFORMANCE_OUTPUT)[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
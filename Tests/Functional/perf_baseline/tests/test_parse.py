@@ -0,0 +1,68 @@
+# test_parse.py - Unit tests for perf_baseline.parse -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import os
+import unittest
+
+from perf_baseline import parse
+from perf_baseline.parse import Measurement
+
+# The output of Tests/Functional/Performance, which passes that test's checks.
+PERFORMANCE_OUTPUT = os.path.join(
+    os.path.dirname(__file__), 'Inputs', 'Performance.txt')
+
+_WALL_CLOCK_TIME = 'org.swift.XCTPerformanceMetric_WallClockTime'
+
+
+class ParseTestCase(unittest.TestCase):
+    def test_parses_performance_test_output(self):
+        measurements = parse.parse_file(PERFORMANCE_OUTPUT)
+        self.assertEqual(
+            [m.test for m in measurements],
+            ['PerformanceTestCase.' + name for name in [
+                'test_measureBlockIteratesTenTimes',
+                'test_measuresMetricsWithAutomaticStartAndStop',
+                'test_measuresMetricsWithManualStartAndStop',
+                'test_measuresMetricsWithoutExplicitStop',
+                'test_printsValuesAfterMeasuring',
+                'test_measuresWallClockTimeInBlock']])
+        for measurement in measurements:
+            self.assertEqual(measurement.metric, 'Time, seconds')
+            self.assertEqual(measurement.metric_id, _WALL_CLOCK_TIME)
+            self.assertEqual(len(measurement.values), 10)
+        self.assertTrue(all(1.0 < value < 1.01
+                            for value in measurements[4].values))
+        self.assertTrue(measurements[4].file.endswith('main.swift'))
+
+    def test_parses_values(self):
+        line = ("/tmp/main.swift:12: Test Case '-[Foo test_bar]' measured "
+                "[Time, seconds] average: 0.002, relative standard deviation: "
+                "50.000%, values: [0.001000, 0.003000], performanceMetricID:"
+                "org.swift.XCTPerformanceMetric_WallClockTime, "
+                "maxPercentRelativeStandardDeviation: 10.000%, "
+                "maxStandardDeviation: 0.100\n")
+        self.assertEqual(parse.parse_lines([line]), [
+            Measurement('-[Foo test_bar]', 'Time, seconds', _WALL_CLOCK_TIME,
+                        [0.001, 0.003])])
+
+    def test_skips_measurements_without_values(self):
+        line = ("/tmp/main.swift:12: Test Case 'Foo.test_bar' measured "
+                "[Time, seconds] average: 0.000, values: []")
+        self.assertEqual(parse.parse_lines([line]), [])
+
+    def test_skips_other_lines(self):
+        self.assertEqual(parse.parse_lines([
+            "Test Case 'Foo.test_bar' started at 2016-01-01 00:00:00.000",
+            "Test Case 'Foo.test_bar' passed (0.001 seconds)",
+        ]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# test_statistics.py - Unit tests for perf_baseline.statistics -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import unittest
+
+from perf_baseline import statistics
+
+
+class MedianTestCase(unittest.TestCase):
+    def test_odd(self):
+        self.assertEqual(statistics.median([3, 1, 2]), 2)
+
+    def test_even(self):
+        self.assertEqual(statistics.median([4, 1, 2, 3]), 2.5)
+
+
+class MannWhitneyTestCase(unittest.TestCase):
+    def test_u_counts_ties_as_half(self):
+        self.assertEqual(statistics.u_statistic([1, 2], [2, 3]), 3.5)
+
+    def test_exact_p_value_of_complete_separation(self):
+        # Only one of the 20 orderings of three values against three puts
+        # every current value above every baseline value.
+        self.assertAlmostEqual(
+            statistics.mann_whitney([1, 2, 3], [4, 5, 6]), 1 / 20.0)
+
+    def test_exact_p_value_matches_enumeration(self):
+        # Of the 126 ways of choosing which of nine ranks are the current
+        # sample's five, 7 give U >= 17.
+        p = statistics.mann_whitney([1, 2, 4, 6], [3, 5, 7, 8, 9])
+        self.assertEqual(statistics.u_statistic([1, 2, 4, 6],
+                                                [3, 5, 7, 8, 9]), 17)
+        self.assertAlmostEqual(p, 7 / 126.0)
+
+    def test_identical_samples_are_not_significant(self):
+        values = [0.1 * i for i in range(10)]
+        self.assertGreater(statistics.mann_whitney(values, values), 0.4)
+
+    def test_shifted_samples_are_significant(self):
+        baseline = [1.0 + 0.01 * i for i in range(10)]
+        current = [value + 0.2 for value in baseline]
+        self.assertLess(statistics.mann_whitney(baseline, current), 1e-4)
+        self.assertGreater(statistics.mann_whitney(current, baseline), 0.99)
+
+    def test_normal_approximation_with_ties(self):
+        baseline = [1.0] * 5 + [2.0] * 5
+        current = [2.0] * 5 + [3.0] * 5
+        self.assertLess(statistics.mann_whitney(baseline, current), 0.01)
+
+    def test_every_value_equal(self):
+        self.assertEqual(statistics.mann_whitney([1.0] * 3, [1.0] * 3), 1.0)
+
+    def test_empty_sample_raises(self):
+        with self.assertRaises(ValueError):
+            statistics.mann_whitney([], [1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
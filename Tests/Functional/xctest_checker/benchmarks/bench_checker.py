@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# benchmarks/bench_checker.py - xctest_checker hot path benchmark -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+"""
+Measures the throughput and peak memory of checking synthetic XCTest output
+of sizes from 10 to 1,000,000 lines, the throughput of [[@LINE]]
+substitution, and the time taken to start xctest_checker. Each size is
+checked in a fresh process, so that peak memory is measured accurately. Run
+from the xctest_checker directory:
+
+    python -m benchmarks.bench_checker --max-lines 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from xctest_checker import line
+
+from . import synthetic
+
+_CHECKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CHECKER = os.path.join(_CHECKER_DIR, 'xctest_checker.py')
+
+_SIZES = (10, 100, 1000, 10000, 100000, 1000000)
+
+# One test case in this many fails, so that failure lines and [[@LINE]]
+# substitutions are represented, as they are in real functional tests.
+_FAILURE_EVERY = 10
+
+
+def _max_rss_bytes(usage):
+    # ru_maxrss is in bytes on Darwin, but in kilobytes elsewhere.
+    if sys.platform == 'darwin':
+        return usage.ru_maxrss
+    return usage.ru_maxrss * 1024
+
+
+def _measure(actual, expected):
+    """
+    Checks the given files in a fresh process, and returns a tuple of the
+    time taken, in seconds, and the peak memory of that process, in bytes.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_checker',
+         '--child', actual, expected],
+        cwd=_CHECKER_DIR)
+    result = json.loads(output.decode('utf-8'))
+    return result['seconds'], result['max_rss']
+
+
+def _child(actual, expected):
+    # Imported here, so that the time taken to import the checker is not
+    # counted against the size being measured.
+    from xctest_checker import compare
+    start = time.time()
+    compare.compare(actual, expected, '// CHECK: ')
+    seconds = time.time() - start
+    json.dump({'seconds': seconds,
+               'max_rss': _max_rss_bytes(
+                   resource.getrusage(resource.RUSAGE_SELF))},
+              sys.stdout)
+
+
+def _substitution_throughput(expected, repeat):
+    """
+    Returns the number of expected lines per second that [[@LINE]]
+    substitution processes, for the lines in the given file.
+    """
+    with open(expected) as f:
+        lines = [(text.split('// CHECK: ', 1)[1].strip(), index + 1)
+                 for index, text in enumerate(f)]
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for expected_line, line_number in lines:
+            line.replace_offsets(expected_line, line_number)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / max(best, 1e-9)
+
+
+def _startup_time(actual, expected, repeat):
+    """
+    Returns the best time taken to run xctest_checker.py on the given files,
+    and the best time taken to start the Python interpreter alone, in
+    seconds.
+    """
+    def best(command):
+        times = []
+        for _ in range(repeat):
+            start = time.time()
+            subprocess.check_call(command)
+            times.append(time.time() - start)
+        return min(times)
+    return (best([sys.executable, _CHECKER, actual, expected]),
+            best([sys.executable, '-c', 'pass']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--max-lines', type=int, default=_SIZES[-1],
+                        help='The largest number of lines of output to '
+                             'check. Sizes above this are skipped.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='The number of times to run each measurement. '
+                             'The best time and the largest peak memory are '
+                             'reported.')
+    parser.add_argument('--json',
+                        help='Also write the results to this file, so that '
+                             'they can be compared between revisions.')
+    parser.add_argument('--child', nargs=2, metavar=('ACTUAL', 'EXPECTED'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    results = {'sizes': []}
+    directory = tempfile.mkdtemp()
+    try:
+        # Each passing test case emits two lines, and each failing one three.
+        lines_per_test = 2 + 1.0 / _FAILURE_EVERY
+        for size in _SIZES:
+            if size > args.max_lines:
+                break
+            actual, expected = synthetic.write(
+                directory, 'Size{}'.format(size),
+                max(1, int(size / lines_per_test)),
+                failure_every=_FAILURE_EVERY)
+            measurements = [_measure(actual, expected)
+                            for _ in range(args.repeat)]
+            seconds = min(m[0] for m in measurements)
+            max_rss = max(m[1] for m in measurements)
+            with open(expected) as f:
+                line_count = sum(1 for _ in f)
+            results['sizes'].append({
+                'lines': line_count,
+                'seconds': seconds,
+                'lines_per_second': line_count / max(seconds, 1e-9),
+                'max_rss': max_rss,
+                'substitutions_per_second': _substitution_throughput(
+                    expected, args.repeat),
+            })
+
+        actual, expected = synthetic.write(directory, 'Startup', 4)
+        results['startup_seconds'], results['interpreter_seconds'] = \
+            _startup_time(actual, expected, args.repeat)
+    finally:
+        shutil.rmtree(directory)
+
+    print('{:>9}  {:>10}  {:>12}  {:>10}  {:>14}'.format(
+        'lines', 'seconds', 'lines/s', 'peak MiB', '[[@LINE]]/s'))
+    for size in results['sizes']:
+        print('{:>9}  {:>10.4f}  {:>12.0f}  {:>10.1f}  {:>14.0f}'.format(
+            size['lines'], size['seconds'], size['lines_per_second'],
+            size['max_rss'] / float(1 << 20),
+            size['substitutions_per_second']))
+    print('startup: {:.1f}ms ({:.1f}ms of which is the interpreter)'.format(
+        1000 * results['startup_seconds'],
+        1000 * results['interpreter_seconds']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
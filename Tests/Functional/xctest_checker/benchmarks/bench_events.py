@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# benchmarks/bench_events.py - Event stream checking benchmark -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+"""
+Compares the time taken to check the text output of a synthetic XCTest run
+against its CHECK lines, whose timestamps and durations are matched by
+regular expressions, with the time taken to check the JSON lines event
+stream of the same run with --events. Run from the xctest_checker directory:
+
+    python -m benchmarks.bench_events --tests 10 --tests 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+from xctest_checker import compare
+from xctest_checker import events
+
+from . import synthetic
+
+
+def _best_of(repeat, check):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        check()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _measure(directory, test_count, failure_every, repeat):
+    text_actual, text_expected = synthetic.write(
+        directory, 'Text{}'.format(test_count), test_count,
+        failure_every=failure_every)
+    events_actual, events_expected = synthetic.write(
+        directory, 'Events{}'.format(test_count), test_count,
+        failure_every=failure_every, events=True)
+    text = _best_of(repeat, lambda: compare.compare(
+        text_actual, text_expected, '// CHECK: '))
+    structured = _best_of(repeat, lambda: events.compare_events(
+        events_actual, events_expected, '// EVENT: '))
+    with open(events_actual) as f:
+        event_count = sum(1 for _ in f)
+    return {
+        'tests': test_count,
+        'events': event_count,
+        'text_seconds': text,
+        'events_seconds': structured,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--tests', type=int, action='append',
+                        help='The number of test cases in a run. May be '
+                             'given more than once. Defaults to 10, 1000 '
+                             'and 100000.')
+    parser.add_argument('--failure-every', type=int, default=10,
+                        help='Fail every test case at a multiple of this.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='The number of times each check is timed; the '
+                             'fastest is reported.')
+    parser.add_argument('--json',
+                        help='Also write the results to this file as JSON.')
+    args = parser.parse_args(argv)
+
+    results = []
+    directory = tempfile.mkdtemp()
+    try:
+        for test_count in args.tests or [10, 1000, 100000]:
+            result = _measure(directory, test_count, args.failure_every,
+                              args.repeat)
+            results.append(result)
+            print('{:>7} tests, {:>7} events: text {:.4f}s, events {:.4f}s '
+                  '({:.2f}x)'.format(
+                      result['tests'], result['events'],
+                      result['text_seconds'], result['events_seconds'],
+                      result['events_seconds'] / result['text_seconds']))
+    finally:
+        shutil.rmtree(directory)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# benchmarks/bench_report_all.py - Report-all mode benchmark -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+"""
+Compares the time taken to check a large synthetic log that matches, with
+the time taken to report every mismatch in the same log after its timestamp
+format has changed and some lines were dropped or added. Run from the
+xctest_checker directory:
+
+    python -m benchmarks.bench_report_all --lines 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from xctest_checker import compare
+from xctest_checker.error import XCTestCheckerErrors
+
+from . import synthetic
+
+
+def _break(actual, every):
+    """
+    Returns the given actual output with the timestamp format of every line
+    changed, and with a line dropped and a line added every 'every' lines.
+    """
+    lines = actual.splitlines(True)
+    result = []
+    for index, line in enumerate(lines):
+        if index % every == every // 2:
+            continue
+        if index % every == 0:
+            result.append('Unexpected output\n')
+        result.append(line.replace('2016-03-01 ', '2016/03/01 '))
+    return ''.join(result)
+
+
+def _time(actual, expected, window):
+    start = time.time()
+    errors = 0
+    try:
+        compare.compare(actual, expected, '// CHECK: ', report_all=True,
+                        window=window)
+    except XCTestCheckerErrors as error:
+        errors = len(error.errors)
+    return time.time() - start, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--lines', type=int, default=100000,
+                        help='The approximate number of lines of output.')
+    parser.add_argument('--every', type=int, default=1000,
+                        help='Drop and add a line once per this many lines.')
+    parser.add_argument('--window', type=int,
+                        default=compare.DEFAULT_WINDOW,
+                        help='The lookahead window used to realign output.')
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        actual, expected = synthetic.write(directory, 'Log', args.lines // 2)
+        with open(actual) as f:
+            broken = _break(f.read(), args.every)
+        broken_actual = os.path.join(directory, 'Broken.txt')
+        with open(broken_actual, 'w') as f:
+            f.write(broken)
+
+        matching, _ = _time(actual, expected, args.window)
+        mismatching, errors = _time(broken_actual, expected, args.window)
+    finally:
+        shutil.rmtree(directory)
+
+    line_count = broken.count('\n')
+    print('{} lines, window of {}:'.format(line_count, args.window))
+    print('  matching:    {:.3f}s'.format(matching))
+    print('  mismatching: {:.3f}s, {} errors ({:.0f} lines/s)'.format(
+        mismatching, errors, line_count / mismatching))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# benchmarks/bench_server.py - xctest_checker server benchmark -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+"""
+Compares the time taken to check a synthetic functional test suite by
+launching the client shim once per test, as lit does, with and without an
+xctest_checker server running. Run from the xctest_checker directory:
+
+    python -m benchmarks.bench_server --tests 32
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import synthetic
+
+_CHECKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CLIENT = os.path.join(_CHECKER_DIR, 'xctest_checker_client.py')
+
+
+def _run_suite(jobs, env):
+    start = time.time()
+    for actual, expected in jobs:
+        subprocess.check_call([sys.executable, _CLIENT, actual, expected],
+                              env=env)
+    return time.time() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--tests', type=int, default=32,
+                        help='The number of functional tests to simulate.')
+    parser.add_argument('--cases', type=int, default=10,
+                        help='The number of test cases in each test.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='The number of times to run each configuration.')
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        jobs = [synthetic.write(directory, 'Test{}'.format(index), args.cases)
+                for index in range(args.tests)]
+
+        env = dict(os.environ)
+        env.pop('XCTEST_CHECKER_SOCKET', None)
+        in_process = min(_run_suite(jobs, env) for _ in range(args.repeat))
+
+        socket_path = os.path.join(directory, 'checker.sock')
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'xctest_checker.server', socket_path],
+            cwd=_CHECKER_DIR)
+        try:
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+            env['XCTEST_CHECKER_SOCKET'] = socket_path
+            with_server = min(_run_suite(jobs, env)
+                              for _ in range(args.repeat))
+        finally:
+            server.terminate()
+            server.wait()
+    finally:
+        shutil.rmtree(directory)
+
+    print('{} tests, best of {} runs:'.format(args.tests, args.repeat))
+    print('  in-process:  {:.3f}s ({:.1f}ms per test)'.format(
+        in_process, 1000 * in_process / args.tests))
+    print('  with server: {:.3f}s ({:.1f}ms per test)'.format(
+        with_server, 1000 * with_server / args.tests))
+
+
+if __name__ == '__main__':
+    main()
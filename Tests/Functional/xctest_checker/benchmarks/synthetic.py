@@ -0,0 +1,128 @@
+# benchmarks/synthetic.py - Synthetic XCTest output -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import collections
+import json
+import os
+
+_TIMESTAMP = r'\d+-\d+-\d+ \d+:\d+:\d+\.\d+'
+_DURATION = r'\d+\.\d+'
+
+
+def generate(test_count, failure_every=0):
+    """
+    Returns a tuple of (actual, expected) text for an XCTest run of the given
+    number of test cases. The expected text is in the format of a functional
+    test's main.swift, with one "// CHECK: " line per line of actual output.
+
+    If 'failure_every' is given, every test case at a multiple of it fails
+    with an assertion failure, whose expected line refers to its own line
+    number with "[[@LINE]]".
+    """
+    actual = []
+    expected = []
+
+    def emit(actual_line, expected_line):
+        actual.append(actual_line + '\n')
+        expected.append('// CHECK: ' + expected_line + '\n')
+
+    failure_count = 0
+    emit("Test Suite 'All tests' started at 2016-03-01 12:00:00.000",
+         "Test Suite 'All tests' started at " + _TIMESTAMP)
+    emit("Test Suite 'SyntheticTestCase' started at 2016-03-01 12:00:00.001",
+         "Test Suite 'SyntheticTestCase' started at " + _TIMESTAMP)
+    for index in range(test_count):
+        name = 'SyntheticTestCase.test_{}'.format(index)
+        emit("Test Case '{}' started at 2016-03-01 12:00:00.002".format(name),
+             "Test Case '{}' started at {}".format(name, _TIMESTAMP))
+        if failure_every and index % failure_every == 0:
+            failure_count += 1
+            emit('/tmp/Synthetic/main.swift:{}: error: {} : XCTAssertTrue '
+                 'failed - '.format(len(expected) + 1, name),
+                 '.*[/\\\\]main.swift:[[@LINE]]: error: {} : XCTAssertTrue '
+                 'failed - '.format(name))
+            emit("Test Case '{}' failed (0.001 seconds)".format(name),
+                 "Test Case '{}' failed \\({} seconds\\)".format(
+                     name, _DURATION))
+        else:
+            emit("Test Case '{}' passed (0.001 seconds)".format(name),
+                 "Test Case '{}' passed \\({} seconds\\)".format(
+                     name, _DURATION))
+    result = 'failed' if failure_count else 'passed'
+    emit("Test Suite 'SyntheticTestCase' {} at 2016-03-01 "
+         "12:00:00.003".format(result),
+         "Test Suite 'SyntheticTestCase' {} at {}".format(result, _TIMESTAMP))
+    emit("\t Executed {} tests, with {} failures (0 unexpected) in 0.001 "
+         "(0.001) seconds".format(test_count, failure_count),
+         "\\t Executed {} tests, with {} failures \\(0 unexpected\\) in {} "
+         "\\({}\\) seconds".format(test_count, failure_count, _DURATION,
+                                   _DURATION))
+    return ''.join(actual), ''.join(expected)
+
+
+def generate_events(test_count, failure_every=0):
+    """
+    Returns a tuple of (actual, expected) text for the same XCTest run as
+    generate(), as the JSON lines written with --event-stream. The expected
+    text has one "// EVENT: " line per event, which names every field except
+    the time and durations.
+    """
+    actual = []
+    expected = []
+    clock = [0.0]
+
+    def emit(event, **fields):
+        clock[0] += 0.000125
+        fields = sorted(fields.items())
+        actual_fields = [('event', event), ('time', round(clock[0], 6))] + \
+            fields
+        if event in ('caseFinish', 'suiteFinish'):
+            actual_fields.append(('duration', 0.001))
+        actual.append(json.dumps(collections.OrderedDict(actual_fields),
+                                 separators=(',', ':')) + '\n')
+        expected.append('// EVENT: ' + json.dumps(
+            collections.OrderedDict([('event', event)] + fields)) + '\n')
+
+    failure_count = 0
+    emit('suiteStart', name='All tests')
+    emit('suiteStart', name='SyntheticTestCase')
+    for index in range(test_count):
+        name = 'SyntheticTestCase.test_{}'.format(index)
+        emit('caseStart', name=name)
+        if failure_every and index % failure_every == 0:
+            failure_count += 1
+            emit('caseFailure', name=name, file='/tmp/Synthetic/main.swift',
+                 line=len(expected) + 1, message='XCTAssertTrue failed - ')
+            emit('caseFinish', name=name, result='failed')
+        else:
+            emit('caseFinish', name=name, result='passed')
+    result = 'failed' if failure_count else 'passed'
+    for suite in ('SyntheticTestCase', 'All tests'):
+        emit('suiteFinish', name=suite, result=result, executed=test_count,
+             skipped=0, failures=failure_count, unexpected=0)
+    return ''.join(actual), ''.join(expected)
+
+
+def write(directory, name, test_count, failure_every=0, events=False):
+    """
+    Writes the actual and expected output for a synthetic XCTest run into the
+    given directory, and returns a tuple of their paths. If 'events' is True,
+    the output is that of generate_events() rather than generate().
+    """
+    actual, expected = (generate_events if events else generate)(
+        test_count, failure_every=failure_every)
+    actual_path = os.path.join(directory,
+                               name + ('.jsonl' if events else '.txt'))
+    expected_path = os.path.join(directory, name + '.swift')
+    with open(actual_path, 'w') as f:
+        f.write(actual)
+    with open(expected_path, 'w') as f:
+        f.write(expected)
+    return actual_path, expected_path
@@ -1 +1 @@
-// RUN: %{python} -m unittest discover
+// RUN: cd %S && %{python} -m unittest discover
@@ -0,0 +1,23 @@
+# tests/__init__.py - Helpers for the xctest_checker unit tests -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import os
+import tempfile
+
+
+def tmpfile(content):
+    """
+    Returns the path to a temp file with the given contents, which may be
+    text or bytes.
+    """
+    fd, tmp = tempfile.mkstemp()
+    with os.fdopen(fd, 'wb' if isinstance(content, bytes) else 'w') as f:
+        f.write(content)
+    return tmp
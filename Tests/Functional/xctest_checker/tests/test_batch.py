@@ -0,0 +1,144 @@
+# test_batch.py - Unit tests for xctest_checker.batch -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from xctest_checker import batch
+from xctest_checker.batch import Check
+
+
+def _write(path, content):
+    """Writes a file with the given contents, creating its directory."""
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, *components):
+        return os.path.join(self.directory, *components)
+
+
+class ManifestTestCase(BatchTestCase):
+    def test_paths_are_relative_to_manifest(self):
+        manifest = _write(self.path('manifest.json'), json.dumps([
+            ['out/a.txt', 'a.swift', 'c: '],
+            ['out/b.txt', 'b.swift'],
+        ]))
+        self.assertEqual(batch.load_manifest(manifest), [
+            Check(self.path('out/a.txt'), self.path('a.swift'), 'c: '),
+            Check(self.path('out/b.txt'), self.path('b.swift'),
+                  '// CHECK: '),
+        ])
+
+    def test_malformed_entry_raises(self):
+        manifest = _write(self.path('manifest.json'), json.dumps([['a']]))
+        with self.assertRaisesRegex(ValueError, 'triples'):
+            batch.load_manifest(manifest)
+
+
+class DiscoverTestCase(BatchTestCase):
+    def test_substitutes_lit_paths(self):
+        source = _write(self.path('Suite', 'main.swift'),
+                        '// RUN: %T/Suite > %t || true\n'
+                        '// RUN: %{xctest_checker} %t %s\n')
+        checks, errors = batch.discover(self.directory)
+        self.assertEqual(errors, [])
+        self.assertEqual(checks, [Check(
+            self.path('Suite', 'Output', 'main.swift.tmp'), source,
+            '// CHECK: ')])
+
+    def test_uses_exec_root_for_outputs(self):
+        source = _write(self.path('Suite', 'main.swift'),
+                        '// RUN: %{xctest_checker} %t_list %S/x.expected\n')
+        exec_root = self.path('build')
+        checks, _ = batch.discover(self.directory, exec_root=exec_root)
+        self.assertEqual(checks, [Check(
+            os.path.join(exec_root, 'Suite', 'Output', 'main.swift.tmp_list'),
+            os.path.join(os.path.dirname(source), 'x.expected'),
+            '// CHECK: ')])
+
+    def test_splits_multiple_prefixes_into_checks(self):
+        source = _write(self.path('Suite', 'main.swift'),
+                        '// RUN: %{xctest_checker} -p "// A:" -p "// B:" \\\n'
+                        '// RUN:     %T/a %T/b %s\n')
+        checks, _ = batch.discover(self.directory)
+        output = self.path('Suite', 'Output')
+        self.assertEqual(checks, [
+            Check(os.path.join(output, 'a'), source, '// A:'),
+            Check(os.path.join(output, 'b'), source, '// B:'),
+        ])
+
+    def test_records_event_checks(self):
+        source = _write(self.path('Suite', 'main.swift'),
+                        '// RUN: %{xctest_checker} --events %t_events %s\n')
+        checks, _ = batch.discover(self.directory)
+        self.assertEqual(checks, [Check(
+            self.path('Suite', 'Output', 'main.swift.tmp_events'), source,
+            '// EVENT: ', events=True)])
+
+    def test_reports_invalid_invocations(self):
+        source = _write(self.path('Suite', 'main.swift'),
+                        '// RUN: true\n'
+                        '// RUN: %{xctest_checker} -p "// A:" %s\n')
+        with contextlib.redirect_stderr(io.StringIO()):
+            checks, errors = batch.discover(self.directory)
+        self.assertEqual(checks, [])
+        self.assertEqual(len(errors), 1)
+        self.assertIn('{}:2: Could not parse'.format(source), errors[0])
+
+
+class RunChecksTestCase(BatchTestCase):
+    def test_reports_every_failure_in_order(self):
+        expected = _write(self.path('main.swift'), 'c: foo\n')
+        checks = [
+            Check(_write(self.path('pass'), 'foo\n'), expected, 'c: '),
+            Check(_write(self.path('fail'), 'bar\n'), expected, 'c: '),
+            Check(self.path('missing'), expected, 'c: '),
+        ]
+        for jobs in (1, 2):
+            results = batch.run_checks(checks, jobs=jobs)
+            self.assertIsNone(results[0])
+            self.assertIn('{}:1: Actual line did not match'.format(expected),
+                          results[1])
+            self.assertIn('no such file', results[2])
+
+    def test_main_exits_unsuccessfully_on_failure(self):
+        _write(self.path('Suite', 'Output', 'main.swift.tmp'), 'bar\n')
+        _write(self.path('Suite', 'main.swift'),
+               '// RUN: %{xctest_checker} %t %s\n'
+               '// CHECK: foo\n')
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            status = batch.main(['--discover', self.directory, '-j', '1'])
+        self.assertEqual(status, 1)
+        self.assertIn('main.swift:2: Actual line did not match',
+                      stdout.getvalue())
+        self.assertIn('1 of 1 checks failed', stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# test_cache.py - Unit tests for xctest_checker.cache -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from xctest_checker import cache
+from xctest_checker import compare
+
+from . import tmpfile
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.original_cache_dir = os.environ.get(
+            cache.CACHE_DIR_ENVIRONMENT_VARIABLE)
+        os.environ[cache.CACHE_DIR_ENVIRONMENT_VARIABLE] = self.cache_dir
+
+    def tearDown(self):
+        if self.original_cache_dir is None:
+            os.environ.pop(cache.CACHE_DIR_ENVIRONMENT_VARIABLE, None)
+        else:
+            os.environ[cache.CACHE_DIR_ENVIRONMENT_VARIABLE] = \
+                self.original_cache_dir
+        shutil.rmtree(self.cache_dir)
+
+    def test_load_without_entry_returns_none(self):
+        expected = tmpfile('c: foo\n')
+        self.assertIsNone(cache.load(expected, 'c: '))
+
+    def test_store_then_load_round_trips(self):
+        expected = tmpfile('c: foo\n')
+        cache.store(expected, 'c: ', [('foo', 1)])
+        self.assertEqual(cache.load(expected, 'c: '), [('foo', 1)])
+
+    def test_entries_are_keyed_by_check_prefix(self):
+        expected = tmpfile('c: foo\nd: bar\n')
+        cache.store(expected, 'c: ', [('foo', 1)])
+        self.assertIsNone(cache.load(expected, 'd: '))
+
+    def test_modifying_the_file_invalidates_the_entry(self):
+        expected = tmpfile('c: foo\n')
+        cache.store(expected, 'c: ', [('foo', 1)])
+        stat = os.stat(expected)
+        os.utime(expected, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(cache.load(expected, 'c: '))
+
+    def test_compare_populates_and_uses_the_cache(self):
+        actual = tmpfile('foo\n')
+        expected = tmpfile('c: foo\n')
+        compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
+        self.assertEqual(cache.load(expected, 'c: '),
+                         [('ORDERED', 'foo', 1)])
+
+    def test_disabled_without_environment_variable(self):
+        del os.environ[cache.CACHE_DIR_ENVIRONMENT_VARIABLE]
+        expected = tmpfile('c: foo\n')
+        cache.store(expected, 'c: ', [('foo', 1)])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,89 +8,189 @@
 # See http://swift.org/LICENSE.txt for license information
 # See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
 
-import tempfile
+import collections
 import unittest
 
 from xctest_checker import compare
-from xctest_checker.error import XCTestCheckerError
+from xctest_checker.error import XCTestCheckerError, XCTestCheckerErrors
 
-
-def _tmpfile(content):
-    """Returns the path to a temp file with the given contents."""
-    tmp = tempfile.mkstemp()[1]
-    with open(tmp, 'w') as f:
-        f.write(content)
-    return tmp
+from . import tmpfile
 
 
 class CompareTestCase(unittest.TestCase):
     def test_no_match_raises(self):
-        actual = _tmpfile('foo\nbar\nbaz\n')
-        expected = _tmpfile('c: foo\nc: baz\nc: bar\n')
+        actual = tmpfile('foo\nbar\nbaz\n')
+        expected = tmpfile('c: foo\nc: baz\nc: bar\n')
         with self.assertRaises(XCTestCheckerError):
             compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
     def test_too_few_expected_raises_and_first_line_in_error(self):
-        actual = _tmpfile('foo\nbar\nbaz\n')
-        expected = _tmpfile('c: foo\nc: bar\n')
+        actual = tmpfile('foo\nbar\nbaz\n')
+        expected = tmpfile('c: foo\nc: bar\n')
         with self.assertRaises(XCTestCheckerError) as cm:
             compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
         self.assertIn('{}:{}'.format(expected, 1), str(cm.exception))
 
     def test_too_many_expected_raises_and_excess_check_line_in_error(self):
-        actual = _tmpfile('foo\nbar\n')
-        expected = _tmpfile('c: foo\nc: bar\nc: baz\n')
+        actual = tmpfile('foo\nbar\n')
+        expected = tmpfile('c: foo\nc: bar\nc: baz\n')
         with self.assertRaises(XCTestCheckerError) as cm:
             compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
         self.assertIn('{}:{}'.format(expected, 3), str(cm.exception))
 
     def test_match_does_not_raise(self):
-        actual = _tmpfile('foo\nbar\nbaz\n')
-        expected = _tmpfile('c: foo\nc: bar\nc: baz\n')
+        actual = tmpfile('foo\nbar\nbaz\n')
+        expected = tmpfile('c: foo\nc: bar\nc: baz\n')
         compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
     def test_match_with_inline_check_does_not_raise(self):
-        actual = _tmpfile('bling\nblong\n')
-        expected = _tmpfile('meep meep // c: bling\nmeep\n// c: blong\n')
+        actual = tmpfile('bling\nblong\n')
+        expected = tmpfile('meep meep // c: bling\nmeep\n// c: blong\n')
         compare.compare(open(actual, 'r'), expected, check_prefix='// c: ')
 
     def test_check_prefix_twice_in_the_same_line_raises_with_line(self):
-        actual = _tmpfile('blorp\nbleep\n')
-        expected = _tmpfile('c: blorp\nc: bleep c: blammo\n')
+        actual = tmpfile('blorp\nbleep\n')
+        expected = tmpfile('c: blorp\nc: bleep c: blammo\n')
         with self.assertRaises(XCTestCheckerError) as cm:
             compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
         self.assertIn('{}:{}'.format(expected, 2), str(cm.exception))
 
     def test_check_prefix_in_run_line_ignored(self):
-        actual = _tmpfile('flim\n')
-        expected = _tmpfile('// RUN: xctest_checker --prefix "c: "\nc: flim\n')
+        actual = tmpfile('flim\n')
+        expected = tmpfile('// RUN: xctest_checker --prefix "c: "\nc: flim\n')
         compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
     def test_includes_file_name_and_line_of_expected_in_error(self):
-        actual = _tmpfile('foo\nbar\nbaz\n')
-        expected = _tmpfile('c: foo\nc: baz\nc: bar\n')
+        actual = tmpfile('foo\nbar\nbaz\n')
+        expected = tmpfile('c: foo\nc: baz\nc: bar\n')
         with self.assertRaises(XCTestCheckerError) as cm:
             compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
         self.assertIn("{}:{}:".format(expected, 2), str(cm.exception))
 
     def test_matching_ignores_leading_and_trailing_whitespace(self):
-        actual = _tmpfile('foo\nbar\nbaz\n')
-        expected = _tmpfile('c:  foo\nc: bar \nc: baz\n')
+        actual = tmpfile('foo\nbar\nbaz\n')
+        expected = tmpfile('c:  foo\nc: bar \nc: baz\n')
         compare.compare(open(actual, 'r'), expected, check_prefix='c:')
 
     def test_can_explicitly_match_leading_and_trailing_whitespace(self):
-        actual = _tmpfile('foo\n bar\nbaz \n')
-        expected = _tmpfile('c: foo\nc: ^ bar \nc: baz $\n')
+        actual = tmpfile('foo\n bar\nbaz \n')
+        expected = tmpfile('c: foo\nc: ^ bar \nc: baz $\n')
         compare.compare(open(actual, 'r'), expected, check_prefix='c:')
 
     def test_line_number_substitution(self):
-        actual = _tmpfile('beep 1\nboop 5\n')
-        expected = _tmpfile('c: beep [[@LINE]]\nc: boop [[@LINE+3]]')
+        actual = tmpfile('beep 1\nboop 5\n')
+        expected = tmpfile('c: beep [[@LINE]]\nc: boop [[@LINE+3]]')
         compare.compare(open(actual, 'r'), expected, check_prefix='c: ')
 
+    def test_compare_all_checks_each_actual_with_its_prefix(self):
+        first = tmpfile('foo\n')
+        second = tmpfile('bar\n')
+        expected = tmpfile('a: foo\nb: bar\n')
+        compare.compare_all([open(first, 'r'), open(second, 'r')], expected,
+                            check_prefixes=['a: ', 'b: '])
+
+    def test_compare_all_raises_with_line_of_failing_prefix(self):
+        first = tmpfile('foo\n')
+        second = tmpfile('baz\n')
+        expected = tmpfile('a: foo\nb: bar\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare_all([open(first, 'r'), open(second, 'r')],
+                                expected, check_prefixes=['a: ', 'b: '])
+
+        self.assertIn('{}:{}:'.format(expected, 2), str(cm.exception))
+
+    def test_compare_all_allows_the_same_prefix_twice(self):
+        first = tmpfile('foo\n')
+        second = tmpfile('foo\n')
+        expected = tmpfile('a: foo\n')
+        compare.compare_all([open(first, 'r'), open(second, 'r')], expected,
+                            check_prefixes=['a: ', 'a: '])
+
+
+class ReportAllTestCase(unittest.TestCase):
+    def _errors(self, actual, expected, **kwargs):
+        with self.assertRaises(XCTestCheckerErrors) as cm:
+            compare.compare(tmpfile(actual), expected, check_prefix='c: ',
+                            report_all=True, **kwargs)
+        return [str(error) for error in cm.exception.errors]
+
+    def test_match_does_not_raise(self):
+        expected = tmpfile('c: foo\nc: bar\n')
+        compare.compare(tmpfile('foo\nbar\n'), expected, check_prefix='c: ',
+                        report_all=True)
+
+    def test_reports_every_mismatched_line(self):
+        expected = tmpfile('c: a\nc: \\d\nc: b\nc: \\d\nc: c\n')
+        errors = self._errors('a\nx\nb\ny\nc\n', expected)
+        self.assertEqual(len(errors), 2)
+        self.assertIn('{}:2: Actual line did not match'.format(expected),
+                      errors[0])
+        self.assertIn(repr('x\n'), errors[0])
+        self.assertIn('{}:4: Actual line did not match'.format(expected),
+                      errors[1])
+        self.assertIn(repr('y\n'), errors[1])
+
+    def test_resynchronizes_after_missing_expected_line(self):
+        expected = tmpfile('c: a\nc: b\nc: c\nc: d\n')
+        errors = self._errors('a\nc\nd\n', expected)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('{}:2: Expected line did not appear'.format(expected),
+                      errors[0])
+
+    def test_resynchronizes_after_unexpected_actual_lines(self):
+        expected = tmpfile('c: a\nc: b\n')
+        errors = self._errors('a\nx\ny\nb\n', expected)
+        self.assertEqual(len(errors), 2)
+        for error, line in zip(errors, ['x', 'y']):
+            self.assertIn('{}:2: Actual line was not expected'.format(
+                expected), error)
+            self.assertIn(repr(line + '\n'), error)
+
+    def test_lines_beyond_window_are_reported_as_mismatches(self):
+        expected = tmpfile('c: a\nc: b\nc: c\n')
+        errors = self._errors('x\ny\nz\na\nb\nc\n', expected, window=1)
+        self.assertIn('Actual line did not match', errors[0])
+        self.assertIn('more lines of text', errors[-1])
+
+    def test_reports_missing_lines_at_end_of_output(self):
+        expected = tmpfile('c: a\nc: b\nc: c\n')
+        errors = self._errors('a\n', expected)
+        self.assertEqual(len(errors), 2)
+        self.assertIn('{}:2: There were more lines'.format(expected),
+                      errors[0])
+        self.assertIn('{}:3: There were more lines'.format(expected),
+                      errors[1])
+
+    def test_compare_all_reports_errors_from_every_output(self):
+        expected = tmpfile('a: foo\nb: bar\n')
+        with self.assertRaises(XCTestCheckerErrors) as cm:
+            compare.compare_all([tmpfile('x\n'), tmpfile('y\n')], expected,
+                                check_prefixes=['a: ', 'b: '],
+                                report_all=True)
+        message = str(cm.exception)
+        self.assertIn('{}:1:'.format(expected), message)
+        self.assertIn('{}:2:'.format(expected), message)
+
+    def test_alignment_is_linear_in_output_length(self):
+        # Every tenth line mismatches, and no alignment within the window
+        # matches, which is the most expensive case for the lookahead.
+        count = 20000
+        expected = tmpfile(''.join('c: line {}\n'.format(i)
+                                   for i in range(count)))
+        actual = tmpfile(''.join(
+            'line {}\n'.format(i) if i % 10 else 'changed\n'
+            for i in range(count)))
+        stats = collections.Counter()
+        with self.assertRaises(XCTestCheckerErrors) as cm:
+            compare.compare(actual, expected, check_prefix='c: ',
+                            report_all=True, stats=stats)
+        self.assertEqual(len(cm.exception.errors), count // 10)
+        self.assertLess(sum(stats.values()), count * 10)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,125 @@
+# test_directive.py - Unit tests for CHECK-DAG/NOT/SKIP lines -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import random
+import unittest
+
+from xctest_checker import compare
+from xctest_checker import directive
+from xctest_checker.error import XCTestCheckerError
+from xctest_checker.pattern import Pattern
+from xctest_checker.unordered import match_unordered
+
+from . import tmpfile
+
+
+class DirectivePrefixesTestCase(unittest.TestCase):
+    def test_directives_are_inserted_before_the_colon(self):
+        self.assertEqual(directive.directive_prefixes('// CHECK: '), [
+            (directive.ORDERED, '// CHECK: '),
+            (directive.DAG, '// CHECK-DAG: '),
+            (directive.NOT, '// CHECK-NOT: '),
+            (directive.SKIP, '// CHECK-SKIP: '),
+        ])
+
+    def test_prefix_without_colon_has_no_directives(self):
+        self.assertEqual(directive.directive_prefixes('>> '),
+                         [(directive.ORDERED, '>> ')])
+
+
+class UnorderedTestCase(unittest.TestCase):
+    def test_matches_lines_in_any_order(self):
+        actual = tmpfile('start\nb\na\nc\nend\n')
+        expected = tmpfile('c: start\nc-DAG: a\nc-DAG: b\nc-DAG: c\n'
+                           'c: end\n')
+        compare.compare(actual, expected, check_prefix='c: ')
+
+    def test_unmatched_line_raises_with_line_of_unmet_expectation(self):
+        actual = tmpfile('b\nx\n')
+        expected = tmpfile('c-DAG: a\nc-DAG: b\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare(actual, expected, check_prefix='c: ')
+
+        self.assertIn('{}:{}:'.format(expected, 1), str(cm.exception))
+        self.assertIn("'x\\n' (line 2, byte offset 2)", str(cm.exception))
+
+    def test_group_consumes_exactly_as_many_lines_as_expectations(self):
+        actual = tmpfile('a\nb\nb\n')
+        expected = tmpfile('c-DAG: a\nc-DAG: b\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare(actual, expected, check_prefix='c: ')
+
+        self.assertIn('more lines of text', str(cm.exception))
+
+    def test_too_few_lines_raises(self):
+        actual = tmpfile('a\n')
+        expected = tmpfile('c-DAG: a\nc-DAG: b\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare(actual, expected, check_prefix='c: ')
+
+        self.assertIn('{}:{}:'.format(expected, 2), str(cm.exception))
+
+    def test_reassigns_lines_when_first_choice_blocks_another(self):
+        patterns = [Pattern('fo.*'), Pattern('f.*')]
+        self.assertEqual(match_unordered(patterns, ['foo\n', 'fab\n']),
+                         ([], []))
+
+    def test_reports_unassignable_patterns_and_lines(self):
+        patterns = [Pattern('a'), Pattern('b'), Pattern('b')]
+        self.assertEqual(match_unordered(patterns, ['b\n', 'a\n', 'c\n']),
+                         ([2], [2]))
+
+    def test_leading_any_character_may_match_a_leading_space(self):
+        for regex, line in (('.', ' \n'), ('..', '  a\n'), ('.b*', ' \n')):
+            self.assertEqual(match_unordered([Pattern(regex)], [line]),
+                             ([], []))
+
+    def test_large_groups(self):
+        names = ['Test Case \'Foo.test_{}\' passed \\(\\d+\\.\\d+ '
+                 'seconds\\)'.format(i) for i in range(5000)]
+        lines = ["Test Case 'Foo.test_{}' passed (0.001 seconds)\n".format(i)
+                 for i in range(5000)]
+        random.Random(0).shuffle(lines)
+        self.assertEqual(
+            match_unordered([Pattern(name) for name in names], lines),
+            ([], []))
+
+
+class SkipTestCase(unittest.TestCase):
+    def test_skips_lines_until_match(self):
+        actual = tmpfile('start\nnoise\nmore noise\nend\n')
+        expected = tmpfile('c: start\nc-SKIP: end\n')
+        compare.compare(actual, expected, check_prefix='c: ')
+
+    def test_raises_when_never_matched(self):
+        actual = tmpfile('start\nnoise\n')
+        expected = tmpfile('c: start\nc-SKIP: end\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare(actual, expected, check_prefix='c: ')
+
+        self.assertIn('{}:{}:'.format(expected, 2), str(cm.exception))
+
+    def test_forbidden_line_in_skipped_lines_raises(self):
+        actual = tmpfile('start\nerror: boom\nend\n')
+        expected = tmpfile('c: start\nc-NOT: error:.*\nc-SKIP: end\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare(actual, expected, check_prefix='c: ')
+
+        self.assertIn('{}:{}:'.format(expected, 2), str(cm.exception))
+        self.assertIn('must not appear', str(cm.exception))
+
+    def test_forbidden_lines_only_apply_until_the_next_match(self):
+        actual = tmpfile('start\nend\nerror: boom\nfinish\n')
+        expected = tmpfile('c: start\nc-NOT: error:.*\nc-SKIP: end\n'
+                           'c-SKIP: finish\n')
+        compare.compare(actual, expected, check_prefix='c: ')
+
+if __name__ == "__main__":
+    unittest.main()
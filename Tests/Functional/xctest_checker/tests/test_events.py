@@ -0,0 +1,113 @@
+# test_events.py - Unit tests for xctest_checker.events -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import unittest
+
+from xctest_checker import events
+from xctest_checker import main
+from xctest_checker.error import XCTestCheckerError
+
+from . import tmpfile
+
+
+_ACTUAL = (
+    '{"event":"caseStart","time":0.1,"name":"A.test"}\n'
+    '{"event":"caseFailure","time":0.2,"name":"A.test",'
+    '"file":"/src/A/main.swift","line":3,"message":"failed - \\"x\\""}\n'
+    '{"event":"caseFinish","time":0.3,"name":"A.test","result":"failed",'
+    '"duration":0.2}\n')
+
+
+class CompareEventsTestCase(unittest.TestCase):
+    def test_fields_that_are_not_expected_are_ignored(self):
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"event": "caseFailure", "line": 3}\n'
+            'e: {"event": "caseFinish", "result": "failed"}\n')
+        events.compare_events(tmpfile(_ACTUAL), expected, 'e: ')
+
+    def test_line_directives_are_replaced(self):
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"line": [[@LINE+1]], "message": "failed - \\"x\\""}\n'
+            '\n'
+            'e: {"event": "caseFinish"}\n')
+        events.compare_events(tmpfile(_ACTUAL), expected, 'e: ')
+
+    def test_patterns_match_entire_strings(self):
+        actual = tmpfile(_ACTUAL)
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"file": "{{.*[/\\\\\\\\]A[/\\\\\\\\]main.swift}}"}\n'
+            'e: {"event": "caseFinish"}\n')
+        events.compare_events(actual, expected, 'e: ')
+
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"file": "{{main.swift}}"}\n'
+            'e: {"event": "caseFinish"}\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            events.compare_events(actual, expected, 'e: ')
+        self.assertIn('{}:2: '.format(expected), str(cm.exception))
+
+    def test_mismatched_fields_are_named_in_error(self):
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"event": "caseFailure", "line": 4, "column": 1}\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            events.compare_events(tmpfile(_ACTUAL), expected, 'e: ')
+        self.assertIn('{}:2: '.format(expected), str(cm.exception))
+        self.assertIn('in fields: column, line.', str(cm.exception))
+        self.assertIn('Actual (line 2)', str(cm.exception))
+
+    def test_too_many_expected_raises(self):
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"event": "caseFailure"}\n'
+            'e: {"event": "caseFinish"}\n'
+            'e: {"event": "caseStart"}\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            events.compare_events(tmpfile(_ACTUAL), expected, 'e: ')
+        self.assertIn('{}:4: There were more events'.format(expected),
+                      str(cm.exception))
+
+    def test_too_few_expected_raises(self):
+        expected = tmpfile(
+            'e: {"event": "caseStart"}\n'
+            'e: {"event": "caseFailure"}\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            events.compare_events(tmpfile(_ACTUAL), expected, 'e: ')
+        self.assertIn('First unexpected event (line 3)', str(cm.exception))
+
+    def test_invalid_expected_event_raises_with_line(self):
+        expected = tmpfile('e: {"event": "caseStart"}\ne: ["caseStart"]\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            events.compare_events(tmpfile(_ACTUAL), expected, 'e: ')
+        self.assertIn('{}:2: '.format(expected), str(cm.exception))
+
+    def test_invalid_actual_event_raises_with_line(self):
+        actual = tmpfile('{"event":"caseStart"}\n{"event":\n')
+        expected = tmpfile('e: {"event": "caseStart"}\ne: {}\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            events.compare_events(actual, expected, 'e: ')
+        self.assertIn('{}:2: Actual event is not valid JSON'.format(actual),
+                      str(cm.exception))
+
+    def test_main_uses_event_prefix_by_default(self):
+        expected = tmpfile(
+            '// CHECK: unrelated\n'
+            '// EVENT: {"event": "caseStart"}\n'
+            '// EVENT: {"event": "caseFailure"}\n'
+            '// EVENT: {"event": "caseFinish"}\n')
+        main.main(['--events', tmpfile(_ACTUAL), expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# test_line.py - Unit tests for xctest_checker.line -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import unittest
+
+from xctest_checker import compare
+from xctest_checker import line
+from xctest_checker.error import XCTestCheckerError
+
+from . import tmpfile
+
+
+class ReplaceOffsetsTestCase(unittest.TestCase):
+    def test_no_directive_returns_line_unchanged(self):
+        self.assertEqual(line.replace_offsets('foo.*bar', 10), 'foo.*bar')
+
+    def test_replaces_directive_without_offset(self):
+        self.assertEqual(
+            line.replace_offsets('main.swift:[[@LINE]]: error', 10),
+            'main.swift:10: error')
+
+    def test_replaces_directives_with_offsets(self):
+        self.assertEqual(
+            line.replace_offsets('[[@LINE+3]] [[@LINE-2]] [[@LINE+0]]', 10),
+            '13 8 10')
+
+    def test_replaces_repeated_directives(self):
+        self.assertEqual(
+            line.replace_offsets('[[@LINE+1]]:[[@LINE+1]]', 1), '2:2')
+
+    def test_malformed_directives_raise(self):
+        for malformed in ['[[@LINE+x]]', '[[@LINE+]]', '[[@LINE*2]]',
+                          '[[@LINE+1]', 'foo [[@LINE']:
+            with self.assertRaisesRegex(ValueError, 'Invalid line offset'):
+                line.replace_offsets(malformed, 1)
+
+
+class TokenizeTestCase(unittest.TestCase):
+    def test_splits_text_and_line_tokens(self):
+        self.assertEqual(
+            line.tokenize('.*[/\\\\]main.swift:[[@LINE+3]]: error'),
+            [(line.TEXT, '.*[/\\\\]main.swift:'),
+             (line.LINE, 3),
+             (line.TEXT, ': error')])
+
+    def test_adjacent_directives(self):
+        self.assertEqual(
+            line.tokenize('[[@LINE]][[@LINE-1]][[x]]'),
+            [(line.LINE, 0), (line.LINE, -1), (line.TEXT, '[[x]]')])
+
+    def test_substitute_joins_tokens(self):
+        tokens = line.tokenize('a[[@LINE-1]]b[[@LINE]]')
+        self.assertEqual(line.substitute(tokens, 5), 'a4b5')
+        self.assertEqual(line.substitute(tokens, 7), 'a6b7')
+
+
+class CompareTestCase(unittest.TestCase):
+    def test_malformed_directive_reports_its_location(self):
+        expected = tmpfile('c: foo\nc: [[@LINE+x]]\n')
+        actual = tmpfile('foo\n2\n')
+        with self.assertRaisesRegex(XCTestCheckerError,
+                                    ':2: Invalid line offset'):
+            compare.compare(actual, expected, check_prefix='c: ')
+
+
+if __name__ == "__main__":
+    unittest.main()
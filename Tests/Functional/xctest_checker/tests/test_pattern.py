@@ -0,0 +1,105 @@
+# test_pattern.py - Unit tests for xctest_checker.pattern -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import collections
+import re
+import unittest
+
+from xctest_checker import compare
+from xctest_checker import pattern
+from xctest_checker.pattern import Pattern
+
+from . import tmpfile
+
+
+# Expectations and lines of actual output, each of which is matched both
+# with Pattern and with the plain regular expression it replaces.
+_EXPECTATIONS = [
+    "Test Suite 'All tests' started at \\d+-\\d+-\\d+ \\d+:\\d+:\\d+\\.\\d+",
+    "Test Case 'Foo.test_bar' passed \\(\\d+\\.\\d+ seconds\\)",
+    "\\t Executed 1 test, with 0 failures \\(0 unexpected\\) in "
+    "\\d+\\.\\d+ \\(\\d+\\.\\d+\\) seconds",
+    "Listing 3 tests in .*\\.xctest:",
+    ".*[/\\\\]main.swift:12: error: Foo.test_bar : XCTAssertTrue failed - ",
+    "foo",
+    "foo*",
+    "fo+",
+    "foo|bar",
+    "^ bar ",
+    "baz $",
+    "",
+    "a\\.b",
+    "a\\\\b",
+    "a\\ ",
+]
+_LINES = [
+    "Test Suite 'All tests' started at 2016-03-01 12:00:00.000\n",
+    "Test Suite 'All tests' started at yesterday\n",
+    "Test Case 'Foo.test_bar' passed (0.001 seconds)\n",
+    "Test Case 'Foo.test_bar' failed (0.001 seconds)\n",
+    "\t Executed 1 test, with 0 failures (0 unexpected) in 0.001 (0.002) "
+    "seconds\n",
+    "Listing 3 tests in Foo.xctest:\n",
+    "/tmp/main.swift:12: error: Foo.test_bar : XCTAssertTrue failed - \n",
+    "foo\n", "  foo  \n", "foo", "fooo\n", "fo\n", "f\n", "bar\n", "xbar\n",
+    " bar \n", " bar\n", "bar \n", "baz \n", "  baz \n", "baz\n", "\n", "   \n",
+    "a.b\n", "axb\n", "a\\b\n", "a \n", "a\n", "foo\n\n",
+]
+
+
+class PatternTestCase(unittest.TestCase):
+    def test_matches_exactly_as_the_regular_expression_does(self):
+        for expectation in _EXPECTATIONS:
+            regex = re.compile('^ *' + expectation + ' *$')
+            compiled = Pattern(expectation)
+            for line in _LINES:
+                self.assertEqual(
+                    compiled.match(line), regex.match(line) is not None,
+                    '{!r} ({}) matching {!r}'.format(
+                        expectation, compiled.kind, line))
+
+    def test_literal_lines_are_classified_as_literal(self):
+        compiled = Pattern("Test Suite 'Foo' started at 2016\\.")
+        self.assertEqual(compiled.kind, pattern.LITERAL)
+        self.assertEqual(compiled.literal, "Test Suite 'Foo' started at 2016.")
+
+    def test_escaped_tabs_are_literal(self):
+        self.assertEqual(Pattern('\\t Executed').kind, pattern.LITERAL)
+
+    def test_literal_text_followed_by_regex_is_classified_as_prefix(self):
+        compiled = Pattern("Test Case 'Foo' passed \\(\\d+\\.\\d+ seconds\\)")
+        self.assertEqual(compiled.kind, pattern.PREFIX)
+        self.assertEqual(compiled.literal, "Test Case 'Foo' passed (")
+
+    def test_quantified_character_is_not_part_of_the_prefix(self):
+        compiled = Pattern('foo*')
+        self.assertEqual(compiled.kind, pattern.PREFIX)
+        self.assertEqual(compiled.literal, 'fo')
+
+    def test_leading_regex_is_classified_as_regex(self):
+        self.assertEqual(Pattern('.*main.swift').kind, pattern.REGEX)
+
+    def test_alternation_is_classified_as_regex(self):
+        self.assertEqual(Pattern('foo|bar').kind, pattern.REGEX)
+
+    def test_invalid_regex_raises(self):
+        with self.assertRaises(re.error):
+            Pattern('foo(')
+
+    def test_compare_counts_lines_by_kind(self):
+        actual = tmpfile('foo\nbar 1\n2\n')
+        expected = tmpfile('c: foo\nc: bar \\d\nc: \\d\n')
+        stats = collections.Counter()
+        compare.compare(actual, expected, check_prefix='c: ', stats=stats)
+        self.assertEqual(stats, {pattern.LITERAL: 1, pattern.PREFIX: 1,
+                                 pattern.REGEX: 1})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+# test_reader.py - Unit tests for xctest_checker.reader -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import io
+import unittest
+
+from xctest_checker import compare
+from xctest_checker import reader
+from xctest_checker.error import XCTestCheckerError
+
+from . import tmpfile
+
+
+class _CountingReader(io.BytesIO):
+    """A binary stream that records how many reads were made of it."""
+    def __init__(self, content):
+        super(_CountingReader, self).__init__(content)
+        self.read_count = 0
+
+    def read(self, size=-1):
+        self.read_count += 1
+        return super(_CountingReader, self).read(size)
+
+
+class ReaderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.original_buffer_size = reader.BUFFER_SIZE
+        self.original_max_line_size = reader.MAX_LINE_SIZE
+
+    def tearDown(self):
+        reader.BUFFER_SIZE = self.original_buffer_size
+        reader.MAX_LINE_SIZE = self.original_max_line_size
+
+    def test_yields_lines_with_byte_offsets(self):
+        path = tmpfile(b'foo\nbarbaz\n\nqux')
+        self.assertEqual(list(reader.lines(path)),
+                         [('foo\n', 0), ('barbaz\n', 4), ('\n', 11),
+                          ('qux', 12)])
+
+    def test_lines_spanning_buffers_are_joined(self):
+        reader.BUFFER_SIZE = 3
+        path = tmpfile(b'foo\nbarbaz\nq\n')
+        self.assertEqual(list(reader.lines(path)),
+                         [('foo\n', 0), ('barbaz\n', 4), ('q\n', 11)])
+
+    def test_line_spanning_many_buffers_is_joined(self):
+        reader.BUFFER_SIZE = 2
+        path = tmpfile(b'a\n' + b'b' * 9 + b'\nc')
+        self.assertEqual(list(reader.lines(path)),
+                         [('a\n', 0), ('b' * 9 + '\n', 2), ('c', 12)])
+
+    def test_overlong_line_raises(self):
+        reader.BUFFER_SIZE = 2
+        reader.MAX_LINE_SIZE = 4
+        path = tmpfile(b'foo\n' + b'x' * 10)
+        with self.assertRaisesRegex(XCTestCheckerError,
+                                    ':2: Actual line at byte offset 4 is '
+                                    'longer than 4 bytes'):
+            list(reader.lines(path))
+
+    def test_mapped_lines_match_buffered_lines(self):
+        path = tmpfile(b'foo\nbarbaz\n\nqux')
+        self.assertEqual(list(reader.lines(path, use_mmap=True)),
+                         list(reader.lines(path)))
+
+    def test_mapping_an_empty_file_yields_nothing(self):
+        path = tmpfile(b'')
+        self.assertEqual(list(reader.lines(path, use_mmap=True)), [])
+
+    def test_offsets_count_bytes_of_multibyte_characters(self):
+        path = tmpfile(u'été\nfoo\n'.encode('utf-8'))
+        self.assertEqual(list(reader.lines(path)),
+                         [(u'été\n', 0), ('foo\n', 6)])
+
+    def test_invalid_utf8_is_replaced(self):
+        path = tmpfile(b'fo\xffo\n')
+        self.assertEqual(list(reader.lines(path)), [(u'fo�o\n', 0)])
+
+    def test_crlf_line_endings_are_normalized(self):
+        path = tmpfile(b'foo\r\nbar\r\n')
+        self.assertEqual(list(reader.lines(path)),
+                         [('foo\n', 0), ('bar\n', 5)])
+
+    def test_reads_text_file_objects(self):
+        path = tmpfile(b'foo\nbar\n')
+        with open(path, 'r') as f:
+            self.assertEqual(list(reader.lines(f)),
+                             [('foo\n', 0), ('bar\n', 4)])
+
+    def test_reads_streams_without_underlying_bytes(self):
+        self.assertEqual(list(reader.lines(io.StringIO(u'foo\nbar\n'))),
+                         [('foo\n', 0), ('bar\n', 4)])
+
+    def test_stops_reading_when_closed(self):
+        reader.BUFFER_SIZE = 4
+        stream = _CountingReader(b'foo\n' * 100)
+        lines = reader.lines(stream)
+        next(lines)
+        lines.close()
+        self.assertEqual(stream.read_count, 1)
+
+
+class StreamingCompareTestCase(unittest.TestCase):
+    def test_mismatch_reports_actual_line_and_byte_offset(self):
+        actual = tmpfile(b'foo\nbar\n')
+        expected = tmpfile(b'c: foo\nc: baz\n')
+        with self.assertRaises(XCTestCheckerError) as cm:
+            compare.compare(actual, expected, check_prefix='c: ')
+
+        self.assertIn('line 2, byte offset 4', str(cm.exception))
+
+    def test_compare_accepts_mapped_paths(self):
+        actual = tmpfile(b'foo\nbar\n')
+        expected = tmpfile(b'c: foo\nc: bar\n')
+        compare.compare(actual, expected, check_prefix='c: ', use_mmap=True)
+
+    def test_mismatch_stops_reading_actual_output(self):
+        stream = _CountingReader(b'foo\n' + b'bar\n' * 1000000)
+        expected = tmpfile(b'c: baz\n')
+        with self.assertRaises(XCTestCheckerError):
+            compare.compare(stream, expected, check_prefix='c: ')
+
+        self.assertEqual(stream.read_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
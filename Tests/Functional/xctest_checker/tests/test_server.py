@@ -0,0 +1,119 @@
+# test_server.py - Unit tests for xctest_checker.server -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import io
+import os
+import shutil
+import socket
+import struct
+import tempfile
+import threading
+import time
+import unittest
+
+from xctest_checker import server
+
+from . import tmpfile
+
+
+class RunJobTestCase(unittest.TestCase):
+    def test_match_exits_successfully(self):
+        actual = tmpfile('foo\n')
+        expected = tmpfile('c: foo\n')
+        result = server.run_job(['-p', 'c: ', actual, expected],
+                                os.getcwd(), None)
+        self.assertEqual(result['exit_code'], 0)
+
+    def test_mismatch_reports_error_with_line(self):
+        actual = tmpfile('bar\n')
+        expected = tmpfile('c: foo\n')
+        result = server.run_job(['-p', 'c: ', actual, expected],
+                                os.getcwd(), None)
+        self.assertEqual(result['exit_code'], 1)
+        self.assertIn('{}:{}:'.format(expected, 1), result['stderr'])
+
+    def test_reads_actual_output_from_stdin(self):
+        expected = tmpfile('c: foo\n')
+        result = server.run_job(['-p', 'c: ', '-', expected],
+                                os.getcwd(), io.BytesIO(b'foo\n'))
+        self.assertEqual(result['exit_code'], 0)
+
+    def test_resolves_paths_relative_to_the_given_directory(self):
+        actual = tmpfile('foo\n')
+        expected = tmpfile('c: foo\n')
+        result = server.run_job(
+            ['-p', 'c: ', os.path.basename(actual), expected],
+            os.path.dirname(actual), None)
+        self.assertEqual(result['exit_code'], 0)
+
+    def test_does_not_change_the_working_directory(self):
+        actual = tmpfile('foo\n')
+        expected = tmpfile('c: foo\n')
+        cwd = os.getcwd()
+        server.run_job(['-p', 'c: ', os.path.basename(actual), expected],
+                       os.path.dirname(actual), None)
+        self.assertEqual(os.getcwd(), cwd)
+
+    def test_invalid_arguments_exit_with_usage_error(self):
+        result = server.run_job([], os.getcwd(), None)
+        self.assertEqual(result['exit_code'], 2)
+        self.assertIn('usage:', result['stderr'])
+
+
+class ServeTestCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.socket_path = os.path.join(directory, 'checker.sock')
+        thread = threading.Thread(target=server.serve,
+                                  args=(self.socket_path,),
+                                  kwargs={'idle_timeout': 0.5})
+        thread.start()
+        self.addCleanup(thread.join)
+        while not os.path.exists(self.socket_path):
+            time.sleep(0.01)
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        self.addCleanup(sock.close)
+        return sock
+
+    def test_round_trip_over_socket(self):
+        actual = tmpfile('foo\n')
+        expected = tmpfile('c: foo\n')
+        sock = self.connect()
+        server.write_message(sock, {'argv': ['-p', 'c: ', actual, expected],
+                                    'cwd': os.getcwd()})
+        self.assertEqual(server.read_message(sock)['exit_code'], 0)
+
+    def test_streams_stdin_in_frames(self):
+        expected = tmpfile('c: foo\nc: bar\n')
+        sock = self.connect()
+        server.write_message(sock, {'argv': ['-p', 'c: ', '-', expected],
+                                    'cwd': os.getcwd(), 'stdin': True})
+        for frame in (b'fo', b'o\nbar', b'\n', b''):
+            sock.sendall(struct.pack('>I', len(frame)) + frame)
+        self.assertEqual(server.read_message(sock)['exit_code'], 0)
+
+    def test_reads_all_of_stdin_after_a_mismatch(self):
+        expected = tmpfile('c: foo\n')
+        sock = self.connect()
+        server.write_message(sock, {'argv': ['-p', 'c: ', '-', expected],
+                                    'cwd': os.getcwd(), 'stdin': True})
+        for frame in (b'bar\n', b'baz\n' * 1000, b''):
+            sock.sendall(struct.pack('>I', len(frame)) + frame)
+        response = server.read_message(sock)
+        self.assertEqual(response['exit_code'], 1)
+        self.assertIn('Actual line did not match', response['stderr'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+# xctest_checker/batch.py - Verifies many outputs at once -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from __future__ import absolute_import
+
+import argparse
+import concurrent.futures
+import functools
+import json
+import os
+import shlex
+import sys
+
+from . import compare
+from . import events
+from . import main as checker_main
+from .error import XCTestCheckerError
+
+# The suffix of the files that lit treats as tests, as set in lit.cfg.
+_TEST_SUFFIX = '.swift'
+
+# The substitution that lit.cfg replaces with a call to xctest_checker.
+_CHECKER_SUBSTITUTION = '%{xctest_checker}'
+
+
+class Check(object):
+    """
+    A single actual output, to be compared against the lines of an expected
+    file that begin with a check prefix. If 'events' is True, the output is
+    a stream of events in JSON lines, compared as xctest_checker --events
+    does.
+    """
+    __slots__ = ('actual', 'expected', 'check_prefix', 'events')
+
+    def __init__(self, actual, expected, check_prefix, events=False):
+        self.actual = actual
+        self.expected = expected
+        self.check_prefix = check_prefix
+        self.events = events
+
+    def __eq__(self, other):
+        return isinstance(other, Check) and \
+            (self.actual, self.expected, self.check_prefix, self.events) == \
+            (other.actual, other.expected, other.check_prefix, other.events)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Check({!r}, {!r}, {!r}, events={!r})'.format(
+            self.actual, self.expected, self.check_prefix, self.events)
+
+
+def load_manifest(path):
+    """
+    Returns the list of checks in the JSON manifest at the given path. The
+    manifest is an array of [actual, expected, check prefix] triples; the
+    check prefix may be omitted, in which case the default is used. Relative
+    paths are relative to the directory that contains the manifest.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        entries = json.load(f)
+    checks = []
+    for entry in entries:
+        if not 2 <= len(entry) <= 3:
+            raise ValueError(
+                'Manifest entries must be [actual, expected, check prefix] '
+                'triples, but got: {}'.format(json.dumps(entry)))
+        actual, expected = [os.path.join(directory, p) for p in entry[:2]]
+        check_prefix = entry[2] if len(entry) == 3 else \
+            checker_main.DEFAULT_CHECK_PREFIX
+        checks.append(Check(actual, expected, check_prefix))
+    return checks
+
+
+def _run_lines(path):
+    """
+    Returns a generator that yields the command in each lit RUN line in the
+    file at the given path, along with its line number. Lines that end in a
+    backslash are continued on the next RUN line, as they are by lit.
+    """
+    command = None
+    with open(path) as f:
+        for index, line in enumerate(f):
+            if 'RUN:' not in line:
+                continue
+            text = line.split('RUN:', 1)[1].strip()
+            if command is None:
+                command, line_number = '', index + 1
+            if text.endswith('\\'):
+                command += text[:-1]
+                continue
+            yield command + text, line_number
+            command = None
+
+
+def _substitute(command, source, exec_root, source_root):
+    """
+    Replaces the lit substitutions for test paths in the given command, for
+    the test at the given source path. Outputs are expected to be where lit
+    would have put them, for an exec root at the given directory.
+    """
+    relative_dir = os.path.relpath(os.path.dirname(source), source_root)
+    output_dir = os.path.normpath(
+        os.path.join(exec_root, relative_dir, 'Output'))
+    tmp = os.path.join(output_dir, os.path.basename(source) + '.tmp')
+    for substitution, replacement in (('%s', source),
+                                      ('%S', os.path.dirname(source)),
+                                      ('%t', tmp),
+                                      ('%T', output_dir)):
+        command = command.replace(substitution, replacement)
+    return command
+
+
+def discover(directory, exec_root=None):
+    """
+    Returns a tuple of the checks made by every xctest_checker invocation in
+    the RUN lines of the lit tests under the given directory, and a list of
+    errors describing invocations that could not be understood.
+
+    Actual outputs are located relative to 'exec_root', which defaults to
+    the given directory, as lit does when no separate exec root is
+    configured.
+    """
+    source_root = os.path.abspath(directory)
+    exec_root = os.path.abspath(exec_root or directory)
+    checks = []
+    errors = []
+    for dirpath, dirnames, filenames in os.walk(source_root):
+        # lit writes outputs into "Output" directories, which never contain
+        # tests, and visiting them in order makes the report deterministic.
+        dirnames[:] = sorted(d for d in dirnames if d != 'Output')
+        for filename in sorted(filenames):
+            if not filename.endswith(_TEST_SUFFIX):
+                continue
+            source = os.path.join(dirpath, filename)
+            for command, line_number in _run_lines(source):
+                if _CHECKER_SUBSTITUTION not in command:
+                    continue
+                arguments = _substitute(
+                    command.split(_CHECKER_SUBSTITUTION, 1)[1],
+                    source, exec_root, source_root)
+                try:
+                    _, args = checker_main.parse_arguments(
+                        shlex.split(arguments), prog='xctest_checker.py')
+                except (ValueError, SystemExit):
+                    errors.append(str(XCTestCheckerError(
+                        source, line_number,
+                        'Could not parse xctest_checker invocation: '
+                        '{}'.format(arguments.strip()))))
+                    continue
+                # Output that was piped into xctest_checker wasn't kept, so
+                # it can't be checked again.
+                checks.extend(
+                    Check(actual, args.expected, check_prefix,
+                          events=args.events)
+                    for actual, check_prefix in zip(args.actual,
+                                                    args.check_prefixes)
+                    if actual != '-')
+    return checks, errors
+
+
+def run_check(check, use_mmap=False, report_all=False):
+    """
+    Runs the given check, and returns None if it passes, or the message of
+    the XCTestCheckerError that describes why it failed.
+    """
+    try:
+        if not os.path.isfile(check.actual):
+            raise XCTestCheckerError(
+                check.expected, 1,
+                "Can't open actual output '{}': no such file".format(
+                    check.actual))
+        if check.events:
+            events.compare_events(check.actual, check.expected,
+                                  check.check_prefix, use_mmap=use_mmap)
+        else:
+            compare.compare(check.actual, check.expected, check.check_prefix,
+                            use_mmap=use_mmap, report_all=report_all)
+    except XCTestCheckerError as error:
+        return str(error)
+    except (IOError, OSError) as error:
+        return str(XCTestCheckerError(check.expected, 1, str(error)))
+    return None
+
+
+def run_checks(checks, jobs=None, use_mmap=False, report_all=False):
+    """
+    Runs the given checks concurrently, on a pool of 'jobs' processes, which
+    defaults to the number of CPUs. Returns the list of results, one for each
+    check in the given order, as returned by run_check.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    worker = functools.partial(run_check, use_mmap=use_mmap,
+                               report_all=report_all)
+    if jobs <= 1 or len(checks) <= 1:
+        return [worker(check) for check in checks]
+    # Each check is usually quick, so hand them out in chunks to amortize
+    # the cost of sending them to the worker processes.
+    chunksize = max(1, len(checks) // (jobs * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(worker, checks, chunksize=chunksize))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m xctest_checker.batch',
+        description='Verify the outputs of many XCTest executables at once, '
+                    'and report every failure.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--manifest',
+                        help='A JSON file listing the checks to run, as an '
+                             'array of [actual, expected, check prefix] '
+                             'triples.')
+    source.add_argument('--discover',
+                        metavar='DIR',
+                        help='Run the checks made by the RUN lines of every '
+                             'lit test under this directory.')
+    parser.add_argument('--exec-root',
+                        help='With --discover, the directory under which lit '
+                             'wrote the actual outputs. Defaults to the '
+                             'discovered directory.')
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        help='The number of processes to verify outputs '
+                             'with. Defaults to the number of CPUs.')
+    parser.add_argument('--mmap',
+                        action='store_true',
+                        help='Map actual outputs into memory, rather than '
+                             'reading them in large buffered chunks.')
+    parser.add_argument('--report-all',
+                        action='store_true',
+                        help='Report every line of each output that does not '
+                             'match, rather than only the first.')
+    args = parser.parse_args(argv)
+
+    if args.manifest:
+        checks, errors = load_manifest(args.manifest), []
+    else:
+        checks, errors = discover(args.discover, exec_root=args.exec_root)
+
+    results = run_checks(checks, jobs=args.jobs, use_mmap=args.mmap,
+                         report_all=args.report_all)
+    failures = errors + [result for result in results if result is not None]
+    for failure in failures:
+        # Each message begins with a newline, so that it renders inline in
+        # Xcode.
+        sys.stdout.write(failure + '\n')
+    sys.stderr.write('xctest_checker: {} of {} checks failed\n'.format(
+        len(failures), len(checks) + len(errors)))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
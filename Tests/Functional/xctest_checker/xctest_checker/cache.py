@@ -0,0 +1,85 @@
+# xctest_checker/cache.py - On-disk cache of parsed expectations -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import hashlib
+import json
+import os
+import tempfile
+
+# The environment variable used to enable the cache. When it is not set,
+# expectations are parsed from scratch on every run.
+CACHE_DIR_ENVIRONMENT_VARIABLE = 'XCTEST_CHECKER_CACHE_DIR'
+
+# Bump this whenever the format of the cached data changes, so that stale
+# entries written by an older xctest_checker are never read back.
+_FORMAT_VERSION = 2
+
+
+def cache_dir():
+    """
+    Returns the directory in which parsed expectations are cached, or None if
+    caching is disabled.
+    """
+    return os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE) or None
+
+
+def _entry_path(directory, path, check_prefix):
+    """
+    Returns the path of the cache entry for the given file and check prefix.
+    The key includes the modification time and size of the file, so editing
+    the file invalidates the entry.
+    """
+    stat = os.stat(path)
+    key = json.dumps([_FORMAT_VERSION,
+                      os.path.abspath(path),
+                      stat.st_mtime_ns,
+                      stat.st_size,
+                      check_prefix])
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(directory, digest + '.json')
+
+
+def load(path, check_prefix):
+    """
+    Returns the list of parsed expectations cached for the given file and
+    check prefix, or None if there is no valid entry.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return None
+    try:
+        with open(_entry_path(directory, path, check_prefix)) as f:
+            return [tuple(entry) for entry in json.load(f)]
+    except (IOError, OSError, ValueError, TypeError):
+        # A missing or corrupt entry is simply a cache miss.
+        return None
+
+
+def store(path, check_prefix, expected_lines):
+    """
+    Caches the given list of parsed expectations, each of which is a tuple of
+    JSON-serializable values, for the given file and check prefix. Failing to
+    write the cache is never an error.
+    """
+    directory = cache_dir()
+    if directory is None:
+        return
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        entry_path = _entry_path(directory, path, check_prefix)
+        # Write to a temporary file first, so that concurrent lit workers
+        # never observe a partially written entry.
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(expected_lines, f)
+        os.replace(tmp_path, entry_path)
+    except (IOError, OSError):
+        pass
@@ -8,29 +8,40 @@
 # See http://swift.org/LICENSE.txt for license information
 # See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
 
-import re
-try:
-    from itertools import zip_longest
-except ImportError:
-    from itertools import izip_longest as zip_longest
+import collections
+import itertools
 
-from .error import XCTestCheckerError
+from . import cache
+from . import directive
+from . import reader
+from .pattern import Pattern
+from .error import XCTestCheckerError, XCTestCheckerErrors
 from .line import replace_offsets
+from .unordered import match_unordered
 
 
-def _actual_lines(file_handle):
+def _actual_lines(source, use_mmap=False):
     """
-    Returns a generator that yields each line in the file.
+    Returns a generator that yields each line in the given path or file,
+    along with its line number and the byte offset at which it begins.
     """
-    for line in file_handle:
-        yield line
+    for index, (line, offset) in enumerate(
+            reader.lines(source, use_mmap=use_mmap)):
+        yield line, index + 1, offset
 
 
-def _expected_lines_and_line_numbers(path, check_prefix):
+def _parse_expected_lines(path, check_prefixes):
     """
-    Returns a generator that yields each line in the file at the given path
-    that begins with the given prefix.
+    Returns a dictionary mapping each of the given prefixes to a list of
+    (directive kind, expected line, line number) tuples, one for each line in
+    the file at the given path that begins with that prefix, or with one of
+    the directive prefixes derived from it. The file is only read once,
+    regardless of how many prefixes are given.
     """
+    result = dict((check_prefix, []) for check_prefix in check_prefixes)
+    prefixes = [(check_prefix, kind, prefix)
+                for check_prefix in check_prefixes
+                for kind, prefix in directive.directive_prefixes(check_prefix)]
     with open(path) as f:
         for index, line in enumerate(f):
             if 'RUN:' in line:
@@ -42,54 +53,398 @@ def _expected_lines_and_line_numbers(path, check_prefix):
             # the loop index.
             line_number = index + 1
 
-            components = line.split(check_prefix)
-            if len(components) == 2:
-                yield (replace_offsets(components[1].strip(), line_number),
-                       line_number)
-            elif len(components) > 2:
-                # Include a newline, then the file name and line number in the
-                # exception in order to have it appear as an inline failure in
-                # Xcode.
-                raise XCTestCheckerError(
-                    path, line_number,
-                    'Usage violation: prefix "{}" appears twice in the same '
-                    'line.'.format(check_prefix))
+            for check_prefix, kind, prefix in prefixes:
+                if prefix not in line:
+                    continue
 
+                components = line.split(prefix)
+                if len(components) == 2:
+                    try:
+                        expected_line = replace_offsets(
+                            components[1].strip(), line_number)
+                    except ValueError as error:
+                        raise XCTestCheckerError(path, line_number,
+                                                 str(error))
+                    result[check_prefix].append(
+                        (kind, expected_line, line_number))
+                elif len(components) > 2:
+                    # Include a newline, then the file name and line number in
+                    # the exception in order to have it appear as an inline
+                    # failure in Xcode.
+                    raise XCTestCheckerError(
+                        path, line_number,
+                        'Usage violation: prefix "{}" appears twice in the '
+                        'same line.'.format(prefix))
+    return result
 
-def _add_whitespace_leniency(original_regex):
-    return "^ *" + original_regex + " *$"
 
+def _expected_lines_and_line_numbers(path, check_prefixes):
+    """
+    Returns a dictionary mapping each of the given prefixes to a list of
+    (directive kind, expected line, compiled pattern, line number) tuples, one
+    for each line in the file at the given path that begins with that prefix.
+    Each expectation is compiled exactly once, rather than relying on the
+    (bounded) cache used by re.match, into a Pattern that matches literal text
+    without using regular expressions where possible.
+
+    Parsed expectations are cached on disk, keyed by the path, modification
+    time and check prefix, when the XCTEST_CHECKER_CACHE_DIR environment
+    variable is set. Prefixes that aren't cached are all parsed in a single
+    pass over the file.
+    """
+    expected_lines = {}
+    uncached_prefixes = []
+    for check_prefix in check_prefixes:
+        if check_prefix in expected_lines or \
+                check_prefix in uncached_prefixes:
+            continue
+        cached = cache.load(path, check_prefix)
+        if cached is None:
+            uncached_prefixes.append(check_prefix)
+        else:
+            expected_lines[check_prefix] = cached
+
+    if uncached_prefixes:
+        parsed = _parse_expected_lines(path, uncached_prefixes)
+        for check_prefix in uncached_prefixes:
+            cache.store(path, check_prefix, parsed[check_prefix])
+        expected_lines.update(parsed)
+
+    return dict(
+        (check_prefix,
+         [(kind, line, Pattern(line), line_number)
+          for kind, line, line_number in lines])
+        for check_prefix, lines in expected_lines.items())
+
+
+# The number of lines that report-all mode looks ahead by, in both the
+# expected and the actual output, to find where they match again after a
+# mismatch.
+DEFAULT_WINDOW = 32
+
+
+class _Lines(object):
+    """
+    Wraps a generator of lines of actual output, so that upcoming lines can
+    be looked at, and lines that were read can be put back.
+    """
+    __slots__ = ('_lines', '_pending')
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._pending = collections.deque()
+
+    def next(self):
+        """
+        Returns the next line, along with its location, or None if there
+        are no more.
+        """
+        if self._pending:
+            return self._pending.popleft()
+        return next(self._lines, None)
+
+    def push_back(self, line_and_location):
+        self._pending.appendleft(line_and_location)
+
+    def peek(self, count):
+        """
+        Returns a list of up to 'count' upcoming lines, without consuming
+        them. Fewer are returned only at the end of the output.
+        """
+        while len(self._pending) < count:
+            line_and_location = next(self._lines, None)
+            if line_and_location is None:
+                break
+            self._pending.append(line_and_location)
+        return list(itertools.islice(self._pending, count))
+
+
+def _matches(expected_pattern, actual_line, stats):
+    if stats is not None:
+        stats[expected_pattern.kind] += 1
+    return expected_pattern.match(actual_line)
+
+
+def _fail(errors, error):
+    """
+    Raises the given error, unless 'errors' is a list of the errors found
+    so far in report-all mode, in which case it is added to that list.
+    """
+    if errors is None:
+        raise error
+    errors.append(error)
+
+
+def _unmet_expectation_error(expected, expectation):
+    _, expected_line, _, expectation_line_number = expectation
+    return XCTestCheckerError(
+        expected, expectation_line_number,
+        'There were more lines expected to appear than there were lines in '
+        'the actual input. Unmet expectation: {}'.format(repr(expected_line)))
+
+
+def _mismatch_error(expected, expectation, actual_line_and_location):
+    _, expected_line, _, expectation_line_number = expectation
+    actual_line, actual_line_number, actual_offset = actual_line_and_location
+    return XCTestCheckerError(
+        expected, expectation_line_number,
+        'Actual line did not match the expected regular expression.\n'
+        'Actual (line {}, byte offset {}): {}\nExpected: {}'.format(
+            actual_line_number, actual_offset, repr(actual_line),
+            repr(expected_line)))
+
+
+def _compare_lines(actual, expected, expectations, use_mmap=False,
+                   stats=None, errors=None, window=DEFAULT_WINDOW):
+    """
+    Compares each line in the given 'actual' path or file against the given
+    list of expectations, which were parsed from the file at the path
+    'expected'. The actual output is streamed. If 'stats' is given, it is a
+    collections.Counter that's incremented by the kind of each Pattern that
+    is matched.
+
+    By default, reading stops at the first mismatch, which is raised. If
+    'errors' is a list, every mismatch is instead added to it, and matching
+    resumes from where the expected and actual output next line up, as found
+    by looking ahead by up to 'window' lines in each.
+    """
+    actual_lines = _Lines(_actual_lines(actual, use_mmap=use_mmap))
+    # CHECK-NOT expectations that apply to lines skipped before the next
+    # match.
+    forbidden = []
+    index = 0
+    while index < len(expectations):
+        kind, _, expected_pattern, _ = expectations[index]
+
+        if kind == directive.NOT:
+            forbidden.append(expectations[index])
+            index += 1
+            continue
 
-def compare(actual, expected, check_prefix):
+        forbidden_before, forbidden = forbidden, []
+
+        if kind == directive.DAG:
+            group_end = index
+            while group_end < len(expectations) and \
+                    expectations[group_end][0] == directive.DAG:
+                group_end += 1
+            try:
+                _compare_unordered(actual_lines, expected,
+                                   expectations[index:group_end], stats)
+            except XCTestCheckerError as error:
+                _fail(errors, error)
+            index = group_end
+            continue
+
+        if kind == directive.ORDERED:
+            actual_line_and_location = actual_lines.next()
+            if actual_line_and_location is None:
+                _fail(errors, _unmet_expectation_error(
+                    expected, expectations[index]))
+                index += 1
+            elif _matches(expected_pattern, actual_line_and_location[0],
+                          stats):
+                index += 1
+            elif errors is None:
+                raise _mismatch_error(expected, expectations[index],
+                                      actual_line_and_location)
+            else:
+                actual_lines.push_back(actual_line_and_location)
+                index = _resynchronize(actual_lines, expected, expectations,
+                                       index, stats, errors, window)
+            continue
+
+        # A CHECK-SKIP expectation skips over lines that don't match it, as
+        # long as they don't match a CHECK-NOT expectation.
+        while True:
+            actual_line_and_location = actual_lines.next()
+            if actual_line_and_location is None:
+                _fail(errors, _unmet_expectation_error(
+                    expected, expectations[index]))
+                break
+
+            (actual_line, actual_line_number,
+             actual_offset) = actual_line_and_location
+            if _matches(expected_pattern, actual_line, stats):
+                break
+
+            for (_, forbidden_line, forbidden_pattern,
+                 forbidden_line_number) in forbidden_before:
+                if _matches(forbidden_pattern, actual_line, stats):
+                    _fail(errors, XCTestCheckerError(
+                        expected, forbidden_line_number,
+                        'Actual line matched a regular expression that must '
+                        'not appear.\nActual (line {}, byte offset {}): {}\n'
+                        'Expected not to appear: {}'.format(
+                            actual_line_number, actual_offset,
+                            repr(actual_line), repr(forbidden_line))))
+        index += 1
+
+    actual_line_and_location = actual_lines.next()
+    if actual_line_and_location is not None:
+        (actual_line, actual_line_number,
+         actual_offset) = actual_line_and_location
+        _fail(errors, XCTestCheckerError(
+            expected, 1,
+            'The actual output contained more lines of text than the '
+            'expected output. First unexpected line (line {}, byte '
+            'offset {}): {}'.format(
+                actual_line_number, actual_offset, repr(actual_line))))
+
+
+def _resynchronize(actual_lines, expected, expectations, index, stats,
+                   errors, window):
+    """
+    Called when the ordered expectation at 'index' doesn't match the next
+    actual line. Finds the nearest pair of an upcoming ordered expectation
+    and an upcoming actual line that match, looking ahead by up to 'window'
+    of each, and adds an error for each expectation and line skipped to
+    reach them. Returns the index of the expectation to resume at, with
+    the actual lines before its match consumed.
+
+    Only pairs within the window are tried, so each mismatch costs at most
+    'window' squared matches. When no pair matches, the whole window is
+    reported as mismatched lines, so large runs of mismatches cost 'window'
+    matches per line.
+    """
+    run_end = index
+    while run_end < len(expectations) and run_end - index <= window and \
+            expectations[run_end][0] == directive.ORDERED:
+        run_end += 1
+    expectation_count = run_end - index
+    upcoming = actual_lines.peek(window + 1)
+
+    # Search in order of the total number of lines skipped, so that the
+    # alignment that skips the fewest lines is found first.
+    skipped = None
+    for distance in range(1, expectation_count + len(upcoming) - 1):
+        for skipped_expectations in range(
+                max(0, distance - len(upcoming) + 1),
+                min(distance, expectation_count - 1) + 1):
+            skipped_lines = distance - skipped_expectations
+            if _matches(expectations[index + skipped_expectations][2],
+                        upcoming[skipped_lines][0], stats):
+                skipped = (skipped_expectations, skipped_lines)
+                break
+        if skipped is not None:
+            break
+
+    if skipped is None:
+        mismatched = min(expectation_count, len(upcoming))
+        skipped = (mismatched, mismatched)
+    skipped_expectations, skipped_lines = skipped
+
+    # Lines skipped in both are reported as mismatches, and the rest as
+    # missing expectations or unexpected actual lines.
+    mismatched = min(skipped_expectations, skipped_lines)
+    for offset in range(mismatched):
+        errors.append(_mismatch_error(expected, expectations[index + offset],
+                                      upcoming[offset]))
+    for offset in range(mismatched, skipped_expectations):
+        _, expected_line, _, expectation_line_number = \
+            expectations[index + offset]
+        actual_line, actual_line_number, actual_offset = \
+            upcoming[skipped_lines]
+        errors.append(XCTestCheckerError(
+            expected, expectation_line_number,
+            'Expected line did not appear in the actual output, before '
+            'actual line {} (byte offset {}): {}\nExpected: {}'.format(
+                actual_line_number, actual_offset, repr(actual_line),
+                repr(expected_line))))
+    for offset in range(mismatched, skipped_lines):
+        actual_line, actual_line_number, actual_offset = upcoming[offset]
+        errors.append(XCTestCheckerError(
+            expected, expectations[index + skipped_expectations][3],
+            'Actual line was not expected to appear before this '
+            'expectation.\nActual (line {}, byte offset {}): {}'.format(
+                actual_line_number, actual_offset, repr(actual_line))))
+
+    for _ in range(skipped_lines):
+        actual_lines.next()
+    return index + skipped_expectations
+
+
+def _compare_unordered(actual_lines, expected, group, stats):
+    """
+    Compares the next lines from the given generator of actual lines, one
+    for each expectation in the given group of CHECK-DAG expectations,
+    allowing them to appear in any order.
+    """
+    actual_group = []
+    for _ in group:
+        actual_line_and_location = actual_lines.next()
+        if actual_line_and_location is None:
+            break
+        actual_group.append(actual_line_and_location)
+
+    if stats is not None:
+        for _, _, expected_pattern, _ in group:
+            stats[expected_pattern.kind] += 1
+    unmatched_expectations, unmatched_lines = match_unordered(
+        [expected_pattern for _, _, expected_pattern, _ in group],
+        [actual_line for actual_line, _, _ in actual_group])
+    if not unmatched_expectations:
+        return
+
+    _, expected_line, _, expectation_line_number = \
+        group[unmatched_expectations[0]]
+    if len(actual_group) < len(group):
+        raise XCTestCheckerError(
+            expected, expectation_line_number,
+            'There were more lines expected to appear than there were lines '
+            'in the actual input. Unmet expectation: {}'.format(
+                repr(expected_line)))
+
+    raise XCTestCheckerError(
+        expected, expectation_line_number,
+        'Actual lines did not match the expected regular expressions in any '
+        'order.\nUnmatched actual lines: {}\nUnmatched expectations: '
+        '{}'.format(
+            ', '.join('{} (line {}, byte offset {})'.format(
+                repr(actual_group[i][0]), actual_group[i][1],
+                actual_group[i][2]) for i in unmatched_lines),
+            ', '.join(repr(group[i][1]) for i in unmatched_expectations)))
+
+
+def compare(actual, expected, check_prefix, use_mmap=False, stats=None,
+            report_all=False, window=DEFAULT_WINDOW):
     """
     Compares each line in the two given files.
     If any line in the 'actual' file doesn't match the regex in the 'expected'
     file, raises an AssertionError. Also raises an AssertionError if the number
     of lines in the two files differ.
+
+    Besides lines that must match in order, the 'expected' file may contain
+    CHECK-DAG, CHECK-NOT and CHECK-SKIP lines; see the directive module.
+
+    'actual' may be a path, "-" for stdin, or a file object. If 'use_mmap' is
+    True and 'actual' is a regular file, it is mapped into memory instead of
+    being read. If 'stats' is given, it is a collections.Counter that records
+    how many lines were matched by each kind of Pattern.
+
+    If 'report_all' is True, matching continues past each mismatch, and an
+    XCTestCheckerErrors describing every mismatch is raised at the end. After
+    a mismatch, the expected and actual output are realigned by looking
+    ahead by up to 'window' lines in each.
+    """
+    compare_all([actual], expected, [check_prefix], use_mmap=use_mmap,
+                stats=stats, report_all=report_all, window=window)
+
+
+def compare_all(actuals, expected, check_prefixes, use_mmap=False,
+                stats=None, report_all=False, window=DEFAULT_WINDOW):
+    """
+    Compares each of the given 'actual' files against the lines in the
+    'expected' file that begin with the corresponding check prefix. The
+    expected file is parsed once for all of the prefixes. Raises on the first
+    'actual' file that doesn't match, as compare() does, or after checking
+    all of them if 'report_all' is True.
     """
-    for actual_line, expected_line_and_number in zip_longest(
-            _actual_lines(actual),
-            _expected_lines_and_line_numbers(expected, check_prefix)):
-
-        if expected_line_and_number is None:
-            raise XCTestCheckerError(
-                expected, 1,
-                'The actual output contained more lines of text than the '
-                'expected output. First unexpected line: {}'.format(
-                    repr(actual_line)))
-
-        (expected_line, expectation_line_number) = expected_line_and_number
-
-        if actual_line is None:
-            raise XCTestCheckerError(
-                expected, expectation_line_number,
-                'There were more lines expected to appear than there were '
-                'lines in the actual input. Unmet expectation: {}'.format(
-                    repr(expected_line)))
-
-        if not re.match(_add_whitespace_leniency(expected_line), actual_line):
-            raise XCTestCheckerError(
-                expected, expectation_line_number,
-                'Actual line did not match the expected regular expression.\n'
-                'Actual: {}\nExpected: {}'.format(
-                    repr(actual_line), repr(expected_line)))
+    expectations = _expected_lines_and_line_numbers(expected, check_prefixes)
+    errors = [] if report_all else None
+    for actual, check_prefix in zip(actuals, check_prefixes):
+        _compare_lines(actual, expected, expectations[check_prefix],
+                       use_mmap=use_mmap, stats=stats, errors=errors,
+                       window=window)
+    if errors:
+        raise XCTestCheckerErrors(errors)
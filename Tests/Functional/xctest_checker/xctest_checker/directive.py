@@ -0,0 +1,46 @@
+# xctest_checker/directive.py - Kinds of check lines -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+# A line that must match the next line of actual output, such as
+# "// CHECK: foo".
+ORDERED = 'ORDERED'
+
+# A run of consecutive lines, such as "// CHECK-DAG: foo", that must match the
+# next lines of actual output, one line each, in any order.
+DAG = 'DAG'
+
+# A line, such as "// CHECK-NOT: foo", that must not match any of the lines of
+# actual output that are skipped over before the next match.
+NOT = 'NOT'
+
+# A line, such as "// CHECK-SKIP: foo", that skips lines of actual output
+# until one matches it.
+SKIP = 'SKIP'
+
+KINDS = (ORDERED, DAG, NOT, SKIP)
+
+
+def directive_prefixes(check_prefix):
+    """
+    Returns a list of (kind, prefix) pairs for the directives that are
+    available with the given check prefix. Directive prefixes are formed by
+    inserting the name of the directive before the colon that ends the check
+    prefix, so that "// CHECK: " gives "// CHECK-DAG: ", "// CHECK-NOT: " and
+    "// CHECK-SKIP: ". A check prefix without a colon supports ordered lines
+    only.
+    """
+    prefixes = [(ORDERED, check_prefix)]
+    stripped = check_prefix.rstrip()
+    if stripped.endswith(':'):
+        name = stripped[:-1]
+        whitespace = check_prefix[len(stripped):]
+        for kind in (DAG, NOT, SKIP):
+            prefixes.append((kind, '{}-{}:{}'.format(name, kind, whitespace)))
+    return prefixes
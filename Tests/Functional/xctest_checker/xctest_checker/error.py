@@ -17,3 +17,14 @@ class XCTestCheckerError(Exception):
     def __init__(self, path, line_number, message):
         super(XCTestCheckerError, self).__init__(
             '\n{}:{}: {}'.format(path, line_number, message))
+
+
+class XCTestCheckerErrors(XCTestCheckerError):
+    """
+    An exception that aggregates every XCTestCheckerError found when output
+    is checked in report-all mode. Its message is the message of each error,
+    in order, so that each renders inline in Xcode.
+    """
+    def __init__(self, errors):
+        self.errors = list(errors)
+        Exception.__init__(self, ''.join(str(error) for error in self.errors))
@@ -0,0 +1,150 @@
+# xctest_checker/events.py - Compares streams of test events -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import json
+import re
+
+from . import reader
+from .error import XCTestCheckerError
+from .line import replace_offsets
+
+DEFAULT_EVENT_PREFIX = '// EVENT: '
+
+
+def _is_pattern(value):
+    return len(value) >= 4 and value.startswith('{{') and \
+        value.endswith('}}')
+
+
+def parse_expected_events(path, check_prefix=DEFAULT_EVENT_PREFIX):
+    """
+    Returns a list of (expected event, line number) pairs, one for each line
+    in the file at the given path that begins with the given prefix. The
+    rest of each line is a JSON object, in which "[[@LINE]]" directives are
+    replaced before it is parsed, so that a line number may be given as
+    "[[@LINE+1]]". String values of the form "{{regex}}" are compiled into
+    regular expressions.
+    """
+    expected_events = []
+    with open(path) as f:
+        for index, line in enumerate(f):
+            if 'RUN:' in line or check_prefix not in line:
+                continue
+            line_number = index + 1
+            components = line.split(check_prefix)
+            if len(components) > 2:
+                raise XCTestCheckerError(
+                    path, line_number,
+                    'Usage violation: prefix "{}" appears twice in the '
+                    'same line.'.format(check_prefix))
+            try:
+                event = json.loads(replace_offsets(components[1].strip(),
+                                                   line_number))
+            except ValueError as error:
+                raise XCTestCheckerError(
+                    path, line_number,
+                    'Expected event is not a valid JSON object: '
+                    '{}'.format(error))
+            if not isinstance(event, dict):
+                raise XCTestCheckerError(
+                    path, line_number,
+                    'Expected event is not a JSON object: {}'.format(
+                        components[1].strip()))
+            for key, value in event.items():
+                if isinstance(value, str) and _is_pattern(value):
+                    event[key] = re.compile(value[2:-2])
+            expected_events.append((event, line_number))
+    return expected_events
+
+
+def actual_events(source, use_mmap=False):
+    """
+    Returns a generator that yields each event in the given path or file of
+    JSON lines, along with its line number. Blank lines are skipped.
+    """
+    for index, (line, _) in enumerate(
+            reader.lines(source, use_mmap=use_mmap)):
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError as error:
+            raise XCTestCheckerError(
+                getattr(source, 'name', source), index + 1,
+                'Actual event is not valid JSON: {}'.format(error))
+        yield event, index + 1
+
+
+def mismatched_fields(expected_event, actual_event):
+    """
+    Returns the names of the fields of the given expected event whose values
+    don't match those of the actual event, in sorted order. Fields the
+    expected event doesn't name, such as timestamps, aren't compared.
+    """
+    mismatched = []
+    for key, value in expected_event.items():
+        if key not in actual_event:
+            mismatched.append(key)
+        elif hasattr(value, 'fullmatch'):
+            actual_value = actual_event[key]
+            if not isinstance(actual_value, str) or \
+                    value.fullmatch(actual_value) is None:
+                mismatched.append(key)
+        elif actual_event[key] != value:
+            mismatched.append(key)
+    return sorted(mismatched)
+
+
+def _format(event):
+    return json.dumps(
+        dict((key, '{{' + value.pattern + '}}'
+              if hasattr(value, 'pattern') else value)
+             for key, value in event.items()),
+        sort_keys=True)
+
+
+def compare_events(actual, expected, check_prefix=DEFAULT_EVENT_PREFIX,
+                   use_mmap=False):
+    """
+    Compares each event in the given 'actual' path or file of JSON lines
+    against the expected events in the file at the path 'expected', in order,
+    and raises an XCTestCheckerError at the first that doesn't match. Each
+    expected event must match the next actual event, and every actual event
+    must be expected.
+    """
+    events = actual_events(actual, use_mmap=use_mmap)
+    for expected_event, expected_line_number in \
+            parse_expected_events(expected, check_prefix):
+        actual_event_and_line_number = next(events, None)
+        if actual_event_and_line_number is None:
+            raise XCTestCheckerError(
+                expected, expected_line_number,
+                'There were more events expected to appear than there were '
+                'events in the actual input. Unmet expectation: {}'.format(
+                    _format(expected_event)))
+        actual_event, actual_line_number = actual_event_and_line_number
+        mismatched = mismatched_fields(expected_event, actual_event)
+        if mismatched:
+            raise XCTestCheckerError(
+                expected, expected_line_number,
+                'Actual event did not match the expected event in fields: '
+                '{}.\nActual (line {}): {}\nExpected: {}'.format(
+                    ', '.join(mismatched), actual_line_number,
+                    json.dumps(actual_event, sort_keys=True),
+                    _format(expected_event)))
+
+    actual_event_and_line_number = next(events, None)
+    if actual_event_and_line_number is not None:
+        actual_event, actual_line_number = actual_event_and_line_number
+        raise XCTestCheckerError(
+            expected, 1,
+            'The actual input contained more events than were expected. '
+            'First unexpected event (line {}): {}'.format(
+                actual_line_number, json.dumps(actual_event, sort_keys=True)))
@@ -10,32 +10,64 @@
 
 import re
 
+# The kinds of token an expectation is made of:
+# - Text, which is passed on unchanged. The value is the text. Whether it is
+#   literal or regular expression syntax is decided by xctest_checker.pattern
+#   once line directives have been substituted.
+# - A line directive, such as "[[@LINE+3]]". The value is the offset from the
+#   line number of the expectation, as an integer.
+TEXT = 'text'
+LINE = 'line'
 
-def replace_offsets(line, line_number):
-    """
-    Replace all line directives in the given line with the given line number.
+_LINE_DIRECTIVE_START = '[[@LINE'
 
-    Line directives come in two forms:
-    1. "[[@LINE]]", with no offset.
-    2. "[[@LINE+10]]" or "[[@LINE-3]]", with a positive or negative offset.
+_TOKEN = re.compile(r'''
+    (?P<line>\[\[@LINE(?P<offset>[+-]\d+)?\]\])
+  | (?P<malformed>\[\[@LINE(?:[^\]]|\](?!\]))*(?:\]\])?)
+  | (?P<text>(?:(?!\[\[@LINE).)+)
+''', re.VERBOSE | re.DOTALL)
+
+
+def tokenize(line):
+    """
+    Returns the list of (kind, value) tokens that the given expectation is
+    made of, in order. Raises a ValueError if the expectation contains a
+    malformed line directive.
     """
-    pattern = re.compile(r'\[\[@LINE(?P<offset>[+-]\d+)?\]\]')
-
-    result = line
-    for match in pattern.finditer(line):
-        offset_string = match.groupdict()['offset']
-        if offset_string is None:
-            offset_string = '0'
-        try:
-            offset = int(offset_string)
-        except ValueError:
-            # Re-raise the error, but with a friendlier explanation of what
-            # went wrong.
+    tokens = []
+    for match in _TOKEN.finditer(line):
+        kind = match.lastgroup
+        if kind == 'malformed':
             raise ValueError(
                 'Invalid line offset: "{}". Line offsets must be numerical, '
                 'such as "[[@LINE+10]]" or "[[@LINE-2]]"'.format(
                     match.group()))
-        result = result.replace(match.group(), str(line_number + offset))
+        if kind == LINE:
+            offset = match.group('offset')
+            tokens.append((LINE, int(offset) if offset else 0))
+        else:
+            tokens.append((TEXT, match.group()))
+    return tokens
 
-    return result
 
+def substitute(tokens, line_number):
+    """
+    Returns the text of the given tokens, with each line directive replaced
+    by the given line number plus its offset.
+    """
+    return ''.join(str(line_number + value) if kind == LINE else value
+                   for kind, value in tokens)
+
+
+def replace_offsets(line, line_number):
+    """
+    Replace all line directives in the given line with the given line number.
+
+    Line directives come in two forms:
+    1. "[[@LINE]]", with no offset.
+    2. "[[@LINE+10]]" or "[[@LINE-3]]", with a positive or negative offset.
+    """
+    if _LINE_DIRECTIVE_START not in line:
+        # Most expectations have no line directives.
+        return line
+    return substitute(tokenize(line), line_number)
@@ -12,13 +12,44 @@
 from __future__ import absolute_import
 
 import argparse
+import collections
+import os
+import sys
 import textwrap
 
 from . import compare
+from . import events
+from . import pattern
 
+DEFAULT_CHECK_PREFIX = '// CHECK: '
 
-def main():
-    parser = argparse.ArgumentParser(
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """
+    An ArgumentParser that writes its help, usage and errors to the given
+    streams, rather than to sys.stdout and sys.stderr, so that the server can
+    run several jobs at once without replacing the process' streams.
+    """
+    def __init__(self, stdout=None, stderr=None, **kwargs):
+        super(_ArgumentParser, self).__init__(**kwargs)
+        self._stdout = stdout
+        self._stderr = stderr
+
+    def _print_message(self, message, file=None):
+        if not message:
+            return
+        if file is None or file is sys.stdout:
+            file = self._stdout or sys.stdout
+        else:
+            file = self._stderr or sys.stderr
+        file.write(message)
+
+
+def _parser(prog=None, stdout=None, stderr=None):
+    parser = _ArgumentParser(
+        stdout=stdout,
+        stderr=stderr,
+        prog=prog,
         formatter_class=argparse.RawDescriptionHelpFormatter,
         description=textwrap.dedent("""
             Compare the text output of an XCTest executable with the text
@@ -38,28 +69,136 @@ def main():
             This pipes the output from the "MyTestCase" executable into
             %(prog)s, which compares that output to the expected output from
             "MyTestCase/main.swift".
+
+            Several outputs may be checked against the same expected file in
+            a single invocation by passing one -p option per output. The Nth
+            prefix is used to check the Nth output:
+
+                %(prog)s -p "// CHECK-A:" -p "// CHECK-B:" a.txt b.txt \\
+                    Tests/Functional/MyTestCase/main.swift
+
+            With --events, the actual output is instead the JSON lines that
+            an XCTest executable writes when it is passed --event-stream, and
+            each expected line is a JSON object whose fields must equal those
+            of the next event:
+
+                // EVENT: {"event": "caseFinish", "result": "passed"}
             """))
     parser.add_argument(
         'actual',
-        type=argparse.FileType('r'),
-        default='-',
-        help='A path to a file containing the actual output of an XCTest '
-             'run, or an input stream of the output. If no argument is '
-             'specified, reads from stdin by default.')
+        nargs='+',
+        help='One or more paths to files containing the actual output of an '
+             'XCTest run, or "-" to read an input stream of the output from '
+             'stdin.')
     parser.add_argument('expected', help='A path to a file containing the '
                                          'expected output of an XCTest run.')
     parser.add_argument('-p', '--check-prefix',
-                        default='// CHECK: ',
+                        dest='check_prefixes',
+                        metavar='CHECK_PREFIX',
+                        action='append',
                         help='%(prog)s checks actual output against expected '
                              'output. By default, %(prog)s only checks lines '
-                             'that are prefixed with "%(default)s". This '
+                             'that are prefixed with "{}". This '
                              'option can be used to change that '
                              'prefix. Leading and trailing whitespace is '
                              'ignored unless the check line contains explicit '
-                             '^ or $ characters.')
-    args = parser.parse_args()
-    compare.compare(args.actual, args.expected, args.check_prefix)
+                             '^ or $ characters. When checking several actual '
+                             'outputs, pass this option once per '
+                             'output.'.format(DEFAULT_CHECK_PREFIX))
+    parser.add_argument('--mmap',
+                        action='store_true',
+                        help='Map actual outputs that are regular files into '
+                             'memory, rather than reading them in large '
+                             'buffered chunks.')
+    parser.add_argument('--stats',
+                        action='store_true',
+                        help='Print how many lines were matched by literal '
+                             'string comparison, by a literal prefix '
+                             'followed by a regular expression, and by a '
+                             'regular expression alone.')
+    parser.add_argument('--report-all',
+                        action='store_true',
+                        help='Report every line that does not match, rather '
+                             'than stopping at the first. After each '
+                             'mismatch, matching resumes where the expected '
+                             'and actual output next line up.')
+    parser.add_argument('--events',
+                        action='store_true',
+                        help='Compare the events in JSON lines written by '
+                             'an XCTest executable passed --event-stream, '
+                             'rather than its text output. Only the fields '
+                             'named by each expected event are compared. '
+                             'The default check prefix is "{}".'.format(
+                                 events.DEFAULT_EVENT_PREFIX))
+    parser.add_argument('--window',
+                        type=int,
+                        default=compare.DEFAULT_WINDOW,
+                        help='With --report-all, the number of lines to look '
+                             'ahead by in the expected and actual output to '
+                             'find where they line up after a mismatch. '
+                             'Defaults to %(default)s.')
+    return parser
+
+
+def parse_arguments(argv=None, prog=None, stdout=None, stderr=None):
+    """
+    Parses the given command-line arguments, and returns them with the
+    default check prefix filled in. Exits if they are invalid, as
+    argparse does, having written the error to 'stderr'.
+    """
+    parser = _parser(prog, stdout=stdout, stderr=stderr)
+    args = parser.parse_args(argv)
+    args.check_prefixes = args.check_prefixes or [
+        events.DEFAULT_EVENT_PREFIX if args.events else DEFAULT_CHECK_PREFIX]
+    if len(args.check_prefixes) != len(args.actual):
+        parser.error('{} actual outputs were given, but {} check prefixes; '
+                     'pass one -p option per actual output.'.format(
+                         len(args.actual), len(args.check_prefixes)))
+    if args.window < 1:
+        parser.error('--window must be at least 1.')
+    if args.events and (args.stats or args.report_all):
+        parser.error('--stats and --report-all apply to text output only, '
+                     'and cannot be combined with --events.')
+    return parser, args
+
+
+def main(argv=None, prog=None, cwd=None, stdin=None, stdout=None,
+         stderr=None):
+    """
+    Checks the actual outputs named by the given command-line arguments, as
+    if run from the directory 'cwd', reading "-" from 'stdin' and writing to
+    'stdout' and 'stderr'. Each defaults to that of this process. Raises
+    XCTestCheckerError if an output doesn't match.
+    """
+    stdin = stdin or sys.stdin
+    stderr = stderr or sys.stderr
+    parser, args = parse_arguments(argv, prog, stdout=stdout, stderr=stderr)
+    check_prefixes = args.check_prefixes
+
+    def resolve(path):
+        if path == '-':
+            return stdin
+        return os.path.join(cwd, path) if cwd else path
 
+    actuals = [resolve(actual) for actual in args.actual]
+    expected = resolve(args.expected)
+    for actual in args.actual:
+        if actual != '-' and not os.path.isfile(resolve(actual)):
+            parser.error("can't open '{}': no such file".format(actual))
+    if args.events:
+        for actual, check_prefix in zip(actuals, check_prefixes):
+            events.compare_events(actual, expected, check_prefix,
+                                  use_mmap=args.mmap)
+        return
+    stats = collections.Counter() if args.stats else None
+    try:
+        compare.compare_all(actuals, expected, check_prefixes,
+                            use_mmap=args.mmap, stats=stats,
+                            report_all=args.report_all, window=args.window)
+    finally:
+        if stats is not None:
+            stderr.write('xctest_checker: {}\n'.format(', '.join(
+                '{} {}'.format(stats[kind], kind) for kind in pattern.KINDS)))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,138 @@
+# xctest_checker/pattern.py - Matches expectations against lines -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import re
+
+# The ways in which an expectation may be matched, from cheapest to most
+# expensive.
+LITERAL = 'literal'
+PREFIX = 'prefix'
+REGEX = 'regex'
+KINDS = (LITERAL, PREFIX, REGEX)
+
+# Characters that have a special meaning in a regular expression.
+_SPECIAL_CHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+# Characters that repeat the token that precedes them.
+_QUANTIFIERS = frozenset('*+?{')
+
+# Escape sequences that stand for a single literal character.
+_CHARACTER_ESCAPES = {
+    'a': '\a', 'f': '\f', 't': '\t', 'v': '\v',
+}
+
+
+def _add_whitespace_leniency(original_regex):
+    return "^ *" + original_regex + " *$"
+
+
+def split_prefix(regex, wildcard=None):
+    """
+    Splits the given regular expression into the characters of the literal
+    text it begins with and the remainder of the expression, which is empty if
+    the entire expression is literal.
+
+    If 'wildcard' is given, an unescaped "." that isn't quantified is
+    included in the prefix as 'wildcard', rather than ending it.
+    """
+    prefix = []
+    index = 0
+    while index < len(regex):
+        character = regex[index]
+        if character == '\\' and index + 1 < len(regex):
+            escaped = regex[index + 1]
+            if escaped in _CHARACTER_ESCAPES:
+                character = _CHARACTER_ESCAPES[escaped]
+            elif ord(escaped) < 128 and escaped.isalnum():
+                # Character classes such as \d, anchors such as \b, and
+                # backreferences.
+                break
+            else:
+                character = escaped
+            length = 2
+        elif character == '.' and wildcard is not None:
+            character = wildcard
+            length = 1
+        elif character in _SPECIAL_CHARACTERS:
+            break
+        else:
+            length = 1
+
+        following = index + length
+        if following < len(regex) and regex[following] in _QUANTIFIERS:
+            # The quantifier applies to this character, so it belongs with
+            # the remainder of the expression.
+            break
+        prefix.append(character)
+        index = following
+    return prefix, regex[index:]
+
+
+class Pattern(object):
+    """
+    An expectation compiled for matching against lines of actual output.
+
+    Leading and trailing spaces in the actual line are ignored, unless the
+    expectation contains explicit ^ or $ characters. Expectations are
+    classified when they are compiled: those that are entirely literal text
+    are matched with string comparison, those that begin with literal text are
+    rejected by string comparison before the rest of the regular expression
+    is tried, and only the remainder are matched with a regular expression
+    alone.
+    """
+    __slots__ = ('kind', 'literal', 'regex', 'source')
+
+    def __init__(self, expected_line):
+        self.source = expected_line
+        literal, remainder = split_prefix(expected_line)
+        literal = ''.join(literal)
+        if '|' in expected_line or literal.startswith(' ') or \
+                (not remainder and literal.endswith(' ')):
+            # Alternation may apply to more than the literal prefix, and
+            # escaped spaces interact with the whitespace leniency, so these
+            # are left entirely to the regular expression engine.
+            literal, remainder = '', expected_line
+
+        if not remainder:
+            self.kind = LITERAL
+            self.literal = literal
+            self.regex = None
+        elif literal:
+            self.kind = PREFIX
+            self.literal = literal
+            self.regex = re.compile(remainder + ' *$')
+        else:
+            self.kind = REGEX
+            self.literal = ''
+            self.regex = re.compile(_add_whitespace_leniency(expected_line))
+
+    def match(self, actual_line):
+        """
+        Returns True if the given line of actual output matches this
+        expectation.
+        """
+        if self.kind is REGEX:
+            return self.regex.match(actual_line) is not None
+
+        start = len(actual_line) - len(actual_line.lstrip(' '))
+        if self.kind is LITERAL:
+            # A "$" matches just before a newline at the end of the line.
+            end = len(actual_line)
+            if actual_line.endswith('\n'):
+                end -= 1
+            return actual_line[start:end].rstrip(' ') == self.literal
+
+        if not actual_line.startswith(self.literal, start):
+            return False
+        # Matching from an offset, rather than slicing the line, leaves ^ and
+        # lookbehind assertions in the remainder behaving as they would have
+        # in the whole expression.
+        return self.regex.match(actual_line,
+                                start + len(self.literal)) is not None
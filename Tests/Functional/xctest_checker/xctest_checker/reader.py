@@ -0,0 +1,154 @@
+# xctest_checker/reader.py - Streams lines of actual output -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import mmap
+import os
+import stat
+import sys
+
+from .error import XCTestCheckerError
+
+# The number of bytes requested from the underlying stream per read. Large
+# reads keep the number of system calls low for the multi-hundred megabyte
+# logs some XCTest executables produce.
+BUFFER_SIZE = 1 << 20
+
+# The longest line, in bytes, that is read from a stream. Output with no
+# newline at all, such as from a test stuck in a loop, is reported as an
+# error rather than held in memory until the stream ends.
+MAX_LINE_SIZE = 1 << 26
+
+
+def lines(source, use_mmap=False):
+    """
+    Returns a generator that yields a (line, byte offset) tuple for each line
+    in the given source, where the byte offset is that of the first byte of
+    the line. The source may be a path, "-" for stdin, or a file object.
+
+    Only one buffer's worth of the source is held in memory at a time, and
+    nothing more is read once the generator is closed, so callers can stop
+    reading as soon as they find a mismatch. Raises an XCTestCheckerError if
+    a line read from a stream is longer than MAX_LINE_SIZE bytes.
+
+    Lines are decoded from UTF-8 one at a time, replacing invalid bytes, and
+    "\\r\\n" line endings are normalized to "\\n", as Python does for files
+    opened in text mode. If 'use_mmap' is True and the source is a regular
+    file, it is mapped into memory rather than read.
+    """
+    name = getattr(source, 'name', source)
+    if source == '-':
+        source = sys.stdin
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            for result in _binary_lines(f, name, use_mmap):
+                yield result
+        return
+
+    binary = getattr(source, 'buffer', None)
+    if binary is not None:
+        # A text-mode file: read the bytes underneath it directly.
+        source = binary
+    elif not _is_binary(source):
+        # A file-like object with no underlying bytes, such as a StringIO.
+        for result in _text_lines(source):
+            yield result
+        return
+
+    for result in _binary_lines(source, name, use_mmap):
+        yield result
+
+
+def _is_binary(file_object):
+    mode = getattr(file_object, 'mode', '')
+    return 'b' in mode or hasattr(file_object, 'readinto')
+
+
+def _text_lines(file_object):
+    offset = 0
+    for line in file_object:
+        yield line, offset
+        offset += len(line.encode('utf-8'))
+
+
+def _decode(raw_line):
+    if raw_line.endswith(b'\r\n'):
+        raw_line = raw_line[:-2] + b'\n'
+    return raw_line.decode('utf-8', 'replace')
+
+
+def _binary_lines(file_object, name, use_mmap):
+    if use_mmap and _is_regular_file(file_object):
+        return _mapped_lines(file_object)
+    return _buffered_lines(file_object, name)
+
+
+def _is_regular_file(file_object):
+    try:
+        return stat.S_ISREG(os.fstat(file_object.fileno()).st_mode)
+    except (AttributeError, IOError, OSError, ValueError):
+        return False
+
+
+def _mapped_lines(file_object):
+    if os.fstat(file_object.fileno()).st_size == 0:
+        # Empty files cannot be mapped.
+        return
+    mapped = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        start = 0
+        end = len(mapped)
+        while start < end:
+            newline = mapped.find(b'\n', start)
+            stop = end if newline == -1 else newline + 1
+            yield _decode(mapped[start:stop]), start
+            start = stop
+    finally:
+        mapped.close()
+
+
+def _buffered_lines(file_object, name):
+    # A newline byte never appears within a multi-byte UTF-8 sequence, so
+    # the raw bytes can be split into lines before they're decoded. The
+    # pieces of a line that spans several reads are kept in a list, and
+    # joined once its end is read.
+    offset = 0
+    line_number = 1
+    pending = []
+    pending_size = 0
+    while True:
+        chunk = file_object.read(BUFFER_SIZE)
+        if not chunk:
+            break
+        start = 0
+        while True:
+            newline = chunk.find(b'\n', start)
+            if newline == -1:
+                break
+            if pending:
+                pending.append(chunk[:newline + 1])
+                raw_line = b''.join(pending)
+                pending = []
+                pending_size = 0
+            else:
+                raw_line = chunk[start:newline + 1]
+            yield _decode(raw_line), offset
+            offset += len(raw_line)
+            line_number += 1
+            start = newline + 1
+        if start < len(chunk):
+            pending.append(chunk[start:])
+            pending_size += len(chunk) - start
+            if pending_size > MAX_LINE_SIZE:
+                raise XCTestCheckerError(
+                    name, line_number,
+                    'Actual line at byte offset {} is longer than {} '
+                    'bytes'.format(offset, MAX_LINE_SIZE))
+    if pending:
+        yield _decode(b''.join(pending)), offset
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# xctest_checker/server.py - Long-lived xctest_checker process -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from __future__ import absolute_import
+
+import argparse
+import io
+import json
+import os
+import socketserver
+import struct
+import textwrap
+import traceback
+
+from . import main as checker_main
+
+# The environment variable the client shim, xctest_checker_client.py, reads
+# the path of the server's socket from.
+SOCKET_ENVIRONMENT_VARIABLE = 'XCTEST_CHECKER_SOCKET'
+
+# Messages in both directions are a 4-byte big-endian length followed by that
+# many bytes of UTF-8 encoded JSON. A request whose "stdin" is true is
+# followed by the client's stdin, as frames of a 4-byte big-endian length
+# followed by that many bytes, ending with an empty frame.
+_LENGTH = struct.Struct('>I')
+
+
+def read_message(sock):
+    """
+    Reads a single length-prefixed JSON message from the given socket, or
+    returns None if the peer closed the connection.
+    """
+    header = _read_exactly(sock, _LENGTH.size)
+    if header is None:
+        return None
+    payload = _read_exactly(sock, _LENGTH.unpack(header)[0])
+    if payload is None:
+        return None
+    return json.loads(payload.decode('utf-8'))
+
+
+def write_message(sock, message):
+    """
+    Writes a single length-prefixed JSON message to the given socket.
+    """
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _read_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class _FramedStream(io.RawIOBase):
+    """
+    The stdin that a client sends after its request, as length-prefixed
+    frames, read as a binary file. Only one frame is held at a time.
+    """
+    name = '-'
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._frame = b''
+        self._finished = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._frame and not self._finished:
+            header = _read_exactly(self._sock, _LENGTH.size)
+            size = _LENGTH.unpack(header)[0] if header else 0
+            frame = _read_exactly(self._sock, size) if size else b''
+            if header is None or frame is None:
+                raise IOError('The client closed the connection before '
+                              'sending all of stdin')
+            self._frame = frame
+            self._finished = size == 0
+        count = min(len(buffer), len(self._frame))
+        buffer[:count] = self._frame[:count]
+        self._frame = self._frame[count:]
+        return count
+
+    def drain(self):
+        """
+        Reads the rest of the frames, so that the client, which sends all of
+        them before reading the response, isn't left blocked.
+        """
+        buffer = bytearray(1 << 16)
+        while self.readinto(buffer):
+            pass
+
+
+def run_job(argv, cwd, stdin=None):
+    """
+    Runs xctest_checker with the given command line arguments, as if it had
+    been launched from the given working directory with the given binary
+    file as stdin. Returns a dictionary containing the exit code and the
+    text that was written to stdout and stderr. Jobs may run concurrently,
+    since none changes the process' working directory or streams.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    try:
+        checker_main.main(argv, prog='xctest_checker.py', cwd=cwd,
+                          stdin=stdin or io.BytesIO(), stdout=stdout,
+                          stderr=stderr)
+        exit_code = 0
+    except SystemExit as e:
+        # argparse exits when given invalid arguments, or -h.
+        if e.code is None or isinstance(e.code, int):
+            exit_code = e.code or 0
+        else:
+            stderr.write('{}\n'.format(e.code))
+            exit_code = 1
+    except Exception as e:
+        # Match the output of an uncaught exception in an xctest_checker
+        # process, which is what lit displays when a check fails.
+        stderr.write(''.join(
+            traceback.format_exception_only(type(e), e)))
+        exit_code = 1
+
+    return {
+        'exit_code': exit_code,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+    }
+
+
+class _JobHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        request = read_message(self.request)
+        if request is None:
+            return
+        stdin = None
+        if request.get('stdin'):
+            stdin = _FramedStream(self.request)
+        response = run_job(request['argv'], request['cwd'],
+                           stdin and io.BufferedReader(stdin))
+        if stdin is not None:
+            stdin.drain()
+        write_message(self.request, response)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Closing the server waits for the jobs that are still running.
+    daemon_threads = False
+    block_on_close = True
+    timed_out = False
+
+    def handle_timeout(self):
+        self.timed_out = True
+
+
+def serve(socket_path, idle_timeout=None):
+    """
+    Accepts xctest_checker jobs on a Unix socket at the given path until
+    interrupted, or until no job has arrived for 'idle_timeout' seconds.
+    """
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = _Server(socket_path, _JobHandler)
+    # handle_request() waits at most 'timeout' seconds for a connection (or
+    # forever, if it is None). Each job is then handled on its own thread.
+    server.timeout = idle_timeout
+    try:
+        while not server.timed_out:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=textwrap.dedent("""
+            Run xctest_checker as a long-lived process that accepts jobs on a
+            Unix socket, in order to avoid paying for Python startup on each
+            functional test."""),
+        epilog=textwrap.dedent("""
+            Start the server, then point the client shim at its socket:
+
+                python -m xctest_checker.server /tmp/xctest_checker.sock &
+                export {}=/tmp/xctest_checker.sock
+
+            lit.cfg invokes xctest_checker through xctest_checker_client.py,
+            which sends its arguments to the server when one is listening on
+            that socket, and otherwise checks the output in-process.
+            """.format(SOCKET_ENVIRONMENT_VARIABLE)))
+    parser.add_argument('socket', help='The path at which to create the '
+                                       'Unix socket the server listens on.')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='Exit after this many seconds without a job. '
+                             'By default, the server runs until interrupted.')
+    args = parser.parse_args(argv)
+    serve(args.socket, idle_timeout=args.idle_timeout)
+
+
+if __name__ == '__main__':
+    main()
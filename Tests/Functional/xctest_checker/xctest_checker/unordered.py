@@ -0,0 +1,175 @@
+# xctest_checker/unordered.py - Matches lines in any order -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from . import pattern
+
+# The key under which a node of the prefix trie stores the patterns whose
+# indexed prefix ends at that node, and the key of the edge taken by any
+# character, for an unescaped "." in a pattern. Neither can collide with a
+# character key.
+_PATTERNS = None
+_ANY_CHARACTER = object()
+
+
+def _index_key(compiled):
+    """
+    Returns the characters that the given pattern requires a line of actual
+    output to begin with, after any leading spaces, with _ANY_CHARACTER for
+    positions that may be any character.
+    """
+    if '|' in compiled.source:
+        return []
+    key, _ = pattern.split_prefix(compiled.source, wildcard=_ANY_CHARACTER)
+    if key and (key[0] == ' ' or key[0] is _ANY_CHARACTER):
+        # An escaped leading space, or a leading "." that may match one,
+        # interacts with the whitespace leniency: candidates() skips the
+        # leading spaces of a line before walking the trie.
+        return []
+    return key
+
+
+class CandidateIndex(object):
+    """
+    Indexes a group of patterns by their literal text, so that the patterns
+    that may match a line of actual output can be found without trying each
+    of them in turn.
+
+    Entirely literal patterns are looked up by the line's text in a hash
+    table. Other patterns that begin with literal text (in which an unescaped
+    "." may stand for any character, as in "Test Case 'Foo.test_bar'") are
+    stored in a trie, which the line is walked through once to find every
+    prefix it begins with. Only patterns that begin with no literal text at
+    all are tried against every line.
+    """
+    def __init__(self, patterns):
+        self._literals = {}
+        self._prefixes = {}
+        self._regexes = []
+        for index, compiled in enumerate(patterns):
+            if compiled.kind is pattern.LITERAL:
+                self._literals.setdefault(compiled.literal, []).append(index)
+                continue
+            key = _index_key(compiled)
+            if not key:
+                self._regexes.append(index)
+                continue
+            node = self._prefixes
+            for character in key:
+                node = node.setdefault(character, {})
+            node.setdefault(_PATTERNS, []).append(index)
+
+    def candidates(self, actual_line):
+        """
+        Returns the indices of the patterns that may match the given line.
+        Every pattern that matches is included, but some of those included
+        may not match.
+        """
+        start = len(actual_line) - len(actual_line.lstrip(' '))
+        end = len(actual_line)
+        if actual_line.endswith('\n'):
+            end -= 1
+        result = list(self._literals.get(
+            actual_line[start:end].rstrip(' '), ()))
+
+        nodes = [self._prefixes]
+        for character in actual_line[start:end]:
+            next_nodes = []
+            for node in nodes:
+                child = node.get(character)
+                if child is not None:
+                    next_nodes.append(child)
+                    result.extend(child.get(_PATTERNS, ()))
+                child = node.get(_ANY_CHARACTER)
+                if child is not None:
+                    next_nodes.append(child)
+                    result.extend(child.get(_PATTERNS, ()))
+            if not next_nodes:
+                break
+            nodes = next_nodes
+
+        result.extend(self._regexes)
+        return result
+
+
+def match_unordered(patterns, actual_lines):
+    """
+    Finds a one-to-one assignment of the given patterns to the given lines of
+    actual output, such that each pattern matches the line assigned to it.
+    Returns a tuple of the indices of the patterns and the indices of the
+    lines that could not be assigned, both of which are empty if the lines
+    match the patterns in some order.
+
+    This is a maximum bipartite matching, found with augmenting paths, over
+    the edges between each line and the patterns it matches. Candidate
+    patterns for each line are found with a CandidateIndex, so that only
+    patterns that share a line's literal prefix are ever matched against it.
+    """
+    index = CandidateIndex(patterns)
+    edges = []
+    for actual_line in actual_lines:
+        edges.append([candidate
+                      for candidate in index.candidates(actual_line)
+                      if patterns[candidate].match(actual_line)])
+
+    line_for_pattern = [None] * len(patterns)
+    pattern_for_line = [None] * len(actual_lines)
+    for line_index in range(len(actual_lines)):
+        # Most lines match exactly one pattern, so try a free one first.
+        for candidate in edges[line_index]:
+            if line_for_pattern[candidate] is None:
+                line_for_pattern[candidate] = line_index
+                pattern_for_line[line_index] = candidate
+                break
+        else:
+            _augment(line_index, edges, line_for_pattern, pattern_for_line)
+
+    unmatched_patterns = [i for i, line_index in enumerate(line_for_pattern)
+                          if line_index is None]
+    unmatched_lines = [i for i, candidate in enumerate(pattern_for_line)
+                       if candidate is None]
+    return unmatched_patterns, unmatched_lines
+
+
+def _augment(root, edges, line_for_pattern, pattern_for_line):
+    """
+    Searches for a path from the given unassigned line that alternates
+    between unassigned and assigned edges and ends at an unassigned pattern,
+    and flips the assignments along it if one is found. The search is
+    iterative, since paths can be as long as the group is large.
+    """
+    visited = set()
+    # Each entry is a line, and the position in its edge list to try next.
+    stack = [[root, 0]]
+    # The pattern through which each line on the stack was reached.
+    via = []
+    while stack:
+        frame = stack[-1]
+        line_index, position = frame
+        if position == len(edges[line_index]):
+            stack.pop()
+            if via:
+                via.pop()
+            continue
+        frame[1] += 1
+        candidate = edges[line_index][position]
+        if candidate in visited:
+            continue
+        visited.add(candidate)
+        owner = line_for_pattern[candidate]
+        if owner is None:
+            # Found a free pattern: flip every edge along the path.
+            path = via + [candidate]
+            for (path_line, _), path_pattern in zip(stack, path):
+                line_for_pattern[path_pattern] = path_line
+                pattern_for_line[path_line] = path_pattern
+            return True
+        via.append(candidate)
+        stack.append([owner, 0])
+    return False
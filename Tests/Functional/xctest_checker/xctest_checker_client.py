@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# xctest_checker_client.py - Verify XCTest output via a server -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+# This shim accepts the same arguments as xctest_checker.py. If a server
+# started with `python -m xctest_checker.server` is listening on the socket
+# named by $XCTEST_CHECKER_SOCKET, the job is forwarded to it; otherwise the
+# output is checked in this process. It deliberately imports as little as
+# possible, since its startup time is what the server exists to save.
+
+import json
+import os
+import socket
+import struct
+import sys
+
+_LENGTH = struct.Struct('>I')
+
+# The number of bytes of stdin sent to the server in each frame.
+_FRAME_SIZE = 1 << 16
+
+
+def _read_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            raise IOError('xctest_checker server closed the connection')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _connect():
+    socket_path = os.environ.get('XCTEST_CHECKER_SOCKET')
+    if not socket_path:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (IOError, OSError):
+        sock.close()
+        return None
+    return sock
+
+
+def _send(sock, payload):
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def _run_remotely(sock, argv):
+    # The server can't read our stdin, so if it's used, it's sent after the
+    # request, a frame at a time, so that it's never all held in memory.
+    reads_stdin = '-' in argv
+    request = {'argv': argv, 'cwd': os.getcwd(), 'stdin': reads_stdin}
+    _send(sock, json.dumps(request).encode('utf-8'))
+    if reads_stdin:
+        stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+        while True:
+            frame = stdin.read(_FRAME_SIZE)
+            _send(sock, frame)
+            if not frame:
+                break
+    header = _read_exactly(sock, _LENGTH.size)
+    response = json.loads(
+        _read_exactly(sock, _LENGTH.unpack(header)[0]).decode('utf-8'))
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['exit_code']
+
+
+def main():
+    argv = sys.argv[1:]
+    sock = _connect()
+    if sock is None:
+        # No server is running: fall back to checking in-process.
+        import xctest_checker.main
+        xctest_checker.main.main(argv)
+        return 0
+    try:
+        return _run_remotely(sock, argv)
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# test_cache.py - Unit tests for xctest_compile_cache.cache -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from xctest_compile_cache import cache
+from xctest_compile_cache.cache import CompileCache
+
+# A stand-in for swiftc, which writes a fixed-size "executable" containing
+# its arguments to the path given with -o, logs each invocation to a file
+# beside it, and fails if any argument is "fail".
+_FAKE_COMPILER = '''
+import os
+import sys
+arguments = sys.argv[1:]
+with open(os.path.join(os.path.dirname(__file__), 'log'), 'a') as log:
+    log.write('compiled\\n')
+if 'fail' in arguments:
+    sys.exit(3)
+if '-o' in arguments:
+    with open(arguments[arguments.index('-o') + 1], 'w') as f:
+        f.write(' '.join(arguments).ljust(100)[:100])
+'''
+
+
+def _write(path, content):
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+class CompileCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.compiler = _write(self.path('swiftc.py'), _FAKE_COMPILER)
+        self.log = self.path('log')
+        self.source = _write(self.path('main.swift'), 'print(1)\n')
+        self.library = _write(self.path('libXCTest.so'), 'library')
+        self.cache = CompileCache(self.path('cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, *components):
+        return os.path.join(self.directory, *components)
+
+    def compile(self, *arguments, **kwargs):
+        cache = kwargs.get('cache', self.cache)
+        command = [sys.executable, self.compiler] + list(arguments)
+        return cache.compile(command, [self.library])
+
+    def compilations(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return len(f.readlines())
+
+    def test_unchanged_compile_is_reused(self):
+        output = self.path('Main')
+        self.assertEqual(self.compile(self.source, '-o', output), 0)
+        os.remove(output)
+        self.assertEqual(self.compile(self.source, '-o', output), 0)
+        self.assertEqual(self.compilations(), 1)
+        with open(output) as f:
+            self.assertIn(self.source, f.read())
+
+    def test_changed_source_is_recompiled(self):
+        self.compile(self.source, '-o', self.path('Main'))
+        _write(self.source, 'print(2)\n')
+        self.compile(self.source, '-o', self.path('Main'))
+        self.assertEqual(self.compilations(), 2)
+
+    def test_changed_flags_are_recompiled(self):
+        self.compile(self.source, '-o', self.path('Main'))
+        self.compile(self.source, '-o', self.path('Main'), '-Onone')
+        self.assertEqual(self.compilations(), 2)
+
+    def test_changed_dependency_is_recompiled(self):
+        self.compile(self.source, '-o', self.path('Main'))
+        _write(self.library, 'rebuilt library')
+        self.compile(self.source, '-o', self.path('Main'))
+        self.assertEqual(self.compilations(), 2)
+
+    def test_dependency_with_same_size_and_mtime_is_recompiled(self):
+        self.compile(self.source, '-o', self.path('Main'))
+        stat = os.stat(self.library)
+        _write(self.library, 'LIBRARY')
+        os.utime(self.library, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.compile(self.source, '-o', self.path('Main'))
+        self.assertEqual(self.compilations(), 2)
+
+    def test_failed_compile_is_not_cached(self):
+        self.assertEqual(self.compile(self.source, '-o', self.path('Main'),
+                                      'fail'), 3)
+        self.assertEqual(self.compile(self.source, '-o', self.path('Main'),
+                                      'fail'), 3)
+        self.assertEqual(self.compilations(), 2)
+
+    def test_commands_without_an_executable_are_not_cached(self):
+        self.compile(self.source, '-typecheck')
+        self.compile(self.source, '-typecheck')
+        self.assertEqual(self.compilations(), 2)
+        self.assertEqual(self.cache.stats()['bypassed'], 2)
+
+    def test_least_recently_used_are_evicted(self):
+        # Each executable is 100 bytes, so two fit.
+        small_cache = CompileCache(self.path('cache'), max_size=250)
+        for name in ('A', 'B'):
+            self.compile(self.source, '-o', self.path(name), cache=small_cache)
+        # Make A the most recently used, then add a third.
+        entries = os.path.join(small_cache.directory, 'entries')
+        for entry in os.listdir(entries):
+            os.utime(os.path.join(entries, entry), (1, 1))
+        self.compile(self.source, '-o', self.path('A'), cache=small_cache)
+        self.compile(self.source, '-o', self.path('C'), cache=small_cache)
+        self.assertEqual(small_cache.stats()['entries'], 2)
+
+        self.compile(self.source, '-o', self.path('A'), cache=small_cache)
+        self.assertEqual(self.compilations(), 3)
+        self.compile(self.source, '-o', self.path('B'), cache=small_cache)
+        self.assertEqual(self.compilations(), 4)
+
+    def test_stats_count_hits_and_misses(self):
+        for _ in range(3):
+            self.compile(self.source, '-o', self.path('Main'))
+        stats = self.cache.stats(reset=True)
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries'],
+                          stats['size']), (2, 1, 1, 100))
+        self.assertEqual(self.cache.stats()['hits'], 0)
+        self.assertIn('67% hit rate', cache.format_stats(stats))
+
+
+class OutputPathTestCase(unittest.TestCase):
+    def test_executable(self):
+        self.assertEqual(
+            cache.output_path(['swiftc', 'a.swift', '-o', 'A']), 'A')
+
+    def test_other_products(self):
+        for flag in ('-typecheck', '-c', '-emit-library', '-emit-module'):
+            self.assertIsNone(cache.output_path(
+                ['swiftc', 'a.swift', flag, '-o', 'A']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,276 @@
+# xctest_compile_cache/cache.py - Caches test executables -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+
+# Bump this whenever the way keys are computed changes, so that entries
+# stored by an older version are never reused.
+_FORMAT_VERSION = 2
+
+# The default bound on the total size of the cached executables.
+DEFAULT_MAX_SIZE = 1 << 30
+
+# The names of the directory of cached executables and of the file that
+# records each lookup, within the cache directory.
+_ENTRIES = 'entries'
+_STATS = 'stats'
+
+HIT = 'hit'
+MISS = 'miss'
+BYPASS = 'bypass'
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_signature(path):
+    """
+    Returns a JSON-serializable value that changes when the file at the
+    given path, which the compiler command names, does, or None if there is
+    no such file. Swift sources are hashed. Other files, such as the
+    compiler itself, are too large to hash on every compile, and are
+    identified by their size and modification time instead: a toolchain is
+    updated by replacing its files, which changes both.
+    """
+    if not os.path.isfile(path):
+        return None
+    if path.endswith('.swift'):
+        return _hash_file(path)
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _dependency_signature(path):
+    """
+    Returns a hash of the contents of the given dependency, or None if there
+    is no such file. The built XCTest library is rebuilt in place, and a
+    rebuild that changes it can leave its size unchanged within the same
+    timestamp granularity, so it is hashed rather than trusted by its size
+    and modification time.
+    """
+    if not os.path.isfile(path):
+        return None
+    return _hash_file(path)
+
+
+def output_path(command):
+    """
+    Returns the executable that the given compiler command links, or None
+    if it does something else, such as only type-checking, or emits other
+    products that a cached executable wouldn't reproduce.
+    """
+    output = None
+    for index, argument in enumerate(command[1:], 1):
+        if argument.startswith('-emit-') and argument != '-emit-executable':
+            return None
+        if argument in ('-typecheck', '-parse', '-c', '-S'):
+            return None
+        if argument == '-o' and index + 1 < len(command):
+            output = command[index + 1]
+    if output == '-':
+        return None
+    return output
+
+
+def key(command, dependencies):
+    """
+    Returns the cache key for the given compiler command, which includes
+    every flag passed to the compiler, the signature of every file it names,
+    as _file_signature() computes it, and the contents of the given
+    dependencies, such as the built XCTest library that the executable
+    links.
+    """
+    output = output_path(command)
+    files = {}
+    for argument in command:
+        if argument != output and os.path.isfile(argument):
+            files[argument] = _file_signature(argument)
+    inputs = [_FORMAT_VERSION,
+              command,
+              files,
+              [(path, _dependency_signature(path)) for path in dependencies]]
+    return hashlib.sha256(
+        json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CompileCache(object):
+    """
+    A directory of executables, each stored under the key of the command
+    that compiled it, that evicts the least recently used executables once
+    their total size exceeds a bound. Entries are written atomically and
+    may be evicted at any time, so that concurrent lit workers can share a
+    cache without locking it.
+    """
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.entries = os.path.join(directory, _ENTRIES)
+
+    def compile(self, command, dependencies=()):
+        """
+        Runs the given compiler command, unless an executable that it
+        linked before, with the same inputs, is cached, in which case that
+        is copied to its output instead. Returns the exit status of the
+        compiler, or 0 on a hit.
+
+        A hit does not replay the compiler's diagnostics, so commands that
+        are expected to produce them should not be cached.
+        """
+        output = output_path(command)
+        if output is None:
+            self._record(BYPASS)
+            return subprocess.call(command)
+
+        entry = os.path.join(self.entries, key(command, dependencies))
+        try:
+            self._install(entry, output)
+        except (IOError, OSError):
+            pass
+        else:
+            # Marks the entry as recently used.
+            try:
+                os.utime(entry, None)
+            except OSError:
+                pass
+            self._record(HIT)
+            return 0
+
+        self._record(MISS)
+        status = subprocess.call(command)
+        if status == 0:
+            try:
+                self._store(output, entry)
+                self.evict()
+            except (IOError, OSError):
+                # Failing to write the cache is never an error.
+                pass
+        return status
+
+    def _install(self, entry, output):
+        directory = os.path.dirname(os.path.abspath(output))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        os.close(fd)
+        try:
+            shutil.copy2(entry, tmp_path)
+            os.replace(tmp_path, output)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _store(self, output, entry):
+        if not os.path.isdir(self.entries):
+            os.makedirs(self.entries)
+        fd, tmp_path = tempfile.mkstemp(dir=self.entries, prefix='.')
+        os.close(fd)
+        try:
+            shutil.copy2(output, tmp_path)
+            os.replace(tmp_path, entry)
+            # copy2 preserved the output's modification time, which is
+            # what recency is judged by.
+            os.utime(entry, None)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def evict(self):
+        """
+        Removes the least recently used executables until the total size of
+        those that remain is within the bound.
+        """
+        entries = []
+        for name in os.listdir(self.entries):
+            if name.startswith('.'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.entries, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.entries, name))
+            except OSError:
+                # Another process evicted it first.
+                pass
+            total -= size
+
+    def _record(self, outcome):
+        """
+        Appends the outcome of a lookup to the statistics file. Each outcome
+        is written with a single append, so concurrent processes don't
+        interleave them.
+        """
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd = os.open(os.path.join(self.directory, _STATS),
+                         os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, (outcome + '\n').encode('ascii'))
+            finally:
+                os.close(fd)
+        except (IOError, OSError):
+            pass
+
+    def stats(self, reset=False):
+        """
+        Returns a dictionary of the number of hits, misses and bypassed
+        commands since the statistics were last reset, and the number and
+        total size of the cached executables. If 'reset' is True, the
+        counts are then reset.
+        """
+        counts = {HIT: 0, MISS: 0, BYPASS: 0}
+        stats_path = os.path.join(self.directory, _STATS)
+        try:
+            with open(stats_path) as f:
+                for line in f:
+                    outcome = line.strip()
+                    if outcome in counts:
+                        counts[outcome] += 1
+            if reset:
+                os.remove(stats_path)
+        except (IOError, OSError):
+            pass
+        sizes = []
+        if os.path.isdir(self.entries):
+            for name in os.listdir(self.entries):
+                if not name.startswith('.'):
+                    sizes.append(os.path.getsize(
+                        os.path.join(self.entries, name)))
+        return {'hits': counts[HIT],
+                'misses': counts[MISS],
+                'bypassed': counts[BYPASS],
+                'entries': len(sizes),
+                'size': sum(sizes)}
+
+
+def format_stats(stats):
+    lookups = stats['hits'] + stats['misses']
+    return ('{} hits, {} misses ({:.0%} hit rate), {} not cacheable; '
+            '{} executables, {:.1f} MiB').format(
+                stats['hits'], stats['misses'],
+                stats['hits'] / float(lookups) if lookups else 0.0,
+                stats['bypassed'], stats['entries'],
+                stats['size'] / float(1 << 20))
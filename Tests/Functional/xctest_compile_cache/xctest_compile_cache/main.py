@@ -0,0 +1,69 @@
+# xctest_compile_cache/main.py - Compile through a cache -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from __future__ import absolute_import
+
+import argparse
+import sys
+
+from .cache import CompileCache, DEFAULT_MAX_SIZE, format_stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='xctest_compile_cache.py',
+        description='Compile a test executable, reusing the executable '
+                    'linked by an earlier identical compile if there was '
+                    'one. The compiler command follows "--".')
+    parser.add_argument('--cache-dir',
+                        required=True,
+                        help='The directory in which executables are cached.')
+    parser.add_argument('--max-size',
+                        type=int,
+                        default=DEFAULT_MAX_SIZE,
+                        help='The total size, in bytes, of the executables '
+                             'to keep. The least recently used are evicted '
+                             'beyond it.')
+    parser.add_argument('--dependency',
+                        action='append',
+                        default=[],
+                        dest='dependencies',
+                        help='A file, such as the built XCTest library, '
+                             'that the executable depends on, but that the '
+                             'compiler command does not name. May be given '
+                             'more than once.')
+    parser.add_argument('--stats',
+                        action='store_true',
+                        help='Print the cache statistics instead of '
+                             'compiling.')
+    parser.add_argument('--reset-stats',
+                        action='store_true',
+                        help='With --stats, reset the counts after printing '
+                             'them.')
+    parser.add_argument('command',
+                        nargs=argparse.REMAINDER,
+                        help='The compiler command.')
+    args = parser.parse_args(argv)
+
+    cache = CompileCache(args.cache_dir, max_size=args.max_size)
+    if args.stats:
+        print(format_stats(cache.stats(reset=args.reset_stats)))
+        return 0
+
+    command = args.command
+    if command and command[0] == '--':
+        command = command[1:]
+    if not command:
+        parser.error('a compiler command is required')
+    return cache.compile(command, args.dependencies)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# fake_xctest.py - Behaves like a small XCTest executable -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+"""
+Prints the output that PrintObserver would for the tests below, and writes
+the events EventStreamObserver would, supporting --dump-tests-json,
+--event-stream and comma-separated selectors, and @file arguments of one
+selector per line. test_crashes exits the process part way through. Each
+invocation, with its @file arguments expanded, is recorded in the file named
+by $FAKE_XCTEST_LOG, if it is set.
+"""
+
+import json
+import os
+import sys
+
+TESTS = [
+    ('Fake.FirstTestCase', ['test_passes', 'test_fails', 'test_skips']),
+    ('Fake.SecondTestCase', ['test_crashes', 'test_throws', 'test_passes']),
+]
+DATE = '2016-03-01 12:00:00.000'
+
+
+def expand(argument):
+    if not argument.startswith('@'):
+        return argument
+    with open(argument[1:]) as f:
+        return ','.join(line.strip() for line in f if line.strip())
+
+
+def main(argv):
+    argv = [expand(argument) for argument in argv]
+    if os.environ.get('FAKE_XCTEST_LOG'):
+        with open(os.environ['FAKE_XCTEST_LOG'], 'a') as f:
+            f.write(json.dumps(argv) + '\n')
+    if argv == ['--dump-tests-json']:
+        print(json.dumps({'name': 'All tests', 'tests': [
+            {'name': 'Fake.xctest', 'tests': [
+                {'name': class_name,
+                 'tests': [{'name': method} for method in methods]}
+                for class_name, methods in TESTS]}]}))
+        return 0
+
+    events = None
+    if argv[:1] == ['--event-stream']:
+        events = open(argv[1], 'w')
+        argv = argv[2:]
+    selected = set(argv[0].split(',')) if argv else None
+
+    def emit(event, **fields):
+        if events is not None:
+            fields['event'] = event
+            events.write(json.dumps(fields) + '\n')
+            events.flush()
+
+    def out(line):
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+
+    failures = 0
+    for class_name, methods in TESTS:
+        suite = class_name.split('.', 1)[1]
+        methods = [m for m in methods if selected is None or
+                   '{}/{}'.format(class_name, m) in selected]
+        if not methods:
+            continue
+        out("Test Suite '{}' started at {}".format(suite, DATE))
+        out('{} setUp'.format(suite))
+        for method in methods:
+            name = '{}.{}'.format(suite, method)
+            out("Test Case '{}' started at {}".format(name, DATE))
+            if method == 'test_crashes':
+                out('about to crash')
+                os._exit(3)
+            result, count, unexpected = 'passed', 0, 0
+            if method == 'test_fails':
+                out('/src/main.swift:10: error: {} : XCTFail failed'.format(
+                    name))
+                out('/src/main.swift:11: error: {} : XCTFail failed'.format(
+                    name))
+                result, count = 'failed', 2
+            elif method == 'test_throws':
+                out('<EXPR>:0: error: {} : threw error "E"'.format(name))
+                result, count, unexpected = 'failed', 1, 1
+            elif method == 'test_skips':
+                out('/src/main.swift:20: {} : Test skipped'.format(name))
+                result = 'skipped'
+            failures += count
+            out("Test Case '{}' {} (0.25 seconds)".format(name, result))
+            emit('caseFinish', name=name, result=result, failures=count,
+                 unexpected=unexpected, duration=0.25)
+        out("Test Suite '{}' passed at {}".format(suite, DATE))
+        out('\t Executed {} tests, with 0 failures (0 unexpected) in 0.5 '
+            '(0.5) seconds'.format(len(methods)))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,101 @@
+# test_main.py - Unit tests for xctest_parallel.main -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from xctest_parallel import main
+from xctest_parallel import schedule
+
+_FAKE_XCTEST = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'Inputs', 'fake_xctest.py')
+
+
+class RunTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.invocations = os.path.join(self.directory, 'invocations')
+        os.environ['FAKE_XCTEST_LOG'] = self.invocations
+
+    def tearDown(self):
+        del os.environ['FAKE_XCTEST_LOG']
+        shutil.rmtree(self.directory)
+
+    def run_fake(self, jobs, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stderr(io.StringIO()):
+            succeeded = main.run([sys.executable, _FAKE_XCTEST], jobs,
+                                 output=output, **kwargs)
+        with open(self.invocations) as f:
+            invocations = [json.loads(line) for line in f]
+        return succeeded, output.getvalue().splitlines(), invocations
+
+    def test_merges_output_of_every_worker(self):
+        for jobs in (1, 2, 4):
+            if os.path.exists(self.invocations):
+                os.remove(self.invocations)
+            succeeded, lines, invocations = self.run_fake(jobs)
+            self.assertFalse(succeeded)
+            self.assertEqual(invocations[0], ['--dump-tests-json'])
+            started = [line for line in lines
+                       if line.startswith(('Test Case', 'Test Suite')) and
+                       ' started at ' in line]
+            self.assertEqual([line.split(' started')[0] for line in started], [
+                "Test Suite 'All tests'",
+                "Test Suite 'Fake.xctest'",
+                "Test Suite 'FirstTestCase'",
+                "Test Case 'FirstTestCase.test_passes'",
+                "Test Case 'FirstTestCase.test_fails'",
+                "Test Case 'FirstTestCase.test_skips'",
+                "Test Suite 'SecondTestCase'",
+                "Test Case 'SecondTestCase.test_crashes'",
+                "Test Case 'SecondTestCase.test_throws'",
+                "Test Case 'SecondTestCase.test_passes'",
+            ])
+            self.assertIn('<unknown>:0: error: SecondTestCase.test_crashes : '
+                          'The test process exited with status 3', lines)
+            executed = [line for line in lines if 'Executed' in line]
+            self.assertEqual([line.split(' in ')[0] for line in executed], [
+                '\t Executed 3 tests, with 1 test skipped and 2 failures '
+                '(0 unexpected)',
+                '\t Executed 3 tests, with 2 failures (2 unexpected)',
+                '\t Executed 6 tests, with 1 test skipped and 4 failures '
+                '(2 unexpected)',
+                '\t Executed 6 tests, with 1 test skipped and 4 failures '
+                '(2 unexpected)',
+            ])
+            self.assertIn("Test Suite 'All tests' failed at", lines[-2])
+
+    def test_runs_tests_after_a_crash_in_a_new_process(self):
+        _, _, invocations = self.run_fake(1)
+        self.assertEqual([invocation[-1] for invocation in invocations[1:]], [
+            'Fake.FirstTestCase/test_passes,Fake.FirstTestCase/test_fails,'
+            'Fake.FirstTestCase/test_skips,Fake.SecondTestCase/test_crashes,'
+            'Fake.SecondTestCase/test_throws,Fake.SecondTestCase/test_passes',
+            'Fake.SecondTestCase/test_throws,Fake.SecondTestCase/test_passes',
+        ])
+
+    def test_records_durations(self):
+        path = os.path.join(self.directory, 'times.json')
+        self.run_fake(2, times=schedule.TestTimes(path))
+        with open(path) as f:
+            seconds = json.load(f)
+        self.assertEqual(seconds['FirstTestCase.test_fails'], 0.25)
+        self.assertNotIn('SecondTestCase.test_crashes', seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
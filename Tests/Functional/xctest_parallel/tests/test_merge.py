@@ -0,0 +1,133 @@
+# test_merge.py - Unit tests for xctest_parallel.merge -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import datetime
+import io
+import unittest
+
+from xctest_parallel import merge
+from xctest_parallel.listing import ListedTest, parse_listing
+
+
+def _clock():
+    return datetime.datetime(2016, 3, 1, 12, 0, 0)
+
+
+def _case(name, result, *lines):
+    return merge.CaseResult(name, result, lines=[
+        "Test Case '{}' started".format(name)] + list(lines) + [
+        "Test Case '{}' {}".format(name, result)])
+
+
+class OutputParserTestCase(unittest.TestCase):
+    def test_splits_output_into_test_cases(self):
+        parser = merge.OutputParser()
+        results = [parser.feed(line) for line in [
+            "Test Suite 'Selected tests' started at 2016-03-01 12:00:00.000",
+            "Test Suite 'A' started at 2016-03-01 12:00:00.000",
+            'class setUp',
+            "Test Case 'A.test_a' started at 2016-03-01 12:00:00.000",
+            "/main.swift:3: error: A.test_a : failed",
+            "Test Case 'A.test_b' passed (1.0 seconds)",
+            "/main.swift:4: error: A.test_a : failed",
+            "Test Case 'A.test_a' failed (0.125 seconds)",
+            "Test Suite 'A' failed at 2016-03-01 12:00:00.000",
+            '\t Executed 1 test, with 2 failures (0 unexpected) in 0.1 (0.1) '
+            'seconds',
+        ]]
+        finished = [result for result in results if result is not None]
+        self.assertEqual(len(finished), 1)
+        self.assertEqual(finished[0].name, 'A.test_a')
+        self.assertEqual(finished[0].result, merge.FAILED)
+        self.assertEqual(finished[0].failures, 2)
+        self.assertEqual(finished[0].duration, 0.125)
+        self.assertEqual(finished[0].lines[0], 'class setUp')
+        self.assertEqual(len(finished[0].lines), 6)
+        self.assertEqual(parser.finish('crashed'), (None, []))
+
+    def test_test_case_that_does_not_finish_fails(self):
+        parser = merge.OutputParser()
+        parser.feed("Test Case 'A.test_a' started at 2016-03-01 12:00:00.000")
+        parser.feed('partial output')
+        result, extra_lines = parser.finish('The process crashed')
+        self.assertEqual(extra_lines, [])
+        self.assertEqual((result.name, result.result, result.failures,
+                          result.unexpected),
+                         ('A.test_a', merge.FAILED, 1, 1))
+        self.assertEqual(result.lines[1:], [
+            'partial output',
+            '<unknown>:0: error: A.test_a : The process crashed',
+            "Test Case 'A.test_a' failed (0.0 seconds)",
+        ])
+
+
+class LogTestCase(unittest.TestCase):
+    def test_writes_results_in_listed_order_with_totals(self):
+        tests = [ListedTest('M.A', 'test_1'), ListedTest('M.A', 'test_2'),
+                 ListedTest('M.B', 'test_3')]
+        output = io.StringIO()
+        log = merge.Log(output, 'M.xctest', tests, clock=_clock)
+        log.start()
+        log.add(_case('B.test_3', merge.SKIPPED))
+        log.add(_case('A.test_2', merge.PASSED))
+        self.assertNotIn('A.test_2', output.getvalue())
+        failed = _case('A.test_1', merge.FAILED, 'error')
+        failed.failures, failed.unexpected, failed.duration = 2, 1, 0.5
+        log.add(failed)
+        self.assertFalse(log.finish())
+
+        date = '2016-03-01 12:00:00.000'
+        self.assertEqual(output.getvalue().splitlines(), [
+            "Test Suite 'All tests' started at " + date,
+            "Test Suite 'M.xctest' started at " + date,
+            "Test Suite 'A' started at " + date,
+            "Test Case 'A.test_1' started",
+            'error',
+            "Test Case 'A.test_1' failed",
+            "Test Case 'A.test_2' started",
+            "Test Case 'A.test_2' passed",
+            "Test Suite 'A' failed at " + date,
+            '\t Executed 2 tests, with 2 failures (1 unexpected) in 0.5 '
+            '(0.5) seconds',
+            "Test Suite 'B' started at " + date,
+            "Test Case 'B.test_3' started",
+            "Test Case 'B.test_3' skipped",
+            "Test Suite 'B' passed at " + date,
+            '\t Executed 1 test, with 1 test skipped and 0 failures '
+            '(0 unexpected) in 0.0 (0.0) seconds',
+            "Test Suite 'M.xctest' failed at " + date,
+            '\t Executed 3 tests, with 1 test skipped and 2 failures '
+            '(1 unexpected) in 0.5 (0.0) seconds',
+            "Test Suite 'All tests' failed at " + date,
+            '\t Executed 3 tests, with 1 test skipped and 2 failures '
+            '(1 unexpected) in 0.5 (0.0) seconds',
+        ])
+
+    def test_format_duration_matches_print_observer(self):
+        self.assertEqual(merge.format_duration(0.0), '0.0')
+        self.assertEqual(merge.format_duration(0.0005), '0.001')
+        self.assertEqual(merge.format_duration(1.23449), '1.234')
+        self.assertEqual(merge.format_duration(12.0), '12.0')
+
+
+class ListingTestCase(unittest.TestCase):
+    def test_parses_dump_tests_json(self):
+        bundle_name, tests = parse_listing(
+            '{"name": "All tests", "tests": [{"name": "T.xctest", "tests": ['
+            '{"name": "M.A", "tests": [{"name": "test_1"}]}]}]}')
+        self.assertEqual(bundle_name, 'T.xctest')
+        self.assertEqual(tests, [ListedTest('M.A', 'test_1')])
+        self.assertEqual(tests[0].selector, 'M.A/test_1')
+        self.assertEqual(tests[0].name, 'A.test_1')
+
+    def test_rejects_selected_tests(self):
+        with self.assertRaises(ValueError):
+            parse_listing('{"name": "Selected tests", "tests": ['
+                          '{"name": "M.A", "tests": [{"name": "test_1"}]}]}')
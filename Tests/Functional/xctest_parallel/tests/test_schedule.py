@@ -0,0 +1,64 @@
+# test_schedule.py - Unit tests for xctest_parallel.schedule -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from xctest_parallel import schedule
+from xctest_parallel.listing import ListedTest
+
+
+def _tests(count):
+    return [ListedTest('Module.TestCase', 'test_{}'.format(index))
+            for index in range(count)]
+
+
+class PartitionTestCase(unittest.TestCase):
+    def test_balances_durations_and_keeps_order(self):
+        tests = _tests(6)
+        workers = schedule.partition(tests, [5, 1, 1, 1, 1, 1], 2)
+        self.assertEqual(workers, [tests[:1], tests[1:]])
+
+    def test_uses_no_more_workers_than_tests(self):
+        tests = _tests(2)
+        self.assertEqual(schedule.partition(tests, [1, 1], 8),
+                         [tests[:1], tests[1:]])
+
+    def test_longest_first_is_within_four_thirds_of_optimal(self):
+        # The classic worst case for longest-first assignment.
+        durations = [5, 5, 4, 4, 3, 3, 3]
+        tests = _tests(len(durations))
+        workers = schedule.partition(tests, durations, 3)
+        loads = [sum(durations[tests.index(t)] for t in worker)
+                 for worker in workers]
+        self.assertEqual(sorted(loads), [8, 8, 11])
+        self.assertLessEqual(max(loads), 9 * 4 / 3.0)
+
+
+class TestTimesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_unknown_tests_take_the_median_time(self):
+        path = os.path.join(self.directory, 'times.json')
+        times = schedule.TestTimes(path)
+        tests = _tests(4)
+        self.assertEqual(times.estimate(tests[:1]),
+                         [schedule.DEFAULT_SECONDS])
+        times.update({tests[0].name: 1.0, tests[1].name: 2.0,
+                      tests[2].name: 9.0})
+        times.save()
+        self.assertEqual(schedule.TestTimes(path).estimate(tests),
+                         [1.0, 2.0, 9.0, 2.0])
@@ -0,0 +1,94 @@
+# xctest_parallel/listing.py - Lists the tests in an executable -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import json
+import subprocess
+
+
+class ListedTest(object):
+    """
+    A single test method of an XCTestCase class, as listed by an XCTest
+    executable. 'class_name' is qualified by the module that declares the
+    class, as it is in a selector.
+    """
+    __slots__ = ('class_name', 'method')
+
+    def __init__(self, class_name, method):
+        self.class_name = class_name
+        self.method = method
+
+    @property
+    def selector(self):
+        """
+        The name that runs only this test when passed to the executable.
+        """
+        return '{}/{}'.format(self.class_name, self.method)
+
+    @property
+    def suite_name(self):
+        """
+        The name of the test suite that PrintObserver reports the test in.
+        """
+        return self.class_name.split('.', 1)[-1]
+
+    @property
+    def name(self):
+        """
+        The name that PrintObserver reports the test by.
+        """
+        return '{}.{}'.format(self.suite_name, self.method)
+
+    def __eq__(self, other):
+        return isinstance(other, ListedTest) and \
+            (self.class_name, self.method) == (other.class_name, other.method)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.class_name, self.method))
+
+    def __repr__(self):
+        return 'ListedTest({!r}, {!r})'.format(self.class_name, self.method)
+
+
+def parse_listing(listing):
+    """
+    Returns a tuple of the name of the test bundle's suite and the list of
+    tests, in the order they are run, in the given output of
+    --dump-tests-json, which is a tree of suites like:
+
+        {"name": "All tests", "tests": [
+            {"name": "Tests.xctest", "tests": [
+                {"name": "Module.FooTestCase", "tests": [
+                    {"name": "test_foo"}]}]}]}
+    """
+    root = json.loads(listing)
+    bundles = root.get('tests', [])
+    if len(bundles) != 1 or \
+            not bundles[0].get('name', '').endswith('.xctest'):
+        raise ValueError('Expected a single test bundle in the listing, but '
+                         'got: {}'.format(listing.strip()))
+    tests = []
+    for suite in bundles[0].get('tests', []):
+        for test in suite.get('tests', []):
+            tests.append(ListedTest(suite['name'], test['name']))
+    return bundles[0]['name'], tests
+
+
+def list_tests(executable):
+    """
+    Runs the given XCTest executable with --dump-tests-json, and returns its
+    tests as parse_listing() does. Raises subprocess.CalledProcessError if
+    the executable fails.
+    """
+    output = subprocess.check_output(executable + ['--dump-tests-json'],
+                                     universal_newlines=True)
+    return parse_listing(output)
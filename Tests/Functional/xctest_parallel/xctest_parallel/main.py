@@ -0,0 +1,230 @@
+# xctest_parallel/main.py - Runs XCTest executables in parallel -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+from __future__ import absolute_import
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+
+from . import listing
+from . import merge
+from . import schedule
+
+# How long to wait between reads of an event stream for the event that
+# finishes a test case, which is written just after its line is printed.
+_POLL_SECONDS = 0.001
+
+
+class _EventTail(object):
+    """
+    Reads the caseFinish events that an executable writes with
+    --event-stream, as they are written.
+    """
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+        self._buffer = ''
+        self._finished = {}
+
+    def _read(self):
+        if self._file is None:
+            try:
+                self._file = open(self._path)
+            except (IOError, OSError):
+                return
+        self._buffer += self._file.read()
+        lines = self._buffer.split('\n')
+        self._buffer = lines.pop()
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get('event') == 'caseFinish':
+                self._finished[event.get('name')] = event
+
+    def wait_for(self, name, process):
+        """
+        Returns the caseFinish event of the named test case, waiting for it
+        to be written, or None if the process exits without writing it.
+        """
+        while True:
+            self._read()
+            if name in self._finished:
+                return self._finished.pop(name)
+            if process.poll() is not None:
+                self._read()
+                return self._finished.pop(name, None)
+            time.sleep(_POLL_SECONDS)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _exit_reason(returncode):
+    if returncode < 0:
+        return 'The test process was killed by signal {}'.format(-returncode)
+    return 'The test process exited with status {}'.format(returncode)
+
+
+def _run_process(executable, tests, log, directory, name, durations):
+    """
+    Runs the given tests in a single process, and adds the result of each
+    that finishes, or crashes, to the log. The tests are selected by a file
+    of their selectors, so that the command line stays short. Returns the
+    names of the tests that have a result.
+    """
+    selectors_path = os.path.join(directory, 'selectors.{}'.format(name))
+    with open(selectors_path, 'w') as f:
+        f.write(''.join(test.selector + '\n' for test in tests))
+    events_path = os.path.join(directory, 'events.{}.jsonl'.format(name))
+    process = subprocess.Popen(
+        executable + ['--event-stream', events_path, '@' + selectors_path],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        universal_newlines=True, errors='replace', bufsize=1)
+    events = _EventTail(events_path)
+    parser = merge.OutputParser()
+    finished = set()
+    try:
+        for line in process.stdout:
+            result = parser.feed(line.rstrip('\r\n'))
+            if result is None:
+                continue
+            if result.name not in log:
+                log.add_extra_lines(result.lines)
+                continue
+            event = events.wait_for(result.name, process)
+            if event is not None:
+                result.failures = event.get('failures', result.failures)
+                result.unexpected = event.get('unexpected', 0)
+                result.duration = event.get('duration', result.duration)
+            durations[result.name] = result.duration
+            finished.add(result.name)
+            log.add(result)
+        process.wait()
+    finally:
+        events.close()
+        process.stdout.close()
+
+    crashed, extra_lines = parser.finish(_exit_reason(process.returncode))
+    log.add_extra_lines(extra_lines)
+    if crashed is not None and crashed.name in log:
+        finished.add(crashed.name)
+        log.add(crashed)
+    return finished
+
+
+def _run_worker(executable, tests, log, directory, durations, processes,
+                worker):
+    """
+    Runs the given tests in a single process, and counts the processes run
+    in 'processes[worker]'. When a process exits before running all of its
+    tests, such as after a crash, the rest are run in a new one.
+    """
+    while tests:
+        name = '{}.{}'.format(worker, processes[worker])
+        processes[worker] += 1
+        finished = _run_process(executable, tests, log, directory, name,
+                                durations)
+        if not finished:
+            # The process couldn't run any of the tests, so running it again
+            # wouldn't either. They're reported as never run.
+            break
+        tests = [test for test in tests if test.name not in finished]
+
+
+def run(executable, jobs, output=sys.stdout, times=None):
+    """
+    Lists the tests of the given XCTest executable, an argument list, and
+    runs them in up to 'jobs' processes at once, writing their merged
+    output to 'output' as a single process would have. Tests are assigned to
+    processes so that each takes about as long, given the duration of each
+    test the last time it ran, as recorded in 'times', a TestTimes. Returns
+    whether every test passed or was skipped.
+    """
+    times = times or schedule.TestTimes()
+    bundle_name, tests = listing.list_tests(executable)
+    workers = schedule.partition(tests, times.estimate(tests), jobs)
+
+    log = merge.Log(output, bundle_name, tests)
+    durations = {}
+    processes = [0] * len(workers)
+    directory = tempfile.mkdtemp(prefix='xctest_parallel')
+    start = time.time()
+    try:
+        log.start()
+        threads = [threading.Thread(
+            target=_run_worker,
+            args=(executable, worker_tests, log, directory, durations,
+                  processes, worker))
+            for worker, worker_tests in enumerate(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        shutil.rmtree(directory)
+
+    for test in log.missing():
+        log.add(merge.failed_result(test.name, 'The test was not run'))
+    succeeded = log.finish()
+
+    times.update(durations)
+    times.save()
+    sys.stderr.write(
+        'xctest_parallel: ran {} tests in {} processes on {} workers in '
+        '{:.3f} seconds\n'.format(len(tests), sum(processes), len(workers),
+                                  time.time() - start))
+    return succeeded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='xctest_parallel.py',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=textwrap.dedent("""
+            Runs the tests of an XCTest executable in several processes at
+            once, and prints their output merged into the output of a single
+            run, with the totals of every suite. Exits with a non-zero status
+            if any test failed."""))
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='The number of processes to run at once. '
+                             'Defaults to the number of CPUs.')
+    parser.add_argument('--times',
+                        help='A JSON file of the duration of each test, '
+                             'which is used to give each process about as '
+                             'much work, and is updated after the run.')
+    parser.add_argument('executable',
+                        help='The XCTest executable to run.')
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1.')
+
+    try:
+        succeeded = run([args.executable], args.jobs,
+                        times=schedule.TestTimes(args.times))
+    except (subprocess.CalledProcessError, ValueError) as error:
+        sys.stderr.write('xctest_parallel: could not list the tests: '
+                         '{}\n'.format(error))
+        return 1
+    return 0 if succeeded else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
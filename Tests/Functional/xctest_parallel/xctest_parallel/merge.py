@@ -0,0 +1,258 @@
+# xctest_parallel/merge.py - Merges the output of workers -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import datetime
+import math
+import re
+import threading
+
+# The lines PrintObserver prints at the start and end of each test case.
+_CASE_STARTED = re.compile(r"^Test Case '(?P<name>.+)' started at ")
+_CASE_FINISHED = re.compile(
+    r"^Test Case '(?P<name>.+)' (?P<result>passed|failed|skipped) "
+    r"\((?P<seconds>[0-9.e+-]+) seconds\)$")
+
+# The lines PrintObserver prints at the start and end of each test suite,
+# which are printed again for the merged suites.
+_SUITE = re.compile(r"^Test Suite '.+' (?:started|passed|failed) at ")
+_EXECUTED = re.compile(r"^\t Executed \d+ tests?, with ")
+
+PASSED = 'passed'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class CaseResult(object):
+    """
+    The outcome of a single test case, and the lines it printed, from its
+    "started" line to its "passed", "failed" or "skipped" line inclusive.
+    'failures' counts every failure, including the 'unexpected' ones.
+    """
+    __slots__ = ('name', 'result', 'failures', 'unexpected', 'duration',
+                 'lines')
+
+    def __init__(self, name, result, failures=0, unexpected=0, duration=0.0,
+                 lines=None):
+        self.name = name
+        self.result = result
+        self.failures = failures
+        self.unexpected = unexpected
+        self.duration = duration
+        self.lines = lines or []
+
+    def __repr__(self):
+        return 'CaseResult({!r}, {!r}, failures={!r}, unexpected={!r})'.format(
+            self.name, self.result, self.failures, self.unexpected)
+
+
+def format_duration(seconds):
+    """
+    Formats a duration as PrintObserver does: rounded to milliseconds, with
+    at least one decimal place.
+    """
+    return repr(math.floor(seconds * 1000.0 + 0.5) / 1000.0)
+
+
+def _format_date(date):
+    return date.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def failed_result(name, reason, lines=None):
+    """
+    Returns the result of a test case that failed unexpectedly for the given
+    reason, without finishing, after printing the given lines, or that never
+    started if there are none.
+    """
+    lines = list(lines or ["Test Case '{}' started at {}".format(
+        name, _format_date(datetime.datetime.now()))])
+    lines.append('<unknown>:0: error: {} : {}'.format(name, reason))
+    lines.append("Test Case '{}' failed (0.0 seconds)".format(name))
+    return CaseResult(name, FAILED, failures=1, unexpected=1, lines=lines)
+
+
+class OutputParser(object):
+    """
+    Splits the output of a worker into the lines printed by each test case.
+    Lines printed outside of a test case, such as by a class's setUp(), are
+    attributed to the next test case, and suite headers and totals are
+    dropped, since they are printed again for the merged suites.
+    """
+    def __init__(self):
+        self._pending = []
+        self._current = None
+
+    def feed(self, line):
+        """
+        Handles the next line of output, without its line ending. Returns a
+        CaseResult if the line finished a test case, and None otherwise.
+        The result's failures are counted from the lines it printed.
+        """
+        if self._current is None:
+            if _SUITE.match(line) or _EXECUTED.match(line):
+                return None
+            match = _CASE_STARTED.match(line)
+            if match:
+                self._current = match.group('name')
+            self._pending.append(line)
+            return None
+
+        self._pending.append(line)
+        match = _CASE_FINISHED.match(line)
+        if match is None or match.group('name') != self._current:
+            return None
+        name, self._current = self._current, None
+        lines, self._pending = self._pending, []
+        failure = ': error: {} : '.format(name)
+        return CaseResult(
+            name, match.group('result'),
+            failures=sum(1 for line in lines if failure in line),
+            duration=float(match.group('seconds')),
+            lines=lines)
+
+    def finish(self, reason):
+        """
+        Called at the end of the output. Returns a failed CaseResult for the
+        test case that was running, if any, explaining that it failed for
+        the given reason, and a list of the other lines that were left over.
+        """
+        lines, self._pending = self._pending, []
+        if self._current is None:
+            return None, lines
+        name, self._current = self._current, None
+        return failed_result(name, reason, lines=lines), []
+
+
+class _Totals(object):
+    __slots__ = ('executed', 'skipped', 'failures', 'unexpected', 'seconds')
+
+    def __init__(self):
+        self.executed = 0
+        self.skipped = 0
+        self.failures = 0
+        self.unexpected = 0
+        self.seconds = 0.0
+
+    def add(self, result):
+        self.executed += 1
+        self.skipped += result.result == SKIPPED
+        self.failures += result.failures
+        self.unexpected += result.unexpected
+        self.seconds += result.duration
+
+
+class Log(object):
+    """
+    Writes the results of the given tests to 'output' in the order they are
+    listed, as PrintObserver would had they all run in one process, as
+    results are added in any order from any thread. Each result is written
+    as soon as those of every test listed before it have been.
+    """
+    def __init__(self, output, bundle_name, tests, clock=None):
+        self._output = output
+        self._bundle_name = bundle_name
+        self._tests = tests
+        self._positions = dict((test.name, index)
+                               for index, test in enumerate(tests))
+        self._results = [None] * len(tests)
+        self._next = 0
+        self._extra_lines = []
+        self._suite = _Totals()
+        self._total = _Totals()
+        self._now = clock or datetime.datetime.now
+        self._started = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def start(self):
+        self._started = self._now()
+        self._header('All tests')
+        self._header(self._bundle_name)
+
+    def add(self, result):
+        """
+        Adds the result of a listed test, and writes it and any results
+        that were waiting for it.
+        """
+        with self._lock:
+            self._results[self._positions[result.name]] = result
+            while self._next < len(self._tests) and \
+                    self._results[self._next] is not None:
+                self._write_next()
+
+    def add_extra_lines(self, lines):
+        """
+        Adds lines that were printed outside of any test case, which are
+        written after the last test case.
+        """
+        with self._lock:
+            self._extra_lines.extend(lines)
+
+    def missing(self):
+        """Returns the tests that have no result."""
+        with self._lock:
+            return [test for test, result in zip(self._tests, self._results)
+                    if result is None]
+
+    def finish(self):
+        """
+        Writes the totals of the run, and returns whether every test passed
+        or was skipped. Every test must have a result.
+        """
+        elapsed = (self._now() - self._started).total_seconds()
+        self._write_lines(self._extra_lines)
+        for name in (self._bundle_name, 'All tests'):
+            self._footer(name, self._total, elapsed)
+        self._output.flush()
+        return self._total.failures == 0
+
+    def _write_next(self):
+        test = self._tests[self._next]
+        result = self._results[self._next]
+        previous = self._tests[self._next - 1] if self._next else None
+        if previous is None or previous.suite_name != test.suite_name:
+            self._header(test.suite_name)
+        self._write_lines(result.lines)
+        self._suite.add(result)
+        self._total.add(result)
+        self._next += 1
+        following = self._tests[self._next] \
+            if self._next < len(self._tests) else None
+        if following is None or following.suite_name != test.suite_name:
+            self._footer(test.suite_name, self._suite, self._suite.seconds)
+            self._suite = _Totals()
+        self._output.flush()
+
+    def _header(self, name):
+        self._write_lines(["Test Suite '{}' started at {}".format(
+            name, _format_date(self._now()))])
+
+    def _footer(self, name, totals, elapsed):
+        skipped = ''
+        if totals.skipped:
+            skipped = '{} test{} skipped and '.format(
+                totals.skipped, '' if totals.skipped == 1 else 's')
+        self._write_lines([
+            "Test Suite '{}' {} at {}".format(
+                name, FAILED if totals.failures else PASSED,
+                _format_date(self._now())),
+            '\t Executed {} {}, with {}{} {} ({} unexpected) in {} ({}) '
+            'seconds'.format(
+                totals.executed, 'test' if totals.executed == 1 else 'tests',
+                skipped, totals.failures,
+                'failure' if totals.failures == 1 else 'failures',
+                totals.unexpected, format_duration(totals.seconds),
+                format_duration(elapsed)),
+        ])
+
+    def _write_lines(self, lines):
+        for line in lines:
+            self._output.write(line + '\n')
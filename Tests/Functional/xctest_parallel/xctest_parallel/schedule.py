@@ -0,0 +1,80 @@
+# xctest_parallel/schedule.py - Partitions tests between workers -*- python -*-
+#
+# This source file is part of the Swift.org open source project
+#
+# Copyright (c) 2014 - 2016 Apple Inc. and the Swift project authors
+# Licensed under Apache License v2.0 with Runtime Library Exception
+#
+# See http://swift.org/LICENSE.txt for license information
+# See http://swift.org/CONTRIBUTORS.txt for the list of Swift project authors
+
+import heapq
+import json
+import os
+import tempfile
+
+# The duration assumed for a test that has never been run, when no test has.
+DEFAULT_SECONDS = 0.1
+
+
+class TestTimes(object):
+    """
+    A JSON file of how long each test took the last time it ran, keyed by
+    the name it is reported by.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.seconds = {}
+        if path is None:
+            return
+        try:
+            with open(path) as f:
+                self.seconds = json.load(f)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def estimate(self, tests):
+        """
+        Returns a list of the expected duration of each of the given tests.
+        Tests that have never run are expected to take as long as the median
+        test that has.
+        """
+        known = sorted(self.seconds.values())
+        default = known[len(known) // 2] if known else DEFAULT_SECONDS
+        return [self.seconds.get(test.name, default) for test in tests]
+
+    def update(self, seconds):
+        self.seconds.update(seconds)
+
+    def save(self):
+        if self.path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.seconds, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def partition(tests, durations, workers):
+    """
+    Returns a list of up to 'workers' lists of tests, that each take about
+    as long to run as the others, given the expected duration of each test.
+
+    Tests are assigned longest first, each to the worker with the least work
+    so far, which finishes within 4/3 of the best possible time. The tests
+    of each worker are kept in the order they were given, so that the tests
+    of a class run together.
+    """
+    workers = max(1, min(workers, len(tests)))
+    order = sorted(range(len(tests)), key=lambda index: -durations[index])
+    loads = [(0.0, worker) for worker in range(workers)]
+    assigned = [[] for _ in range(workers)]
+    for index in order:
+        load, worker = heapq.heappop(loads)
+        assigned[worker].append(index)
+        heapq.heappush(loads, (load + durations[index], worker))
+    return [[tests[index] for index in sorted(indices)]
+            for indices in assigned if indices]
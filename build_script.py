@@ -11,13 +11,21 @@
 
 import argparse
 import fnmatch
+import hashlib
+import heapq
+import json
 import os
+import shlex
+import shutil
 import subprocess
 import sys
 import tempfile
 import textwrap
+import time
 import platform
+import re
 import errno
+import fcntl
 
 SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -26,9 +34,128 @@ def note(msg):
     print("xctest-build: "+msg)
 
 
-def run(command):
-    note(command)
-    subprocess.check_call(command, shell=True)
+# Every command run and subcommand executed, as Chrome trace events, and how
+# deeply main() has been re-entered. See _write_trace().
+_TRACE_EVENTS = []
+_MAIN_DEPTH = 0
+
+
+def _trace_event(name, category, start, end, details):
+    """
+    Records a complete event in the Chrome trace format, which nests events
+    by time, so a subcommand executed from within another is shown inside it.
+    """
+    _TRACE_EVENTS.append({
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": int(start * 1e6),
+        "dur": int((end - start) * 1e6),
+        "pid": os.getpid(),
+        "tid": 0,
+        "args": details,
+    })
+
+
+def _max_rss_bytes(usage):
+    # ru_maxrss is in bytes on Darwin, but in kilobytes elsewhere.
+    if platform.system() == 'Darwin':
+        return usage.ru_maxrss
+    return usage.ru_maxrss * 1024
+
+
+def _command_string(command):
+    """
+    Returns the given argv list as a command that could be pasted into a
+    shell.
+    """
+    return " ".join(shlex.quote(argument) for argument in command)
+
+
+def run(command, env=None):
+    """
+    Runs the given argv list, with the given environment variables added to
+    this script's own, and raises if it fails. The command is executed
+    directly, rather than by a shell.
+    """
+    command_string = _command_string(command)
+    if env:
+        note(" ".join("{}={}".format(name, shlex.quote(value))
+                      for name, value in sorted(env.items())) +
+             " " + command_string)
+    else:
+        note(command_string)
+    start = time.time()
+    process = subprocess.Popen(
+        command, env=dict(os.environ, **env) if env else None)
+    # Unlike Popen.wait(), wait4() reports the resources used by this child
+    # alone, rather than the peak of every child waited for so far. Note that
+    # the peak RSS of a quick command is that of this script, which it was
+    # forked from.
+    _, status, usage = os.wait4(process.pid, 0)
+    end = time.time()
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+
+    _trace_event(
+        os.path.basename(command[0]), "command", start, end,
+        {"command": command_string,
+         "cpu_seconds": usage.ru_utime + usage.ru_stime,
+         "max_rss_bytes": _max_rss_bytes(usage),
+         "exit_code": process.returncode})
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+
+def _run_builtin(description, function, *args):
+    """
+    Performs work that would otherwise take a shell and a tool, such as
+    creating a directory or copying a file, in this process, noting and
+    timing it as run() does for commands.
+    """
+    note(description)
+    start = time.time()
+    cpu_start = time.process_time()
+    result = function(*args)
+    _trace_event(description.split()[0], "builtin", start, time.time(),
+                 {"command": description,
+                  "cpu_seconds": time.process_time() - cpu_start})
+    return result
+
+
+def _write_trace(build_dir):
+    """
+    Writes the commands run so far to 'build_trace.json' in the given
+    directory, in the Chrome trace format (which chrome://tracing and
+    Perfetto can open), and notes a summary of the time taken by each.
+    """
+    commands = [e for e in _TRACE_EVENTS if e["cat"] in ("command", "builtin")]
+    if not commands:
+        return
+
+    note("{:>9} {:>9} {:>9}  {}".format("wall (s)", "cpu (s)", "rss (MiB)",
+                                       "command"))
+    for event in commands:
+        command = event["args"]["command"]
+        note("{:>9.2f} {:>9.2f} {:>9}  {}".format(
+            event["dur"] / 1e6,
+            event["args"]["cpu_seconds"],
+            "{:.1f}".format(event["args"]["max_rss_bytes"] / float(1 << 20))
+            if "max_rss_bytes" in event["args"] else "",
+            command if len(command) <= 60 else command[:57] + "..."))
+    note("{:>9.2f} {:>9.2f} {:>9}  total".format(
+        sum(e["dur"] for e in commands) / 1e6,
+        sum(e["args"]["cpu_seconds"] for e in commands), ""))
+
+    if not os.path.isdir(build_dir):
+        return
+    trace_path = os.path.join(build_dir, "build_trace.json")
+    with open(trace_path, "w") as f:
+        json.dump({"traceEvents": _TRACE_EVENTS,
+                   "displayTimeUnit": "ms"}, f)
+    note("Wrote a trace of the build to {}".format(trace_path))
 
 
 def _mkdirp(path):
@@ -36,7 +163,126 @@ def _mkdirp(path):
     Creates a directory at the given path if it doesn't already exist.
     """
     if not os.path.exists(path):
-        run("mkdir -p {}".format(path))
+        _run_builtin("mkdir -p {}".format(shlex.quote(path)),
+                     os.makedirs, path, 0o777, True)
+
+
+def _copy_file_contents(source, destination):
+    """
+    Copies the contents of the file at 'source' into the file at
+    'destination', which is created or truncated, within the kernel where
+    possible: with copy_file_range(), which can share blocks on filesystems
+    that support it, or else with sendfile(). Falls back to copying through
+    userspace on platforms and filesystems that support neither.
+    """
+    with open(source, 'rb') as source_file, \
+            open(destination, 'wb') as destination_file:
+        source_fd = source_file.fileno()
+        destination_fd = destination_file.fileno()
+        remaining = os.fstat(source_fd).st_size
+        for fast_copy in (getattr(os, 'copy_file_range', None),
+                          getattr(os, 'sendfile', None)):
+            if fast_copy is None:
+                continue
+            try:
+                while remaining > 0:
+                    if fast_copy is os.sendfile:
+                        copied = os.sendfile(destination_fd, source_fd, None,
+                                             min(remaining, 1 << 30))
+                    else:
+                        copied = fast_copy(source_fd, destination_fd,
+                                           min(remaining, 1 << 30))
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                   errno.ENOTSUP, errno.EBADF,
+                                   errno.ENOTSOCK):
+                    raise
+                # Nothing has been copied by the failed call; continue from
+                # wherever the file offsets are with the next method.
+        shutil.copyfileobj(source_file, destination_file, 1 << 20)
+
+
+# The Linux ioctl that makes one file share the blocks of another, on
+# filesystems that support copy-on-write, such as Btrfs and XFS.
+_FICLONE = 0x40049409
+
+
+def _reflink(source_fd, destination_fd):
+    """
+    Makes the file open as 'destination_fd' share the contents of the one
+    open as 'source_fd', without copying them. Returns False if the platform
+    or filesystem can't do so.
+    """
+    if platform.system() != 'Linux':
+        return False
+    try:
+        fcntl.ioctl(destination_fd, _FICLONE, source_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _install_file(source, destination, hardlink=False):
+    """
+    Installs the file at 'source' at 'destination', and returns the number
+    of bytes written.
+
+    Nothing is written if the destination already has the same contents.
+    Otherwise the new file is written alongside the destination, then renamed
+    over it, so that processes using the destination never see it partially
+    written. Where the two share a filesystem, the new file is a reflink of
+    the source if the filesystem supports it, or a hard link to it if
+    'hardlink' is True; otherwise its contents are copied.
+    """
+    def install():
+        try:
+            destination_stat = os.stat(destination)
+        except OSError:
+            destination_stat = None
+        source_stat = os.stat(source)
+        if (destination_stat is not None and
+                destination_stat.st_size == source_stat.st_size and
+                (os.path.samefile(source, destination) or
+                 _hash_file(source) == _hash_file(destination))):
+            note("{} is up to date.".format(destination))
+            return 0
+
+        same_device = (os.stat(os.path.dirname(destination)).st_dev ==
+                       source_stat.st_dev)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(destination),
+            prefix="." + os.path.basename(destination) + ".")
+        try:
+            if hardlink and same_device:
+                os.close(fd)
+                os.remove(tmp_path)
+                os.link(source, tmp_path)
+                written = 0
+            else:
+                with os.fdopen(fd, 'wb') as tmp_file, \
+                        open(source, 'rb') as source_file:
+                    if same_device and _reflink(source_file.fileno(),
+                                                tmp_file.fileno()):
+                        written = 0
+                    else:
+                        written = source_stat.st_size
+                if written:
+                    _copy_file_contents(source, tmp_path)
+                shutil.copymode(source, tmp_path)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return written
+
+    return _run_builtin("install {} {}".format(shlex.quote(source),
+                                               shlex.quote(destination)),
+                        install)
 
 
 def _find_files_with_extension(path, extension):
@@ -52,6 +298,370 @@ def _find_files_with_extension(path, extension):
     return paths
 
 
+def _hash_file(path):
+    """
+    Returns a hex digest of the contents of the file at the given path.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compiler_identity(swiftc):
+    """
+    Returns a string identifying the given compiler: its path and the
+    version it reports. A different toolchain at the same path is a
+    different compiler.
+    """
+    version = subprocess.check_output([swiftc, '--version'],
+                                      stderr=subprocess.STDOUT)
+    return '{}\n{}'.format(swiftc, version.decode('utf-8', 'replace'))
+
+
+def _write_output_file_map(objects_dir, sources_dir, source_paths):
+    """
+    Writes an output file map for compiling the given source files one
+    object file each, in a tree under 'objects_dir' that mirrors the one under
+    'sources_dir'. The map also names the dependency files the driver uses to
+    decide what to recompile in an incremental build. Returns a tuple of the
+    list of object file paths, in the order of the given source paths, and
+    the path of the map.
+    """
+    output_file_map = {
+        "": {"swift-dependencies":
+             os.path.join(objects_dir, "build-record.swiftdeps")},
+    }
+    object_paths = []
+    for source_path in source_paths:
+        stem = os.path.join(
+            objects_dir,
+            os.path.splitext(os.path.relpath(source_path, sources_dir))[0])
+        _mkdirp(os.path.dirname(stem))
+        output_file_map[source_path] = {
+            "object": stem + ".o",
+            "swift-dependencies": stem + ".swiftdeps",
+        }
+        object_paths.append(stem + ".o")
+
+    path = os.path.join(objects_dir, "output-file-map.json")
+    contents = json.dumps(output_file_map, indent=2, sort_keys=True)
+    try:
+        with open(path) as f:
+            unchanged = f.read() == contents
+    except (IOError, OSError):
+        unchanged = False
+    if not unchanged:
+        with open(path, 'w') as f:
+            f.write(contents)
+    return object_paths, path
+
+
+def _dependency_signature(paths):
+    """
+    Returns a description of the modules and libraries directly within each
+    of the given dependency directories, by name, size and modification
+    time, so that rebuilding a dependency invalidates the steps that use it.
+    Only the top level of each directory is scanned, to keep this cheap.
+    """
+    signature = []
+    for path in paths:
+        try:
+            names = sorted(os.listdir(path))
+        except OSError:
+            signature.append([path, None])
+            continue
+        for name in names:
+            if not name.endswith(('.swiftmodule', '.swiftinterface', '.so',
+                                  '.a', '.modulemap', '.h')):
+                continue
+            stat = os.stat(os.path.join(path, name))
+            signature.append([path, name, stat.st_size, stat.st_mtime_ns])
+    return signature
+
+
+class _StampDatabase:
+    """
+    Records a hash of the inputs to each build step that has completed in a
+    build directory, so that steps whose inputs are unchanged can be skipped
+    on the next build.
+    """
+    FILE_NAME = 'build_stamps.json'
+
+    def __init__(self, build_dir):
+        self.path = os.path.join(build_dir, self.FILE_NAME)
+        try:
+            with open(self.path) as f:
+                self.stamps = json.load(f)
+        except (IOError, OSError, ValueError):
+            # A missing or corrupt database means everything is rebuilt.
+            self.stamps = {}
+
+    @staticmethod
+    def key(inputs):
+        """
+        Returns the stamp for the given JSON-serializable list of inputs.
+        """
+        return hashlib.sha256(
+            json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_current(self, step, key, outputs):
+        """
+        Returns True if the given step last completed with the given stamp,
+        and all of its outputs still exist.
+        """
+        return (self.stamps.get(step) == key and
+                all(os.path.exists(output) for output in outputs))
+
+    def run_step(self, step, inputs, outputs, command, prepare=None):
+        """
+        Runs the given argv list, unless the given step is current for the
+        given inputs and outputs, and records the step's stamp if it
+        succeeds. If given, 'prepare' is called before the command is run.
+        """
+        key = self.key(inputs + [command])
+        if self.is_current(step, key, outputs):
+            note("Skipping {}: nothing has changed.".format(step))
+            return
+        # Forget the old stamp first, so that a failed or interrupted step is
+        # never considered current.
+        self.stamps.pop(step, None)
+        self._save()
+        if prepare is not None:
+            prepare()
+        run(command)
+        self.stamps[step] = key
+        self._save()
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.stamps, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+# The name of the file in the build directory that records the resolved
+# toolchain, which Tests/Functional/lit.cfg also reads, and the arguments it
+# is resolved from. See GenericUnixStrategy.resolve_toolchain().
+_TOOLCHAIN_MANIFEST = "toolchain.json"
+_TOOLCHAIN_MANIFEST_VERSION = 1
+_TOOLCHAIN_INPUTS = ("swiftc", "foundation_build_dir", "foundation_install_prefix",
+                     "swift_build_dir", "libdispatch_build_dir", "libdispatch_src_dir")
+
+
+def _lit_shards(num_shards, run_shard):
+    """
+    Returns the 1-based indices of the lit shards to run, one after another,
+    or [None] to run the suite unsharded. Every shard is run if a number of
+    shards is given without choosing one, so that they can be compared.
+    """
+    if run_shard is not None and num_shards is None:
+        raise ValueError("--run-shard requires --num-shards.")
+    if num_shards is None:
+        return [None]
+    if num_shards < 1:
+        raise ValueError("--num-shards must be at least 1.")
+    if run_shard is None:
+        return list(range(1, num_shards + 1))
+    if not 1 <= run_shard <= num_shards:
+        raise ValueError("--run-shard must be between 1 and {}.".format(num_shards))
+    return [run_shard]
+
+
+def _note_lit_shard_timing(shard, num_shards, seconds, predicted_seconds,
+                           results_path):
+    """
+    Notes how long a run of lit took, against how long it was predicted to
+    take, and how many tests it ran and the total and slowest of their
+    times, from the JSON results lit wrote to the given path, so that the
+    tests can be balanced between shards.
+    """
+    name = "shard {} of {}".format(shard, num_shards) if shard else "all tests"
+    note("Ran {} in {:.2f}s; {:.2f}s was predicted.".format(
+        name, seconds, predicted_seconds))
+    try:
+        with open(results_path) as f:
+            tests = json.load(f)["tests"]
+    except (IOError, OSError, ValueError, KeyError):
+        return
+    timed = sorted(((test.get("elapsed") or 0.0, test["name"]) for test in tests),
+                   reverse=True)
+    note("Ran {} tests, taking {:.2f}s of test time.".format(
+        len(tests), sum(elapsed for elapsed, _ in timed)))
+    for elapsed, test_name in timed[:5]:
+        note("  {:8.2f}s  {}".format(elapsed, test_name))
+
+
+def _start_module_cache_session(build_dir):
+    """
+    Removes the build session file that lit.cfg warms up the module cache
+    under, so that the next time lit loads the suite it warms up the module
+    cache again, and validates the modules in it once more.
+    """
+    session_file = os.path.join(
+        build_dir, "XCTest.dir", "ModuleCacheWarmup", "session")
+    if os.path.exists(session_file):
+        _run_builtin("rm {}".format(session_file), os.remove, session_file)
+
+
+def _measure_module_cache(command, build_dir, lit_env):
+    """
+    Runs the given lit command three times, and notes how long each run
+    took: with an empty module cache, as the tests ran before lit.cfg warmed
+    it up; with an empty module cache that lit.cfg warms up first; and with
+    the warm module cache that leaves. lit.cfg's compile cache is disabled,
+    so that every test is compiled each time.
+    """
+    module_cache = os.path.join(build_dir, "XCTest.dir", "ModuleCache")
+    timings = []
+    for name, warmup, cold in (("cold, no warmup", "0", True),
+                               ("cold, warmed up", "1", True),
+                               ("warm", "1", False)):
+        if cold:
+            if os.path.isdir(module_cache):
+                _run_builtin("rm -rf {}".format(module_cache),
+                             shutil.rmtree, module_cache)
+            _start_module_cache_session(build_dir)
+        start = time.time()
+        run(command, env=dict(lit_env,
+                              XCTEST_COMPILE_CACHE="0",
+                              XCTEST_MODULE_CACHE_WARMUP=warmup))
+        timings.append((name, time.time() - start))
+    for name, seconds in timings:
+        note("Module cache {}: {:.2f}s".format(name, seconds))
+
+
+def _predict_seconds(durations, jobs):
+    """
+    Returns how long tests of the given durations take to run in the given
+    order on 'jobs' workers, each of which starts the next test as soon as
+    it finishes its last, as lit's do.
+    """
+    workers = [0.0] * max(1, min(jobs, len(durations)))
+    for duration in durations:
+        heapq.heappush(workers, heapq.heappop(workers) + duration)
+    return max(workers)
+
+
+class _TestHistory:
+    """
+    Records how long each functional test took, and whether it failed, the
+    last time it was run in a build directory, so that the next run can
+    start the longest tests first and finish sooner.
+
+    lit orders tests by the times in a .lit_test_times.txt file in the suite's
+    exec root, longest first, and failures (given negative times) before
+    everything. That file is written from this history before each run, so
+    that tests that have never run are scheduled by an estimate, and
+    failures are only run first when asked.
+    """
+    FILE_NAME = 'functional_test_times.json'
+    LIT_TIMES_FILE_NAME = '.lit_test_times.txt'
+
+    # The name lit.cfg gives the suite, which prefixes each test's name in
+    # lit's results.
+    SUITE_PREFIX = 'SwiftXCTestFunctionalTests :: '
+
+    # How long a test of average size is assumed to take, in seconds, before
+    # any test has been timed. Most of that is compiling it.
+    DEFAULT_SECONDS = 2.0
+
+    # The lit results that are failures.
+    FAILURE_CODES = ("FAIL", "XPASS", "TIMEOUT", "UNRESOLVED")
+
+    def __init__(self, build_dir):
+        self.path = os.path.join(build_dir, self.FILE_NAME)
+        try:
+            with open(self.path) as f:
+                self.tests = json.load(f)
+        except (IOError, OSError, ValueError):
+            self.tests = {}
+
+    def schedule(self, tests_path, filter_regex=None, failed_first=False):
+        """
+        Returns a list of the path of each test under 'tests_path' that lit
+        runs, relative to it, and the number of seconds it is expected to
+        take, in the order lit will run them once write_lit_test_times() has
+        been called with the list.
+
+        Tests without a history are estimated from their size, at the rate
+        of the tests that have one, since most of the time taken by a test is
+        compiling it.
+        """
+        sizes = {}
+        for dirpath, dirnames, filenames in os.walk(tests_path):
+            # lit does not look for tests in its own output directories.
+            dirnames[:] = [d for d in dirnames if d != 'Output']
+            for filename in filenames:
+                if filename.endswith('.swift'):
+                    path = os.path.join(dirpath, filename)
+                    relative_path = os.path.relpath(path, tests_path)
+                    sizes[relative_path.replace(os.sep, '/')] = os.path.getsize(path)
+        if filter_regex is not None:
+            pattern = re.compile(filter_regex)
+            sizes = dict((path, size) for path, size in sizes.items()
+                         if pattern.search(self.SUITE_PREFIX + path))
+
+        timed = [path for path in sizes if path in self.tests]
+        if timed and sum(sizes[path] for path in timed):
+            seconds_per_byte = (sum(self.tests[path]["elapsed"] for path in timed) /
+                                sum(sizes[path] for path in timed))
+        else:
+            seconds_per_byte = self.DEFAULT_SECONDS / max(
+                1.0, sum(sizes.values()) / float(max(1, len(sizes))))
+
+        schedule = []
+        for path, size in sizes.items():
+            entry = self.tests.get(path)
+            if entry is None:
+                schedule.append((False, size * seconds_per_byte, path))
+            else:
+                schedule.append((failed_first and entry["failed"],
+                                 entry["elapsed"], path))
+        # The same order as lit's "smart" order.
+        schedule.sort(key=lambda test: (not test[0], -test[1], test[2]))
+        return [(path, seconds) for _, seconds, path in schedule]
+
+    def write_lit_test_times(self, exec_root, schedule, failed_first=False):
+        """
+        Writes the file that lit orders the tests in the given schedule by,
+        into the given exec root.
+        """
+        os.makedirs(exec_root, exist_ok=True)
+        path = os.path.join(exec_root, self.LIT_TIMES_FILE_NAME)
+        with open(path + '.tmp', 'w') as f:
+            for test, seconds in schedule:
+                entry = self.tests.get(test)
+                if failed_first and entry is not None and entry["failed"]:
+                    seconds = -max(seconds, 1e-6)
+                f.write("{:e} {}\n".format(seconds, test))
+        os.replace(path + '.tmp', path)
+
+    def update(self, results_path):
+        """
+        Records the times and results of the tests in the JSON results lit
+        wrote to the given path, if any.
+        """
+        try:
+            with open(results_path) as f:
+                results = json.load(f)["tests"]
+        except (IOError, OSError, ValueError, KeyError):
+            return
+        for result in results:
+            name = result["name"]
+            if not name.startswith(self.SUITE_PREFIX) or result.get("elapsed") is None:
+                continue
+            self.tests[name[len(self.SUITE_PREFIX):]] = {
+                "elapsed": result["elapsed"],
+                "failed": result.get("code") in self.FAILURE_CODES,
+            }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.tests, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
 def symlink_force(target, link_name):
     if os.path.isdir(link_name):
         link_name = os.path.join(link_name, os.path.basename(target))
@@ -86,17 +696,15 @@ class DarwinStrategy:
         else:
             style_options = "Release"
 
-        run("xcodebuild -workspace {source_dir}/XCTest.xcworkspace "
-            "-scheme SwiftXCTest "
-            "-configuration {style_options} "
-            "SWIFT_EXEC=\"{swiftc}\" "
-            "SWIFT_LINK_OBJC_RUNTIME=YES "
-            "INDEX_ENABLE_DATA_STORE=NO "
-            "SYMROOT=\"{build_dir}\" OBJROOT=\"{build_dir}\"".format(
-                swiftc=swiftc,
-                build_dir=build_dir,
-                style_options=style_options,
-                source_dir=SOURCE_DIR))
+        run(["xcodebuild",
+             "-workspace", os.path.join(SOURCE_DIR, "XCTest.xcworkspace"),
+             "-scheme", "SwiftXCTest",
+             "-configuration", style_options,
+             "SWIFT_EXEC={}".format(swiftc),
+             "SWIFT_LINK_OBJC_RUNTIME=YES",
+             "INDEX_ENABLE_DATA_STORE=NO",
+             "SYMROOT={}".format(build_dir),
+             "OBJROOT={}".format(build_dir)])
 
         if args.test:
             # Execute main() using the arguments necessary to run the tests.
@@ -118,17 +726,15 @@ class DarwinStrategy:
         else:
             style_options = "Release"
 
-        run("xcodebuild -workspace {source_dir}/XCTest.xcworkspace "
-            "-scheme SwiftXCTestFunctionalTests "
-            "-configuration {style_options} "
-            "SWIFT_EXEC=\"{swiftc}\" "
-            "SWIFT_LINK_OBJC_RUNTIME=YES "
-            "INDEX_ENABLE_DATA_STORE=NO "
-            "SYMROOT=\"{build_dir}\" OBJROOT=\"{build_dir}\" ".format(
-                swiftc=swiftc,
-                build_dir=build_dir,
-                style_options=style_options,
-                source_dir=SOURCE_DIR))
+        run(["xcodebuild",
+             "-workspace", os.path.join(SOURCE_DIR, "XCTest.xcworkspace"),
+             "-scheme", "SwiftXCTestFunctionalTests",
+             "-configuration", style_options,
+             "SWIFT_EXEC={}".format(swiftc),
+             "SWIFT_LINK_OBJC_RUNTIME=YES",
+             "INDEX_ENABLE_DATA_STORE=NO",
+             "SYMROOT={}".format(build_dir),
+             "OBJROOT={}".format(build_dir)])
 
     @staticmethod
     def install(args):
@@ -152,80 +758,132 @@ class GenericUnixStrategy:
         Build XCTest and place the built products in the given 'build_dir'.
         If 'test' is specified, also executes the 'test' subcommand.
         """
-        swiftc = os.path.abspath(args.swiftc)
         build_dir = os.path.abspath(args.build_dir)
-        static_lib_build_dir = GenericUnixStrategy.static_lib_build_dir(build_dir)
-        foundation_build_dir = os.path.abspath(args.foundation_build_dir)
-        swift_build_dir = os.path.abspath(args.swift_build_dir)
-        arch = platform.machine()
-        core_foundation_build_dir = GenericUnixStrategy.core_foundation_build_dir(
-            foundation_build_dir, args.foundation_install_prefix)
-        if args.libdispatch_build_dir:
-            libdispatch_build_dir = os.path.abspath(args.libdispatch_build_dir)
-        if args.libdispatch_src_dir:
-            libdispatch_src_dir = os.path.abspath(args.libdispatch_src_dir)
-
         _mkdirp(build_dir)
+        toolchain = GenericUnixStrategy.resolve_toolchain(args, build_dir)
+        swiftc = toolchain["swiftc"]
+        static_lib_build_dir = toolchain["static_lib_build_dir"]
+        foundation_build_dir = toolchain["foundation_build_dir"]
+        core_foundation_build_dir = toolchain["core_foundation_build_dir"]
+        libdispatch_build_dir = toolchain["libdispatch_build_dir"]
+        libdispatch_src_dir = toolchain["libdispatch_src_dir"]
 
-        sourcePaths = _find_files_with_extension(
+        sourcePaths = sorted(_find_files_with_extension(
                 os.path.join(SOURCE_DIR, 'Sources', 'XCTest'),
-                'swift')
+                'swift'))
 
         if args.build_style == "debug":
             style_options = "-g"
         else:
             style_options = "-O"
 
-        # Not incremental..
+        # Each step below is skipped if a hash of its inputs (the compiler,
+        # its command, the files it reads and the dependencies it uses)
+        # matches the one recorded when it last completed.
+        stamps = _StampDatabase(build_dir)
+        compiler_identity = toolchain["compiler_identity"]
+
         # Build library
-        if args.libdispatch_build_dir and args.libdispatch_src_dir:
-            libdispatch_args = "-I {libdispatch_build_dir}/src -I {libdispatch_src_dir} ".format(
-                libdispatch_build_dir=libdispatch_build_dir,
-                libdispatch_src_dir=libdispatch_src_dir)
+        dependency_dirs = [foundation_build_dir, core_foundation_build_dir]
+        if libdispatch_build_dir and libdispatch_src_dir:
+            libdispatch_args = ["-I", os.path.join(libdispatch_build_dir, "src"),
+                                "-I", libdispatch_src_dir]
+            dependency_dirs += [os.path.join(libdispatch_build_dir, 'src'),
+                                libdispatch_src_dir]
+        else:
+            libdispatch_args = []
+
+        compile_mode = args.compile_mode
+        if compile_mode is None:
+            # Optimizing the whole module at once produces the best code, but
+            # debug builds are faster when split across cores.
+            compile_mode = "batch" if args.build_style == "debug" else "whole-module"
+
+        if compile_mode == "batch":
+            # The driver splits the sources into batches, compiles them on up
+            # to 'jobs' frontends at once, and merges the partial modules.
+            # With -incremental, it recompiles only the files affected by a
+            # change, reusing the other object files in 'objects_dir'.
+            objects_dir = os.path.join(build_dir, "objects")
+            object_paths, output_file_map = _write_output_file_map(
+                objects_dir, os.path.join(SOURCE_DIR, 'Sources', 'XCTest'),
+                sourcePaths)
+            mode_options = ["-enable-batch-mode", "-incremental",
+                            "-j", str(args.jobs),
+                            "-output-file-map", output_file_map]
         else:
-            libdispatch_args = ""
+            object_paths = [os.path.join(build_dir, "XCTest.o")]
+            mode_options = ["-force-single-frontend-invocation",
+                            "-o", object_paths[0]]
 
         # NOTE: Force -swift-version 5 to build XCTest sources.
-        run("{swiftc} -Xcc -fblocks -c {style_options} -emit-object -emit-module "
-            "-module-name XCTest -module-link-name XCTest -parse-as-library "
-            "-emit-module-path {build_dir}/XCTest.swiftmodule "
-            "-force-single-frontend-invocation "
-            "-swift-version 5 "
-            "-I {foundation_build_dir} -I {core_foundation_build_dir} "
-            "{libdispatch_args} "
-            "{source_paths} -o {build_dir}/XCTest.o".format(
-                swiftc=swiftc,
-                style_options=style_options,
-                build_dir=build_dir,
-                foundation_build_dir=foundation_build_dir,
-                core_foundation_build_dir=core_foundation_build_dir,
-                libdispatch_args=libdispatch_args,
-                source_paths=" ".join(sourcePaths)))
-        run("{swiftc} -emit-library {build_dir}/XCTest.o "
-            "-L {dispatch_build_dir} -L {foundation_build_dir} -L {swift_build_dir} "
-            "-lswiftGlibc -lswiftCore -lFoundation -lm "
-            # We embed an rpath of `$ORIGIN` to ensure other referenced
-            # libraries (like `Foundation`) can be found solely via XCTest.
-            "-Xlinker -rpath=\\$ORIGIN "
-            "-o {build_dir}/libXCTest.so".format(
-                swiftc=swiftc,
-                build_dir=build_dir,
-                dispatch_build_dir=os.path.join(args.libdispatch_build_dir, 'src', '.libs'),
-                foundation_build_dir=foundation_build_dir,
-                swift_build_dir=os.path.join(args.swift_build_dir, 'lib', 'swift', 'linux', arch)))
+        stamps.run_step(
+            "compile",
+            [compiler_identity,
+             [[path, _hash_file(path)] for path in sourcePaths],
+             _dependency_signature(dependency_dirs)],
+            object_paths + [os.path.join(build_dir, name) for name in
+                            ["XCTest.swiftmodule", "XCTest.swiftdoc"]],
+            [swiftc, "-Xcc", "-fblocks", "-c", style_options,
+             "-emit-object", "-emit-module",
+             "-module-name", "XCTest", "-module-link-name", "XCTest",
+             "-parse-as-library",
+             "-emit-module-path", os.path.join(build_dir, "XCTest.swiftmodule")] +
+            mode_options +
+            ["-swift-version", "5",
+             "-I", foundation_build_dir, "-I", core_foundation_build_dir] +
+            libdispatch_args +
+            sourcePaths)
+
+        object_hashes = [[path, _hash_file(path)] for path in object_paths]
+        dispatch_lib_dir = toolchain["libdispatch_lib_dir"]
+        swift_lib_dir = toolchain["swift_lib_dir"]
+        stamps.run_step(
+            "link",
+            [compiler_identity,
+             object_hashes,
+             _dependency_signature([dispatch_lib_dir, foundation_build_dir, swift_lib_dir])],
+            [os.path.join(build_dir, "libXCTest.so")],
+            [swiftc, "-emit-library"] + object_paths +
+            ["-L", dispatch_lib_dir, "-L", foundation_build_dir, "-L", swift_lib_dir,
+             "-lswiftGlibc", "-lswiftCore", "-lFoundation", "-lm",
+             # We embed an rpath of `$ORIGIN` to ensure other referenced
+             # libraries (like `Foundation`) can be found solely via XCTest.
+             "-Xlinker", "-rpath=$ORIGIN",
+             "-o", os.path.join(build_dir, "libXCTest.so")])
 
         # Build the static library.
-        run("mkdir -p {static_lib_build_dir}".format(static_lib_build_dir=static_lib_build_dir))
-        run("ar rcs {static_lib_build_dir}/libXCTest.a {build_dir}/XCTest.o".format(
-            static_lib_build_dir=static_lib_build_dir,
-            build_dir=build_dir))
+        _mkdirp(static_lib_build_dir)
+        static_lib = os.path.join(static_lib_build_dir, "libXCTest.a")
+
+        def remove_static_lib():
+            # 'ar' only adds and replaces members, so start from an empty
+            # archive in case a source file, and so its object file, was
+            # removed.
+            if os.path.exists(static_lib):
+                os.remove(static_lib)
+
+        stamps.run_step(
+            "archive",
+            [object_hashes],
+            [static_lib],
+            ["ar", "rcs", static_lib] + object_paths,
+            prepare=remove_static_lib)
 
         if args.test:
             # Execute main() using the arguments necessary to run the tests.
-            main(args=["test",
-                       "--swiftc", swiftc,
-                       "--foundation-build-dir", foundation_build_dir,
-                       build_dir])
+            # The toolchain arguments 'test' takes are the ones 'build' was
+            # given, so that it finds the toolchain manifest unchanged.
+            test_args = ["test",
+                         "--swiftc", swiftc,
+                         "--foundation-build-dir", foundation_build_dir,
+                         "--foundation-install-prefix",
+                         args.foundation_install_prefix]
+            if libdispatch_build_dir:
+                test_args += ["--libdispatch-build-dir", libdispatch_build_dir]
+            if libdispatch_src_dir:
+                test_args += ["--libdispatch-src-dir", libdispatch_src_dir]
+            main(args=test_args + [build_dir])
 
         # If --module-install-path and --library-install-path were specified,
         # we also install the built XCTest products.
@@ -260,42 +918,79 @@ class GenericUnixStrategy:
                 'Projects" from the Swift project README in order to fix this '
                 'error.'.format(lit_path))
 
-        # FIXME: Allow these to be specified by the Swift build script.
-        lit_flags = "-sv --no-progress-bar"
+        lit_flags = ["-sv", "--no-progress-bar"]
+        if args.jobs is not None:
+            lit_flags += ["-j", str(args.jobs)]
+        if args.filter is not None:
+            lit_flags += ["--filter", args.filter]
+        shards = _lit_shards(args.num_shards, args.run_shard)
         tests_path = os.path.join(SOURCE_DIR, "Tests", "Functional")
-        foundation_build_dir = os.path.abspath(args.foundation_build_dir)
-        core_foundation_build_dir = GenericUnixStrategy.core_foundation_build_dir(
-            foundation_build_dir, args.foundation_install_prefix)
-        if args.libdispatch_build_dir:
-            libdispatch_build_dir = os.path.abspath(args.libdispatch_build_dir)
-            symlink_force(os.path.join(args.libdispatch_build_dir, "src", ".libs", "libdispatch.so"),
-                foundation_build_dir)
-        if args.libdispatch_src_dir and args.libdispatch_build_dir:
-            libdispatch_src_args = ( 
-               "LIBDISPATCH_SRC_DIR={libdispatch_src_dir} "
-               "LIBDISPATCH_BUILD_DIR={libdispatch_build_dir} "
-               "LIBDISPATCH_OVERLAY_DIR={libdispatch_overlay_dir}".format(
-                   libdispatch_src_dir=os.path.abspath(args.libdispatch_src_dir),
-                   libdispatch_build_dir=os.path.join(args.libdispatch_build_dir, 'src', '.libs'),
-                   libdispatch_overlay_dir=os.path.join(args.libdispatch_build_dir, 'src', 'swift')))
-        else:
-            libdispatch_src_args = ""
-
-        run('SWIFT_EXEC={swiftc} '
-            'BUILT_PRODUCTS_DIR={built_products_dir} '
-            'FOUNDATION_BUILT_PRODUCTS_DIR={foundation_build_dir} '
-            'CORE_FOUNDATION_BUILT_PRODUCTS_DIR={core_foundation_build_dir} '
-            '{libdispatch_src_args} '
-            '{lit_path} {lit_flags} '
-            '{tests_path}'.format(
-                swiftc=os.path.abspath(args.swiftc),
-                built_products_dir=args.build_dir,
-                foundation_build_dir=foundation_build_dir,
-                core_foundation_build_dir=core_foundation_build_dir,
-                libdispatch_src_args=libdispatch_src_args,
-                lit_path=lit_path,
-                lit_flags=lit_flags,
-                tests_path=tests_path))
+        build_dir = os.path.abspath(args.build_dir)
+        toolchain = GenericUnixStrategy.resolve_toolchain(args, build_dir)
+        if toolchain["libdispatch_lib_dir"]:
+            libdispatch_so = os.path.join(toolchain["libdispatch_lib_dir"], "libdispatch.so")
+            link_name = os.path.join(toolchain["foundation_build_dir"], "libdispatch.so")
+            if os.path.realpath(link_name) != os.path.realpath(libdispatch_so):
+                symlink_force(libdispatch_so, link_name)
+
+        # lit's outputs, and the times it orders tests by, are kept in the
+        # build directory rather than alongside the tests.
+        exec_root = os.path.join(build_dir, "XCTest.dir", "Functional")
+        # The toolchain is passed explicitly, so that variables left over in
+        # the environment this script was run from don't override it.
+        lit_env = dict(toolchain["environment"],
+                       BUILT_PRODUCTS_DIR=build_dir,
+                       XCTEST_LIT_EXEC_ROOT=exec_root)
+
+        if args.measure_module_cache:
+            _measure_module_cache(
+                [lit_path] + lit_flags + [tests_path], build_dir, lit_env)
+            return
+
+        # Each run of the tests is a new build session, whose first shard
+        # warms up the module cache for the rest.
+        _start_module_cache_session(build_dir)
+
+        history = _TestHistory(build_dir)
+        schedule = history.schedule(
+            tests_path, args.filter, failed_first=args.failed_first)
+        history.write_lit_test_times(
+            exec_root, schedule, failed_first=args.failed_first)
+        jobs = args.jobs or os.cpu_count() or 1
+
+        for shard in shards:
+            shard_flags = []
+            results_name = "lit_results.json"
+            shard_schedule = schedule
+            if shard is not None:
+                shard_flags = ["--num-shards", str(args.num_shards),
+                               "--run-shard", str(shard)]
+                results_name = "lit_results.shard{}.json".format(shard)
+                # lit deals the ordered tests out to shards in turn.
+                shard_schedule = schedule[shard - 1::args.num_shards]
+            predicted_seconds = _predict_seconds(
+                [seconds for _, seconds in shard_schedule], jobs)
+            results_path = os.path.join(build_dir, results_name)
+            if os.path.exists(results_path):
+                os.remove(results_path)
+
+            start = time.time()
+            try:
+                run([lit_path] + lit_flags + shard_flags +
+                    ["--output", results_path, tests_path], env=lit_env)
+            finally:
+                _note_lit_shard_timing(
+                    shard, args.num_shards, time.time() - start,
+                    predicted_seconds, results_path)
+                history.update(results_path)
+
+        compile_cache_dir = os.path.join(build_dir, "XCTest.dir", "CompileCache")
+        if os.path.isdir(compile_cache_dir):
+            # Reports, and then resets, the counts of the test executables
+            # that lit.cfg's compile cache reused or had to compile.
+            run([sys.executable,
+                 os.path.join(tests_path, "xctest_compile_cache", "xctest_compile_cache.py"),
+                 "--cache-dir", compile_cache_dir, "--stats", "--reset-stats"])
 
     @staticmethod
     def install(args):
@@ -304,35 +999,123 @@ class GenericUnixStrategy:
         products into the given module and library paths.
         """
         build_dir = os.path.abspath(args.build_dir)
-        static_lib_build_dir = GenericUnixStrategy.static_lib_build_dir(build_dir)
+        static_lib_build_dir = GenericUnixStrategy.resolve_toolchain(
+            args, build_dir)["static_lib_build_dir"]
         module_install_path = os.path.abspath(args.module_install_path)
         library_install_path = os.path.abspath(args.library_install_path)
 
         _mkdirp(module_install_path)
         _mkdirp(library_install_path)
 
-        xctest_so = "libXCTest.so"
-        run("cp {} {}".format(
-            os.path.join(build_dir, xctest_so),
-            os.path.join(library_install_path, xctest_so)))
-
-        xctest_swiftmodule = "XCTest.swiftmodule"
-        run("cp {} {}".format(
-            os.path.join(build_dir, xctest_swiftmodule),
-            os.path.join(module_install_path, xctest_swiftmodule)))
-
-        xctest_swiftdoc = "XCTest.swiftdoc"
-        run("cp {} {}".format(
-            os.path.join(build_dir, xctest_swiftdoc),
-            os.path.join(module_install_path, xctest_swiftdoc)))
+        products = [
+            (os.path.join(build_dir, "libXCTest.so"), library_install_path),
+            (os.path.join(build_dir, "XCTest.swiftmodule"), module_install_path),
+            (os.path.join(build_dir, "XCTest.swiftdoc"), module_install_path),
+        ]
 
         if args.static_library_install_path:
                static_library_install_path = os.path.abspath(args.static_library_install_path)
                _mkdirp(static_library_install_path)
-               xctest_a = "libXCTest.a"
-               run("cp {} {}".format(
-                   os.path.join(static_lib_build_dir, xctest_a),
-                   os.path.join(static_library_install_path, xctest_a)))
+               products.append((os.path.join(static_lib_build_dir, "libXCTest.a"),
+                                static_library_install_path))
+
+        written = 0
+        for source, install_path in products:
+            written += _install_file(
+                source, os.path.join(install_path, os.path.basename(source)),
+                hardlink=args.hardlink)
+        note("Installed {} files, writing {} bytes.".format(len(products), written))
+
+    @staticmethod
+    def resolve_toolchain(args, build_dir):
+        """
+        Returns the paths of the compiler, dependencies and build products
+        for the given arguments, as recorded in the toolchain manifest in the
+        given 'build_dir', so that they are only discovered once per build
+        directory. The manifest is rewritten if the arguments, or the
+        compiler they name, have changed since it was written.
+
+        Arguments that a subcommand doesn't take take the values recorded by
+        the last subcommand that did, so that 'test' and 'install' see the
+        same toolchain that 'build' used. Arguments that a subcommand takes
+        are used as given, even when they weren't given.
+        """
+        manifest_path = os.path.join(build_dir, _TOOLCHAIN_MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (IOError, OSError, ValueError):
+            manifest = {}
+        if manifest.get("version") != _TOOLCHAIN_MANIFEST_VERSION:
+            manifest = {}
+        recorded_inputs = manifest.get("inputs", {})
+
+        inputs = {}
+        for name in _TOOLCHAIN_INPUTS:
+            if not hasattr(args, name):
+                value = recorded_inputs.get(name)
+            else:
+                value = getattr(args, name)
+            if value is not None and name != "foundation_install_prefix":
+                value = os.path.abspath(value)
+            inputs[name] = value
+        if inputs["swiftc"]:
+            # A compiler replaced in place is a different toolchain.
+            swiftc_stat = os.stat(inputs["swiftc"])
+            inputs["swiftc_signature"] = [swiftc_stat.st_size, swiftc_stat.st_mtime_ns]
+
+        if manifest and recorded_inputs == inputs:
+            return manifest["toolchain"]
+
+        note("Resolving toolchain into {}".format(manifest_path))
+        libdispatch_build_dir = inputs["libdispatch_build_dir"]
+        libdispatch_src_dir = inputs["libdispatch_src_dir"]
+        foundation_build_dir = inputs["foundation_build_dir"]
+        toolchain = {
+            "swiftc": inputs["swiftc"],
+            "compiler_identity":
+                _compiler_identity(inputs["swiftc"]) if inputs["swiftc"] else None,
+            "static_lib_build_dir":
+                GenericUnixStrategy.static_lib_build_dir(build_dir),
+            "foundation_build_dir": foundation_build_dir,
+            "core_foundation_build_dir":
+                GenericUnixStrategy.core_foundation_build_dir(
+                    foundation_build_dir, inputs["foundation_install_prefix"])
+                if foundation_build_dir else None,
+            "swift_lib_dir":
+                os.path.join(inputs["swift_build_dir"], 'lib', 'swift', 'linux',
+                             platform.machine())
+                if inputs["swift_build_dir"] else None,
+            "libdispatch_build_dir": libdispatch_build_dir,
+            "libdispatch_src_dir": libdispatch_src_dir,
+            "libdispatch_lib_dir":
+                os.path.join(libdispatch_build_dir, 'src', '.libs')
+                if libdispatch_build_dir else None,
+        }
+
+        # The environment variables Tests/Functional/lit.cfg would otherwise
+        # need to be given.
+        environment = {
+            "SWIFT_EXEC": toolchain["swiftc"],
+            "FOUNDATION_BUILT_PRODUCTS_DIR": toolchain["foundation_build_dir"],
+            "CORE_FOUNDATION_BUILT_PRODUCTS_DIR": toolchain["core_foundation_build_dir"],
+        }
+        if libdispatch_src_dir and libdispatch_build_dir:
+            environment.update({
+                "LIBDISPATCH_SRC_DIR": libdispatch_src_dir,
+                "LIBDISPATCH_BUILD_DIR": toolchain["libdispatch_lib_dir"],
+                "LIBDISPATCH_OVERLAY_DIR": os.path.join(libdispatch_build_dir, 'src', 'swift'),
+            })
+        toolchain["environment"] = dict(
+            (name, value) for name, value in environment.items() if value)
+
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": _TOOLCHAIN_MANIFEST_VERSION,
+                       "inputs": inputs,
+                       "toolchain": toolchain}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+        return toolchain
 
     @staticmethod
     def core_foundation_build_dir(foundation_build_dir, foundation_install_prefix):
@@ -477,6 +1260,21 @@ def main(args=sys.argv[1:]):
         dest="build_style",
         const="debug",
         default="debug")
+    build_parser.add_argument(
+        "--compile-mode",
+        help="How to compile the XCTest sources: 'whole-module' compiles "
+             "them all in a single frontend invocation, and 'batch' splits "
+             "them into batches compiled concurrently, recompiling only the "
+             "batches affected by a change on later builds. 'batch' by "
+             "default for debug builds, and 'whole-module' for release "
+             "builds.",
+        choices=["whole-module", "batch"])
+    build_parser.add_argument(
+        "-j", "--jobs",
+        help="The maximum number of compiler frontends to run at once in "
+             "batch mode. The number of CPUs (%(default)s) by default.",
+        type=int,
+        default=os.cpu_count() or 1)
     build_parser.add_argument(
         "--test",
         help="Whether to run tests after building. Note that you must have "
@@ -523,6 +1321,37 @@ def main(args=sys.argv[1:]):
         "--libdispatch-src-dir",
         help="Path to swift-corelibs-libdispatch source tree, which "
              "the built XCTest.so will be linked against.")
+    test_parser.add_argument(
+        "-j", "--jobs",
+        help="The number of tests for lit to run in parallel. lit uses one "
+             "per CPU by default. Not used on Darwin.",
+        type=int)
+    test_parser.add_argument(
+        "--num-shards",
+        help="Split the tests into this many shards, as lit does, so that "
+             "they can be run on separate machines. Unless --run-shard is "
+             "given, every shard is run in turn. Not used on Darwin.",
+        type=int)
+    test_parser.add_argument(
+        "--run-shard",
+        help="The shard to run, from 1 to --num-shards. Not used on Darwin.",
+        type=int)
+    test_parser.add_argument(
+        "--filter",
+        help="Only run the tests whose path matches this regular expression. "
+             "Not used on Darwin.")
+    test_parser.add_argument(
+        "--measure-module-cache",
+        help="Instead of running the tests once, run them with an empty "
+             "module cache, with and without warming it up first, and then "
+             "with a warm one, and compare how long each run took. Not used "
+             "on Darwin.",
+        action="store_true")
+    test_parser.add_argument(
+        "--failed-first",
+        help="Run the tests that failed last time first, rather than running "
+             "the longest tests first. Not used on Darwin.",
+        action="store_true")
     test_parser.add_argument(
         "--release",
         help="builds the tests for release",
@@ -559,6 +1388,12 @@ def main(args=sys.argv[1:]):
         "-s", "--static-library-install-path",
         help="Location at which to install XCTest.a. This directory will be "
              "created if it doesn't already exist.")
+    install_parser.add_argument(
+        "--hardlink",
+        help="Install files as hard links to the built products, rather than "
+             "copies, where they are on the same filesystem. The built "
+             "products must then not be modified in place.",
+        action="store_true")
 
     # Many versions of Python require a subcommand must be specified.
     # We handle this here: if no known subcommand (or none of the help options)
@@ -569,8 +1404,20 @@ def main(args=sys.argv[1:]):
     else:
         parsed_args = parser.parse_args(args=["build"] + args)
 
-    # Execute the function for the subcommand we've been given.
-    parsed_args.func(parsed_args)
+    # Execute the function for the subcommand we've been given, recording it
+    # as a trace event that encloses the commands it runs, including those of
+    # any subcommand it executes in turn.
+    global _MAIN_DEPTH
+    _MAIN_DEPTH += 1
+    start = time.time()
+    try:
+        parsed_args.func(parsed_args)
+    finally:
+        _MAIN_DEPTH -= 1
+        _trace_event(parsed_args.func.__name__, "subcommand", start,
+                     time.time(), {})
+        if _MAIN_DEPTH == 0:
+            _write_trace(os.path.abspath(parsed_args.build_dir))
 
 
 if __name__ == '__main__':